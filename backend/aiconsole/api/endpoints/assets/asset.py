@@ -27,6 +27,7 @@ from aiconsole.api.endpoints.services import (
     AssetWithGivenNameAlreadyExistError,
 )
 from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.aic_data_context import hydrated_asset
 from aiconsole.core.assets.fs.exceptions import UserIsAnInvalidAgentIdError
 from aiconsole.core.assets.materials.material import AICMaterial, MaterialContentType
 from aiconsole.core.assets.types import Asset, AssetLocation, AssetType
@@ -119,6 +120,9 @@ async def get_asset(request: Request, asset_id: str):
         if not asset:
             raise HTTPException(status_code=404, detail=f"{asset_id} not found")
 
+        if asset.type == AssetType.CHAT:
+            asset = await hydrated_asset(asset_id)
+
         if isinstance(asset, AICMaterial):
             asset.content = asset.inlined_content
 
@@ -141,7 +145,11 @@ async def partially_update_asset(
 ):
     try:
         if asset.type == AssetType.CHAT:
-            chat = await load_chat_history(id=asset_id)
+            # Make sure the file contains modifications waiting for a deferred write
+            await get_project_assets().flush(asset_id)
+            chat = await hydrated_asset(asset_id)
+            if not isinstance(chat, AICChat):
+                chat = await load_chat_history(id=asset_id)
             if asset.name:
                 chat.name = str(asset.name)
                 await get_project_assets().update_asset(chat.id, chat)
@@ -3,7 +3,9 @@ from typing import Optional
 from fastapi import APIRouter, Response, status
 from pydantic import BaseModel
 
+from aiconsole.core.assets.aic_data_context import hydrated_asset
 from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.core.chat.types import AICChat
 from aiconsole.core.project.project import get_project_assets
 
 router = APIRouter()
@@ -18,7 +20,11 @@ class PatchChatOptions(BaseModel):
 
 @router.patch("/{chat_id}/chat_options")
 async def chat_options(chat_id: str, chat_options: PatchChatOptions):
-    chat = await load_chat_history(id=chat_id)
+    # The loaded chat is changed in place, its options stay current in memory
+    chat = await hydrated_asset(chat_id)
+    if not isinstance(chat, AICChat):
+        # Not created yet
+        chat = await load_chat_history(id=chat_id)
 
     if chat_options.agent_id is not None:
         chat.chat_options.agent_id = chat_options.agent_id
@@ -14,7 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
 
 from aiconsole.core.project import project
@@ -23,8 +23,14 @@ router = APIRouter()
 
 
 @router.get("/")
-async def fetch_assets():
-    assets = [asset[0] for asset in project.get_project_assets().unified_assets.values()]
+async def fetch_assets(ids: list[str] | None = Query(None)):
+    unified_assets = project.get_project_assets().unified_assets
+
+    if ids is None:
+        assets = [asset[0] for asset in unified_assets.values()]
+    else:
+        # Only the given assets, e.g. those changed on disk, the ones which are gone are left out
+        assets = [unified_assets[id][0] for id in ids if unified_assets.get(id)]
 
     return JSONResponse(
         [
@@ -0,0 +1,43 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from aiconsole.core.blobs.blob_store import get_blob_store, media_type_of
+
+router = APIRouter()
+
+# A blob id is the hash of its content, what is served under it never changes
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{blob_id}")
+async def blob(request: Request, blob_id: str):
+    try:
+        blob_path = get_blob_store().path_of(blob_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    if not blob_path.is_file():
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    headers = {"Cache-Control": _CACHE_CONTROL, "ETag": f'"{blob_id}"'}
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(blob_path, media_type=media_type_of(blob_id), headers=headers)
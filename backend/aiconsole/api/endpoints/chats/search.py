@@ -0,0 +1,64 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+
+from aiconsole.core.assets.aic_data_context import chat_search_index
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.project.project import get_project_assets
+
+router = APIRouter()
+
+
+def _ref_of(chat_id: str, path: tuple[str, ...]) -> Any:
+    ref: Any = ChatRef(id=chat_id)
+
+    for i in range(0, len(path), 2):
+        ref = getattr(ref, path[i])[path[i + 1]]
+
+    return ref
+
+
+@router.get("/search")
+async def search_chats(
+    query: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    index = chat_search_index()
+
+    if index is None:
+        raise HTTPException(status_code=400, detail="No project is open")
+
+    total, hits = index.search(query, offset=offset, limit=limit)
+    assets = get_project_assets()
+
+    return {
+        "total": total,
+        # False while the index is still being loaded, results may be incomplete
+        "complete": index.loaded,
+        "hits": [
+            {
+                "ref": _ref_of(hit.chat_id, hit.path).model_dump(),
+                "chat_id": hit.chat_id,
+                "chat_name": asset.name if (asset := assets.get_asset(hit.chat_id)) else None,
+                "field": hit.field,
+                "score": hit.score,
+            }
+            for hit in hits
+        ],
+    }
@@ -0,0 +1,80 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+
+from fastapi import APIRouter, Depends
+
+from aiconsole.api.websockets.connection_manager import (
+    ConnectionManager,
+    connection_manager,
+)
+from aiconsole.core.assets.aic_data_context import chat_cache, lock_manager
+
+router = APIRouter()
+
+
+@router.get("/connections")
+async def get_connections(connection_manager: ConnectionManager = Depends(dependency=connection_manager)):
+    return [
+        {
+            "id": connection.id,
+            "encoding": connection.encoding,
+            "subscriptions": connection.subscriptions_count,
+            "queue_depth": connection.queue_depth,
+            "max_queue_depth": connection.stats.max_depth,
+            "sent": connection.stats.sent,
+            "overflows": connection.stats.overflows,
+        }
+        for connection in connection_manager.active_connections
+    ]
+
+
+@router.get("/locks")
+async def get_locks():
+    now = time.monotonic()
+    locks = lock_manager()
+
+    return {
+        "holders": [
+            {
+                "ref": getattr(holder.key, "path", str(holder.key)),
+                "owner": holder.owner,
+                "held_for": now - holder.acquired_at,
+                "lease_expires_in": holder.lease_expires_at - now if holder.lease_expires_at else None,
+                "waiters": waiters,
+            }
+            for holder, waiters in locks.holders()
+        ],
+        "wait_time": locks.stats.wait_time.to_dict(),
+        "hold_time": locks.stats.hold_time.to_dict(),
+        "timeouts": locks.stats.timeouts,
+        "expired_leases": locks.stats.expired_leases,
+    }
+
+
+@router.get("/chat_cache")
+async def get_chat_cache():
+    cache = chat_cache()
+
+    return {
+        "chats": len(cache),
+        "estimated_bytes": cache.total_bytes,
+        "max_chats": cache.max_chats,
+        "max_bytes": cache.max_bytes,
+        "hits": cache.stats.hits,
+        "misses": cache.stats.misses,
+        "evictions": cache.stats.evictions,
+    }
@@ -15,7 +15,7 @@
 # limitations under the License.
 import logging
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
 
 from aiconsole.api.websockets.connection_manager import (
     ConnectionManager,
@@ -23,6 +23,11 @@ from aiconsole.api.websockets.connection_manager import (
 )
 from aiconsole.api.websockets.handle_incoming_message import handle_incoming_message
 from aiconsole.api.websockets.server_messages import ErrorServerMessage
+from aiconsole.api.websockets.wire_format import (
+    MalformedFrameError,
+    UnsupportedWireEncodingError,
+    negotiate_wire_encoding,
+)
 from aiconsole.core.project import project
 
 router = APIRouter()
@@ -33,9 +38,17 @@ _log = logging.getLogger(__name__)
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
+    encoding: str | None = None,
     connection_manager: ConnectionManager = Depends(dependency=connection_manager),
 ):
-    connection = await connection_manager.connect(websocket)
+    try:
+        wire_encoding = negotiate_wire_encoding(encoding)
+    except UnsupportedWireEncodingError as e:
+        _log.error(f"Rejecting websocket connection: {e}")
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=str(e))
+        return
+
+    connection = await connection_manager.connect(websocket, wire_encoding)
     await project.send_project_init(connection)
 
     try:
@@ -52,4 +65,9 @@ async def websocket_endpoint(
                 _log.exception(e)
                 _log.error(f"Error handling message: {e}")
     except WebSocketDisconnect:
+        pass
+    except MalformedFrameError as e:
+        _log.error(f"Closing websocket connection, it sent a malformed frame: {e}")
+        await connection.close(status.WS_1007_INVALID_FRAME_PAYLOAD_DATA)
+    finally:
         connection_manager.disconnect(connection)
@@ -19,8 +19,11 @@ from fastapi import APIRouter
 from aiconsole.api.endpoints import (
     assets,
     audio,
+    blobs,
+    chats,
     check_key,
     commands_history,
+    debug,
     execution_modes,
     genui,
     image,
@@ -43,7 +46,10 @@ app_router.include_router(net_check.router)
 app_router.include_router(profile.router, tags=["Profile"])
 app_router.include_router(assets.router, prefix="/api/assets", tags=["Agents"])
 app_router.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
+app_router.include_router(chats.router, prefix="/api/chats", tags=["Chats"])
+app_router.include_router(blobs.router, prefix="/api/blobs", tags=["Blobs"])
 app_router.include_router(settings.router, prefix="/api/settings", tags=["Project Settings"])
 app_router.include_router(execution_modes.router, prefix="/api/execution_modes", tags=["Execution Mode"])
 app_router.include_router(commands_history.router)
+app_router.include_router(debug.router, prefix="/api/debug", tags=["Debug"])
 app_router.include_router(ws.router)
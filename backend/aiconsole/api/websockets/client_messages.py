@@ -37,6 +37,12 @@ class DoMutationClientMessage(BaseClientMessage):
     mutation: AssetMutation
 
 
+# Mutations applied atomically, all of them or none
+class DoMutationsClientMessage(BaseClientMessage):
+    request_id: str
+    mutations: list[AssetMutation]
+
+
 class AcquireLockClientMessage(BaseClientMessage):
     request_id: str
     ref: ObjectRef
@@ -50,6 +56,20 @@ class ReleaseLockClientMessage(BaseClientMessage):
 class SubscribeToClientMessage(BaseClientMessage):
     request_id: str
     ref: AnyRef
+    # Last position in the mutation stream the client has seen, to receive only what it missed since
+    stream_id: str | None = None
+    last_seq: int | None = None
+    # Send only this many last message groups of the chat, with long tool outputs truncated
+    window: int | None = None
+
+
+# Fetches an object or a collection, e.g. message groups omitted from a windowed chat or a truncated tool call
+class FetchClientMessage(BaseClientMessage):
+    request_id: str
+    ref: AnyRef
+    # Paging of collections, returns up to limit items preceding the one with before_id
+    before_id: str | None = None
+    limit: int | None = None
 
 
 class DuplicateAssetClientMessage(BaseClientMessage):
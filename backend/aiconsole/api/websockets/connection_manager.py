@@ -15,14 +15,37 @@
 # limitations under the License.
 """
 Connection manager for websockets. Keeps track of all active connections
+
+Messages are not sent to a client by whoever sends them, they are queued and sent by a writer task
+of the connection, so one slow client does not hold up sending messages to the others.
 """
+import asyncio
 import logging
 from dataclasses import dataclass
+from enum import Enum
 from functools import lru_cache
+from typing import Callable
+from uuid import uuid4
 
-from fastapi import WebSocket
+from fastapi import WebSocket, WebSocketDisconnect, status
 
 from aiconsole.api.websockets.base_server_message import BaseServerMessage
+from aiconsole.api.websockets.server_messages import (
+    HeartbeatServerMessage,
+    ResyncRequiredServerMessage,
+)
+from aiconsole.api.websockets.subscription_trie import SubscriptionTrie
+from aiconsole.api.websockets.wire_format import (
+    WireEncoding,
+    decode_frame,
+    encode_frame,
+)
+from aiconsole.consts import (
+    WEBSOCKET_HEARTBEAT_SECONDS,
+    WEBSOCKET_SEND_QUEUE_OVERFLOW,
+    WEBSOCKET_SEND_QUEUE_SIZE,
+    WEBSOCKET_SEND_TIMEOUT_SECONDS,
+)
 from fastmutation.types import AnyRef, CollectionRef, ObjectRef
 
 _log = logging.getLogger(__name__)
@@ -34,14 +57,92 @@ class AcquiredLock:
     request_id: str
 
 
+class SendQueueOverflow(str, Enum):
+    # Drop the queued messages and ask the client to subscribe again
+    RESYNC = "resync"
+    DISCONNECT = "disconnect"
+
+
+@dataclass
+class SendQueueStats:
+    sent: int = 0
+    overflows: int = 0
+    max_depth: int = 0
+
+
+class EncodedServerMessage:
+    """
+    A server message encoded on first use, once per wire encoding,
+    so sending it to any number of clients serializes it only once.
+    """
+
+    __slots__ = ("message", "_data", "_frames")
+
+    def __init__(self, message: BaseServerMessage):
+        self.message = message
+        self._data: dict | None = None
+        self._frames: dict[WireEncoding, str | bytes] = {}
+
+    def frame(self, encoding: WireEncoding) -> str | bytes:
+        frame = self._frames.get(encoding)
+
+        if frame is None:
+            if self._data is None:
+                self._data = {
+                    "type": self.message.get_type(),
+                    **self.message.model_dump(exclude_none=True, mode="json"),
+                }
+            frame = self._frames[encoding] = encode_frame(self._data, encoding)
+
+        return frame
+
+
+_heartbeat = EncodedServerMessage(HeartbeatServerMessage())
+_resync_required = EncodedServerMessage(ResyncRequiredServerMessage())
+
+
 class AICConnection:
-    def __init__(self, websocket: WebSocket):
+    def __init__(
+        self,
+        websocket: WebSocket,
+        encoding: WireEncoding = WireEncoding.JSON,
+        subscriptions: "SubscriptionTrie[AICConnection] | None" = None,
+        on_closed: "Callable[[AICConnection], None] | None" = None,
+        queue_size: int = WEBSOCKET_SEND_QUEUE_SIZE,
+        overflow: SendQueueOverflow = SendQueueOverflow(WEBSOCKET_SEND_QUEUE_OVERFLOW),
+        heartbeat_seconds: float = WEBSOCKET_HEARTBEAT_SECONDS,
+        send_timeout_seconds: float = WEBSOCKET_SEND_TIMEOUT_SECONDS,
+    ):
+        self.id = str(uuid4())
         self._websocket = websocket
+        self.encoding = encoding
+        self._on_closed = on_closed
+        self._outbox: asyncio.Queue[str | bytes] = asyncio.Queue(maxsize=queue_size)
+        self._overflow = overflow
+        self._heartbeat_seconds = heartbeat_seconds
+        self._send_timeout_seconds = send_timeout_seconds
+        self._writer: asyncio.Task | None = None
+        self._closing: asyncio.Task | None = None
+        self._closed = False
+        self._timed_out = False
+        self.stats = SendQueueStats()
         self._open_refs: set[AnyRef] = set()
+        # Shared with the other connections of the manager, for routing messages to the subscribers of a ref
+        self._subscriptions: SubscriptionTrie[AICConnection] = (
+            subscriptions if subscriptions is not None else SubscriptionTrie()
+        )
         self._acquired_locks: list[AcquiredLock] = []
 
-    def receive_json(self):
-        return self._websocket.receive_json()
+    async def receive_json(self):
+        """
+        Receives the next message, raises MalformedFrameError if it can't be decoded.
+        """
+        message = await self._websocket.receive()
+
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        return decode_frame(message["bytes"] if message.get("bytes") is not None else message["text"], self.encoding)
 
     def is_ref_open(self, ref: AnyRef):
         if ref in self._open_refs:
@@ -57,10 +158,17 @@ class AICConnection:
 
     def subscribe_to_ref(self, ref: AnyRef):
         self._open_refs.add(ref)
+        self._subscriptions.add(ref.key.segments, self)
 
     def unsubscribe_ref(self, ref: AnyRef):
         if ref.id != "new":
             self._open_refs.remove(ref)
+            self._subscriptions.remove(ref.key.segments, self)
+
+    def unsubscribe_all(self):
+        for ref in self._open_refs:
+            self._subscriptions.remove(ref.key.segments, self)
+        self._open_refs.clear()
 
     def lock_acquired(self, ref: AnyRef, request_id: str):
         if self.is_lock_acquired(ref):
@@ -90,22 +198,154 @@ class AICConnection:
 
         return False
 
+    @property
+    def queue_depth(self) -> int:
+        return self._outbox.qsize()
+
+    @property
+    def subscriptions_count(self) -> int:
+        return len(self._open_refs)
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_frames())
+
     async def send(self, msg: BaseServerMessage):
-        await self._websocket.send_json({"type": msg.get_type(), **msg.model_dump(exclude_none=True, mode="json")})
+        """
+        Queues the message, it is sent by the writer task of the connection.
+        """
+        await self.send_encoded(EncodedServerMessage(msg))
+
+    async def send_encoded(self, encoded: EncodedServerMessage):
+        if self._closed:
+            return
+
+        try:
+            self._outbox.put_nowait(encoded.frame(self.encoding))
+        except asyncio.QueueFull:
+            self._queue_overflowed()
+
+        self.stats.max_depth = max(self.stats.max_depth, self._outbox.qsize())
+
+    async def flush(self):
+        """
+        Waits until all the messages queued so far are sent.
+        """
+        await self._outbox.join()
+
+    async def close(self, code: int = status.WS_1000_NORMAL_CLOSURE):
+        if self._closed:
+            return
+
+        self.stop()
+
+        if self._writer and self._writer is not asyncio.current_task():
+            await asyncio.wait([self._writer])
+
+        if self._on_closed:
+            self._on_closed(self)
+
+        try:
+            await asyncio.wait_for(self._websocket.close(code=code), self._send_timeout_seconds)
+        except Exception as e:
+            _log.debug(f"Error closing connection {self.id}: {e!r}")
+
+    def stop(self):
+        """
+        Stops sending messages, anything still queued is dropped.
+        """
+        self._closed = True
+
+        if self._writer and not self._writer.done() and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+        self._drop_queued()
+
+    def _drop_queued(self) -> int:
+        dropped = 0
+        while not self._outbox.empty():
+            self._outbox.get_nowait()
+            self._outbox.task_done()
+            dropped += 1
+        return dropped
+
+    def _queue_overflowed(self):
+        self.stats.overflows += 1
+
+        if self._overflow == SendQueueOverflow.DISCONNECT:
+            _log.warning(f"Connection {self.id} fell behind with {self._outbox.qsize()} messages queued, closing it")
+            if self._closing is None:
+                self._closing = asyncio.create_task(self.close(status.WS_1013_TRY_AGAIN_LATER))
+        else:
+            dropped = self._drop_queued()
+            _log.warning(f"Connection {self.id} fell behind, dropped {dropped} messages and requested a resync")
+            self._outbox.put_nowait(_resync_required.frame(self.encoding))
+
+    async def _send_frame(self, frame: str | bytes):
+        if isinstance(frame, bytes):
+            await self._websocket.send_bytes(frame)
+        else:
+            await self._websocket.send_text(frame)
+
+    def _send_timed_out(self):
+        self._timed_out = True
+        if self._writer:
+            self._writer.cancel()
+
+    def _queue_heartbeat(self):
+        # Sending to a dead connection fails (or times out), which gets it closed
+        if self._outbox.empty():
+            self._outbox.put_nowait(_heartbeat.frame(self.encoding))
+
+    async def _write_frames(self):
+        # Timeouts are timer callbacks instead of wait_for, which would wrap every get and send in a task
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                if self._outbox.empty():
+                    idle = loop.call_later(self._heartbeat_seconds, self._queue_heartbeat)
+                    frame = await self._outbox.get()
+                    idle.cancel()
+                else:
+                    frame = self._outbox.get_nowait()
+
+                timeout = loop.call_later(self._send_timeout_seconds, self._send_timed_out)
+                try:
+                    await self._send_frame(frame)
+                    self.stats.sent += 1
+                finally:
+                    timeout.cancel()
+                    self._outbox.task_done()
+        except asyncio.CancelledError:
+            if not self._timed_out:
+                raise
+            _log.warning(f"Closing connection {self.id}, sending to it timed out")
+            await self.close(status.WS_1011_INTERNAL_ERROR)
+        except (WebSocketDisconnect, RuntimeError, OSError) as e:
+            _log.warning(f"Closing connection {self.id}, sending to it failed: {e!r}")
+            await self.close(status.WS_1011_INTERNAL_ERROR)
 
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[AICConnection] = []
+        self.subscriptions: SubscriptionTrie[AICConnection] = SubscriptionTrie()
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, encoding: WireEncoding = WireEncoding.JSON):
         await websocket.accept()
-        connection = AICConnection(websocket)
+        connection = AICConnection(websocket, encoding, self.subscriptions, on_closed=self.disconnect)
+        connection.start()
         self.active_connections.append(connection)
-        _log.info("Connected")
+        _log.info(f"Connected ({encoding.value})")
         return connection
 
     def disconnect(self, connection: AICConnection):
+        # Both the endpoint and a connection closing itself end up here
+        if connection not in self.active_connections:
+            return
+
+        connection.stop()
+        connection.unsubscribe_all()
         self.active_connections.remove(connection)
         _log.info("Disconnected")
 
@@ -115,13 +355,30 @@ class ConnectionManager:
         ref: ObjectRef | CollectionRef,
         except_connection: AICConnection | None = None,
     ):
-        for connection in self.active_connections:
-            if connection.is_ref_open(ref) and except_connection != connection:
-                await connection.send(message)
+        encoded = EncodedServerMessage(message)
+
+        for connection in self.subscriptions.subscribers(ref.key.segments):
+            if except_connection != connection:
+                await connection.send_encoded(encoded)
+
+    async def send_to_any_ref(
+        self,
+        message: BaseServerMessage,
+        refs: list[ObjectRef],
+        except_connection: AICConnection | None = None,
+    ):
+        encoded = EncodedServerMessage(message)
+        subscribers = set().union(*(self.subscriptions.subscribers(ref.key.segments) for ref in refs))
+
+        for connection in subscribers:
+            if except_connection != connection:
+                await connection.send_encoded(encoded)
 
     async def send_to_all(self, message: BaseServerMessage):
+        encoded = EncodedServerMessage(message)
+
         for connection in self.active_connections:
-            await connection.send(message)
+            await connection.send_encoded(encoded)
 
 
 @lru_cache
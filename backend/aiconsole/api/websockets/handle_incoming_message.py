@@ -24,7 +24,9 @@ from aiconsole.api.websockets.client_messages import (
     AcceptCodeClientMessage,
     AcquireLockClientMessage,
     DoMutationClientMessage,
+    DoMutationsClientMessage,
     DuplicateAssetClientMessage,
+    FetchClientMessage,
     ProcessChatClientMessage,
     ReleaseLockClientMessage,
     StopChatClientMessage,
@@ -37,13 +39,17 @@ from aiconsole.api.websockets.connection_manager import (
 )
 from aiconsole.api.websockets.render_materials import render_materials
 from aiconsole.api.websockets.server_messages import (
+    ChatMutationsSinceServerMessage,
     ChatOpenedServerMessage,
     DuplicateAssetServerMessage,
+    FetchResultServerMessage,
     NotificationServerMessage,
     ResponseServerMessage,
 )
+from aiconsole.consts import CHAT_WINDOW_TOOL_OUTPUT_CHARS
 from aiconsole.core.assets.agents.agent import AICAgent
-from aiconsole.core.assets.aic_data_context import AICFileDataContext
+from aiconsole.core.assets.aic_data_context import AICFileDataContext, hydrated_asset
+from aiconsole.core.chat.chat_window import page_of_collection, window_chat
 from aiconsole.core.chat.do_process_chat import do_process_chat
 from aiconsole.core.chat.execution_modes.utils.import_and_validate_execution_mode import (
     import_and_validate_execution_mode,
@@ -67,10 +73,12 @@ async def handle_incoming_message(connection: AICConnection, json: dict):
         AcquireLockClientMessage.__name__: _handle_acquire_lock_ws_message,
         ReleaseLockClientMessage.__name__: _handle_release_lock_ws_message,
         SubscribeToClientMessage.__name__: _subscribe_to_client_message,
+        FetchClientMessage.__name__: _handle_fetch_ws_message,
         DuplicateAssetClientMessage.__name__: _handle_duplicate_chat_ws_message,
         StopChatClientMessage.__name__: _handle_stop_chat_ws_message,
         UnsubscribeClientMessage.__name__: _handle_close_chat_ws_message,
         DoMutationClientMessage.__name__: _handle_do_chat_mutation_ws_message,
+        DoMutationsClientMessage.__name__: _handle_do_chat_mutations_ws_message,
         AcceptCodeClientMessage.__name__: _handle_accept_code_ws_message,
         ProcessChatClientMessage.__name__: _handle_process_chat_ws_message,
     }
@@ -119,14 +127,14 @@ async def _handle_release_lock_ws_message(connection: AICConnection, json: dict)
 
 
 async def _subscribe_to_client_message(connection: AICConnection, json: dict):
-
     message = SubscribeToClientMessage(**json)
 
     try:
-        message.ref.context = AICFileDataContext(
+        context = AICFileDataContext(
             lock_id=message.request_id,
             origin=connection,
         )
+        message.ref.context = context
 
         if message.ref.id == "new":
             chat = AICChat.create_empty_chat()
@@ -135,20 +143,49 @@ async def _subscribe_to_client_message(connection: AICConnection, json: dict):
             chat = await message.ref.get()
             chat = cast(AICChat, chat)
 
-        connection.subscribe_to_ref(message.ref)
+        # Nothing can be sent to the subscriber about the chat in between its snapshot (or missed mutations)
+        # and the position in the mutation stream it is at
+        async with context.mutation_stream_position(message.ref) as (stream_id, seq):
+            connection.subscribe_to_ref(message.ref)
 
-        if connection.is_ref_open(message.ref):
-            await connection.send(
-                ResponseServerMessage(
-                    request_id=message.request_id, payload={"chat_id": message.ref.id}, is_error=False
+            if connection.is_ref_open(message.ref):
+                await connection.send(
+                    ResponseServerMessage(
+                        request_id=message.request_id, payload={"chat_id": message.ref.id}, is_error=False
+                    )
                 )
-            )
 
-            await connection.send(
-                ChatOpenedServerMessage(
-                    chat=chat,
-                )
-            )
+                missed = None
+                if message.stream_id is not None and message.last_seq is not None:
+                    missed = context.mutations_since(message.ref, message.stream_id, message.last_seq)
+
+                if missed is not None:
+                    await connection.send(
+                        ChatMutationsSinceServerMessage(
+                            chat_id=message.ref.id,
+                            stream_id=stream_id,
+                            seq=seq,
+                            mutations=missed,
+                        )
+                    )
+                elif message.window is not None:
+                    windowed_chat, window = window_chat(chat, message.window, CHAT_WINDOW_TOOL_OUTPUT_CHARS)
+                    await connection.send(
+                        ChatOpenedServerMessage(
+                            chat=windowed_chat,
+                            stream_id=stream_id,
+                            seq=seq,
+                            window=window,
+                        )
+                    )
+                else:
+                    await connection.send(
+                        ChatOpenedServerMessage(
+                            chat=chat,
+                            stream_id=stream_id,
+                            seq=seq,
+                        )
+                    )
     except Exception as e:
         _log.error(f"Error during opening chat {message.ref.id}: {e}")
         _log.exception(e)
@@ -162,11 +199,39 @@ async def _subscribe_to_client_message(connection: AICConnection, json: dict):
         )
 
 
+async def _handle_fetch_ws_message(connection: AICConnection, json: dict):
+    message = FetchClientMessage(**json)
+
+    try:
+        context = AICFileDataContext(
+            lock_id=message.request_id,
+            origin=connection,
+        )
+
+        value = await context.get(message.ref)
+        if value is None:
+            raise ValueError(f"{message.ref} not found")
+
+        if isinstance(value, list):
+            value = page_of_collection(value, message.before_id, message.limit)
+
+        await connection.send(FetchResultServerMessage(request_id=message.request_id, ref=message.ref, value=value))
+    except Exception as e:
+        _log.error(f"Error during fetching {message.ref}: {e}")
+        await connection.send(
+            ResponseServerMessage(
+                request_id=message.request_id,
+                payload={"error": "Error during fetching", "ref": message.ref},
+                is_error=True,
+            )
+        )
+
+
 async def _handle_duplicate_chat_ws_message(connection: AICConnection, json: dict):
     message = DuplicateAssetClientMessage(**json)
     new_asset_id = str(uuid4())
     try:
-        asset = project.get_project_assets().get_asset(message.asset_id)
+        asset = await hydrated_asset(message.asset_id)
         if not asset:
             raise Exception("Asset not found")
 
@@ -224,6 +289,29 @@ async def _handle_do_chat_mutation_ws_message(connection: AICConnection | None,
     await message.mutation.ref.context.mutate(message.mutation, originating_from_server=False)
 
 
+async def _handle_do_chat_mutations_ws_message(connection: AICConnection | None, json: dict):
+    message = DoMutationsClientMessage(**json)
+    context = AICFileDataContext(
+        lock_id=message.request_id,
+        origin=connection,
+    )
+
+    for mutation in message.mutations:
+        mutation.ref.context = context
+
+    try:
+        await context.mutate_batch(message.mutations, originating_from_server=False)
+    except Exception as e:
+        if connection is not None:
+            await connection.send(
+                ResponseServerMessage(
+                    request_id=message.request_id,
+                    payload={"error": f"Mutations were not applied: {e}"},
+                    is_error=True,
+                )
+            )
+
+
 async def _handle_accept_code_ws_message(connection: AICConnection, json: dict):
     events_to_sub: list[type[InternalEvent]] = [
         WaitForEnvEvent,
@@ -14,10 +14,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os
+from typing import Any
 
 from aiconsole.api.websockets.base_server_message import BaseServerMessage
+from aiconsole.core.chat.chat_window import ChatWindow
 from aiconsole.core.chat.types import AICChat
+from fastmutation.mutation_log import LoggedMutation
 from fastmutation.mutations import AssetMutation
+from fastmutation.types import AnyRef
 
 
 class NotificationServerMessage(BaseServerMessage):
@@ -48,6 +52,19 @@ class ProjectClosedServerMessage(BaseServerMessage):
     pass
 
 
+class HeartbeatServerMessage(BaseServerMessage):
+    """
+    Sent over connections which are idle, so dead ones are noticed and dropped.
+    """
+
+
+class ResyncRequiredServerMessage(BaseServerMessage):
+    """
+    Sent to a client which did not keep up with the messages sent to it. Some of them were dropped,
+    so it has to subscribe again to whatever it has open.
+    """
+
+
 class ProjectLoadingServerMessage(BaseServerMessage):
     pass
 
@@ -55,6 +72,8 @@ class ProjectLoadingServerMessage(BaseServerMessage):
 class AssetsUpdatedServerMessage(BaseServerMessage):
     initial: bool
     count: int
+    # Ids of the added, changed and removed assets, None if any asset may have changed
+    asset_ids: list[str] | None = None
 
 
 class SettingsServerMessage(BaseServerMessage):
@@ -64,21 +83,44 @@ class SettingsServerMessage(BaseServerMessage):
 class NotifyAboutAssetMutationServerMessage(BaseServerMessage):
     request_id: str
     mutation: AssetMutation
-
-    def model_dump(self, **kwargs):
-        # include type of mutation in the dump of "mutation"
-        return {
-            **super().model_dump(**kwargs),
-            "mutation": {
-                **self.mutation.model_dump(**kwargs),
-                "type": self.mutation.__class__.__name__,
-            },
-        }
+    seq: int | None = None
 
 
 # NotifyAboutAssetMutationServerMessage.model_rebuild()
 
 
+class NotifyAboutAssetMutationsServerMessage(BaseServerMessage):
+    """
+    Mutations applied together by one DoMutationsClientMessage, in order. seq is the sequence number of the last one.
+    """
+
+    request_id: str
+    mutations: list[AssetMutation]
+    seq: int | None = None
+
+
+class MutationsAppliedServerMessage(BaseServerMessage):
+    """
+    Sent to the client which sent the mutations instead of notifying it about them, so it knows their sequence number.
+    """
+
+    request_id: str
+    asset_id: str
+    seq: int
+
+
+class ChatMutationsSinceServerMessage(BaseServerMessage):
+    """
+    Sent instead of ChatOpenedServerMessage to a client re-subscribing with a recent enough sequence number.
+    Contains the mutations it missed, including ones of its own it may have not seen applied.
+    """
+
+    chat_id: str
+    stream_id: str
+    seq: int
+    mutations: list[LoggedMutation]
+
+
 class ResponseServerMessage(BaseServerMessage):
     request_id: str
     payload: dict
@@ -95,6 +137,21 @@ class ResponseServerMessage(BaseServerMessage):
 
 class ChatOpenedServerMessage(BaseServerMessage):
     chat: AICChat
+    # Position in the mutation stream of the chat the snapshot was taken at
+    stream_id: str | None = None
+    seq: int | None = None
+    # Set if only a window of the chat was sent
+    window: ChatWindow | None = None
+
+
+class FetchResultServerMessage(BaseServerMessage):
+    """
+    Response to FetchClientMessage, value is the object or the list of objects the ref points to.
+    """
+
+    request_id: str
+    ref: AnyRef
+    value: Any
 
 
 class DuplicateChatServerMessage(BaseServerMessage):
@@ -0,0 +1,72 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Index of subscriptions by ref path, so finding everyone subscribed to a ref or to any of its parents
+takes one walk down the path instead of checking every subscriber.
+"""
+from typing import Generic, Hashable, TypeVar
+
+TSubscriber = TypeVar("TSubscriber", bound=Hashable)
+
+
+class _Node(Generic[TSubscriber]):
+    __slots__ = ("children", "subscribers")
+
+    def __init__(self):
+        self.children: dict[str, _Node[TSubscriber]] = {}
+        self.subscribers: set[TSubscriber] = set()
+
+
+class SubscriptionTrie(Generic[TSubscriber]):
+    def __init__(self):
+        self._root: _Node[TSubscriber] = _Node()
+
+    def add(self, path: tuple[str, ...], subscriber: TSubscriber) -> None:
+        node = self._root
+        for segment in path:
+            node = node.children.setdefault(segment, _Node())
+        node.subscribers.add(subscriber)
+
+    def remove(self, path: tuple[str, ...], subscriber: TSubscriber) -> None:
+        nodes = [self._root]
+        for segment in path:
+            child = nodes[-1].children.get(segment)
+            if child is None:
+                return
+            nodes.append(child)
+
+        nodes[-1].subscribers.discard(subscriber)
+
+        # Prune the nodes nobody is subscribed to anymore
+        for i in range(len(path), 0, -1):
+            node = nodes[i]
+            if node.subscribers or node.children:
+                break
+            del nodes[i - 1].children[path[i - 1]]
+
+    def subscribers(self, path: tuple[str, ...]) -> set[TSubscriber]:
+        """
+        Returns everyone subscribed to the path or to any of its prefixes.
+        """
+        result = set(self._root.subscribers)
+        node = self._root
+        for segment in path:
+            child = node.children.get(segment)
+            if child is None:
+                break
+            node = child
+            result |= node.subscribers
+        return result
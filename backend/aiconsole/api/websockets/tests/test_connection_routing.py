@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+
+from aiconsole.api.websockets.connection_manager import (
+    AICConnection,
+    ConnectionManager,
+    SendQueueOverflow,
+)
+from aiconsole.api.websockets.server_messages import ErrorServerMessage
+from aiconsole.api.websockets.subscription_trie import SubscriptionTrie
+from aiconsole.core.chat.locations import ChatRef
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+        # Sending blocks until set, like to a client which does not read
+        self.reading = asyncio.Event()
+        self.reading.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        await self.reading.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int):
+        self.closed_with = code
+
+
+def test_trie_should_find_subscribers_of_prefixes_and_prune():
+    trie: SubscriptionTrie[str] = SubscriptionTrie()
+    trie.add(("assets", "chat"), "tab")
+    trie.add(("assets",), "sidebar")
+
+    assert trie.subscribers(("assets", "chat", "message_groups", "group")) == {"tab", "sidebar"}
+    assert trie.subscribers(("assets", "other")) == {"sidebar"}
+
+    trie.remove(("assets", "chat"), "tab")
+
+    assert trie.subscribers(("assets", "chat")) == {"sidebar"}
+    assert trie._root.children["assets"].children == {}
+
+
+@pytest.mark.asyncio
+async def test_should_send_only_to_subscribers_of_ref():
+    manager = ConnectionManager()
+    first, second = RecordingWebSocket(), RecordingWebSocket()
+    first_connection = await manager.connect(first)  # type: ignore
+    second_connection = await manager.connect(second)  # type: ignore
+
+    first_connection.subscribe_to_ref(ChatRef("chat"))
+    second_connection.subscribe_to_ref(ChatRef("other"))
+
+    await manager.send_to_ref(ErrorServerMessage(error="x"), ChatRef("chat").message_groups["group"])
+    await manager.send_to_ref(ErrorServerMessage(error="x"), ChatRef("chat"), except_connection=first_connection)
+    await first_connection.flush()
+    await second_connection.flush()
+
+    assert len(first.sent) == 1
+    assert second.sent == []
+
+    await first_connection.close()
+    await manager.send_to_ref(ErrorServerMessage(error="x"), ChatRef("chat"))
+
+    assert len(first.sent) == 1
+    await second_connection.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_client_should_be_asked_to_resync_without_holding_up_others():
+    slow, fast = RecordingWebSocket(), RecordingWebSocket()
+    slow.reading.clear()
+    slow_connection = AICConnection(slow, queue_size=3, overflow=SendQueueOverflow.RESYNC)  # type: ignore
+    fast_connection = AICConnection(fast, queue_size=3)  # type: ignore
+    slow_connection.start()
+    fast_connection.start()
+
+    for i in range(10):
+        await slow_connection.send(ErrorServerMessage(error=str(i)))
+        await fast_connection.send(ErrorServerMessage(error=str(i)))
+        await fast_connection.flush()
+
+    assert len(fast.sent) == 10
+    assert slow_connection.stats.overflows > 0
+
+    slow.reading.set()
+    await slow_connection.flush()
+
+    types = [json.loads(frame)["type"] for frame in slow.sent]
+    assert "ResyncRequiredServerMessage" in types
+    assert len(types) < 10
+
+    await slow_connection.close()
+    await fast_connection.close()
+
+
+@pytest.mark.asyncio
+async def test_should_close_connection_which_cannot_be_sent_to():
+    manager = ConnectionManager()
+    websocket = RecordingWebSocket()
+    websocket.reading.clear()
+    connection = AICConnection(
+        websocket,  # type: ignore
+        on_closed=manager.disconnect,
+        heartbeat_seconds=0.01,
+        send_timeout_seconds=0.05,
+    )
+    manager.active_connections.append(connection)
+    connection.subscribe_to_ref(ChatRef("chat"))
+    connection.start()
+
+    await asyncio.sleep(0.2)
+
+    assert websocket.closed_with is not None
+    assert manager.active_connections == []
+    assert manager.subscriptions.subscribers(ChatRef("chat").key.segments) == set()
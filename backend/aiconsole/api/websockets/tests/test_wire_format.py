@@ -0,0 +1,39 @@
+import pytest
+
+from aiconsole.api.websockets.wire_format import (
+    MalformedFrameError,
+    UnsupportedWireEncodingError,
+    WireEncoding,
+    decode_frame,
+    encode_frame,
+    negotiate_wire_encoding,
+)
+
+
+def test_should_default_to_json():
+    assert negotiate_wire_encoding(None) == WireEncoding.JSON
+    assert negotiate_wire_encoding("msgpack") == WireEncoding.MSGPACK
+
+
+def test_should_reject_unknown_encoding():
+    with pytest.raises(UnsupportedWireEncodingError):
+        negotiate_wire_encoding("xml")
+
+
+@pytest.mark.parametrize("encoding", list(WireEncoding))
+def test_frames_should_round_trip(encoding: WireEncoding):
+    data = {"type": "NotifyAboutAssetMutationServerMessage", "mutation": {"value": "zażółć", "path": [1, 2]}}
+
+    frame = encode_frame(data, encoding)
+
+    assert isinstance(frame, bytes if encoding == WireEncoding.MSGPACK else str)
+    assert decode_frame(frame, encoding) == data
+
+
+@pytest.mark.parametrize(
+    "frame, encoding",
+    [("{not json", WireEncoding.JSON), (b"\x93\x01", WireEncoding.MSGPACK), (b"{}", WireEncoding.JSON)],
+)
+def test_should_reject_malformed_frames(frame: str | bytes, encoding: WireEncoding):
+    with pytest.raises(MalformedFrameError):
+        decode_frame(frame, encoding)
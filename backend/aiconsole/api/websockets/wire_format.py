@@ -0,0 +1,80 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Encodings of websocket frames, negotiated by the client when connecting (/ws?encoding=msgpack).
+
+JSON frames are sent as text, msgpack frames as binary. Compression is left to the permessage-deflate
+websocket extension, which uvicorn accepts for every connection whose client offers it in the handshake.
+"""
+import json
+from enum import Enum
+from typing import Any
+
+try:
+    import msgpack
+except ModuleNotFoundError:
+    msgpack = None
+
+
+class WireEncoding(str, Enum):
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+class UnsupportedWireEncodingError(Exception):
+    pass
+
+
+class MalformedFrameError(Exception):
+    pass
+
+
+def negotiate_wire_encoding(requested: str | None) -> WireEncoding:
+    if not requested:
+        return WireEncoding.JSON
+
+    try:
+        encoding = WireEncoding(requested)
+    except ValueError:
+        raise UnsupportedWireEncodingError(f"Unknown encoding {requested}")
+
+    if encoding == WireEncoding.MSGPACK and msgpack is None:
+        raise UnsupportedWireEncodingError("msgpack encoding requires the msgpack package")
+
+    return encoding
+
+
+def encode_frame(data: Any, encoding: WireEncoding) -> str | bytes:
+    if encoding == WireEncoding.MSGPACK:
+        return msgpack.packb(data)
+
+    # Same as starlette's send_json
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_frame(frame: str | bytes, encoding: WireEncoding) -> Any:
+    try:
+        # Clients using msgpack may still send JSON text frames
+        if isinstance(frame, str):
+            return json.loads(frame)
+
+        if encoding != WireEncoding.MSGPACK:
+            raise MalformedFrameError(f"Binary frame on a {encoding.value} connection")
+
+        return msgpack.unpackb(frame)
+    except ValueError as e:
+        # Covers JSONDecodeError and all the msgpack unpacking errors
+        raise MalformedFrameError(f"Could not decode {encoding.value} frame: {e}") from e
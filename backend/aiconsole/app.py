@@ -24,8 +24,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from aiconsole.api.routers import app_router
 from aiconsole.consts import log_config
+from aiconsole.core.project import project
 from aiconsole.core.settings.fs.settings_file_storage import SettingsFileStorage
 from aiconsole.core.settings.settings import settings
+from aiconsole.utils.file_observer import file_watcher
 
 if "BE_SENTRY_DSN" in os.environ:
     sentry_sdk.init(
@@ -42,6 +44,12 @@ async def lifespan(app: FastAPI):
     settings().configure(SettingsFileStorage, project_path=None)
     yield
 
+    # Don't lose modifications still waiting for a deferred write
+    if project.is_project_initialized():
+        await project.get_project_assets().flush_all()
+
+    file_watcher().stop()
+
 
 def app():
     origin = os.getenv("CORS_ORIGIN", None)
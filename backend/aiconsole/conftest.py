@@ -0,0 +1,135 @@
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import pytest
+import pytest_asyncio
+
+from aiconsole.core.assets import aic_data_context
+from aiconsole.core.assets.assets_service import Assets
+from aiconsole.core.assets.types import Asset, AssetLocation
+from aiconsole.core.chat.actor_id import ActorId
+from aiconsole.core.chat.types import AICChat, AICMessage, AICMessageGroup, AICToolCall
+from aiconsole.core.project import project
+from fastmutation.mutations import AssetMutation
+
+
+class _InMemoryAssetsStorage:
+    def __init__(self, assets: list[Asset]):
+        self._assets: dict[str, list[Asset]] = defaultdict(list)
+        for asset in assets:
+            self._assets[asset.id].append(asset)
+
+    @property
+    def assets(self) -> dict[str, list[Asset]]:
+        return self._assets
+
+    async def update_asset(self, original_asset_id: str, updated_asset: Asset, scope: str | None = None) -> None:
+        pass
+
+    async def persist_mutations(self, asset: Asset, mutations: list[AssetMutation] | None) -> None:
+        pass
+
+    async def hydrate(self, asset_id: str) -> Asset | None:
+        assets = self._assets.get(asset_id)
+        return assets[0] if assets else None
+
+    def dehydrate(self, asset_id: str) -> None:
+        pass
+
+    def discard_in_memory(self, asset_id: str) -> None:
+        self._assets.pop(asset_id, None)
+
+    async def create_asset(self, asset: Asset) -> None:
+        self._assets[asset.id].append(asset)
+
+    async def delete_asset(self, asset_id: str) -> None:
+        del self._assets[asset_id]
+
+    async def setup(self) -> tuple[bool, Exception | None]:
+        return True, None
+
+    def destroy(self) -> None:
+        pass
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_chat_search_index():
+    """
+    Closes the search index of a project opened by the test, its sync task runs on the event loop of the test.
+    """
+    yield
+    await aic_data_context.close_chat_search_index()
+
+
+@pytest.fixture
+def project_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    An initialized project in an empty temporary directory, which is the working directory during the test.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(project, "_project_initialized", True)
+    return tmp_path
+
+
+@pytest.fixture
+def configure_project_assets(monkeypatch: pytest.MonkeyPatch) -> Callable[[list[Asset]], Awaitable[Assets]]:
+    """
+    Makes the given assets, kept in memory only, the assets of the project.
+    """
+
+    async def configure(assets: list[Asset]) -> Assets:
+        project_assets = Assets()
+        await project_assets.configure(_InMemoryAssetsStorage(assets))
+        monkeypatch.setattr(project, "_assets", project_assets)
+        return project_assets
+
+    return configure
+
+
+@pytest.fixture
+def make_chat() -> Callable[..., AICChat]:
+    """
+    Builds a chat of message groups with one message and one tool call each.
+    """
+
+    def make(chat_id: str, message_groups: int, tool_output: str = "") -> AICChat:
+        return AICChat(
+            id=chat_id,
+            name="Test chat",
+            usage="",
+            usage_examples=[],
+            defined_in=AssetLocation.PROJECT_DIR,
+            last_modified=datetime.now(),
+            override=False,
+            message_groups=[
+                AICMessageGroup(
+                    id=f"group-{i}",
+                    actor_id=ActorId(type="agent", id="assistant"),
+                    role="assistant",
+                    analysis="",
+                    task="",
+                    materials_ids=[],
+                    messages=[
+                        AICMessage(
+                            id=f"message-{i}",
+                            timestamp=datetime.now().isoformat(),
+                            content="Lorem ipsum dolor sit amet " * 20,
+                            tool_calls=[
+                                AICToolCall(
+                                    id=f"tool-call-{i}",
+                                    language="python",
+                                    code="print('hello')",
+                                    headline="",
+                                    output=tool_output,
+                                )
+                            ],
+                        )
+                    ],
+                )
+                for i in range(message_groups)
+            ],
+        )
+
+    return make
@@ -56,12 +56,76 @@ def AICONSOLE_USER_CONFIG_DIR() -> Path:
 
 HISTORY_LIMIT: int = 1000
 COMMANDS_HISTORY_JSON: str = "command_history.json"
+CHAT_INDEX_JSON: str = "chat_index.json"
+CHAT_SEARCH_INDEX_JSON: str = "chat_search_index.json"
 
 DIRECTOR_MIN_TOKENS: int = 250
 DIRECTOR_PREFERRED_TOKENS: int = 1000
 
 MAX_RECENT_PROJECTS = 8
 
+# Streamed appends to the same attribute are merged for this long (or up to this many characters)
+# before being sent to the clients
+MUTATION_COALESCING_WINDOW_SECONDS: float = float(os.environ.get("MUTATION_COALESCING_WINDOW_SECONDS", 0.03))
+MUTATION_COALESCING_MAX_BYTES: int = int(os.environ.get("MUTATION_COALESCING_MAX_BYTES", 4096))
+
+# Recent mutations kept per asset, for clients re-subscribing after a reconnect
+MUTATION_LOG_CAPACITY: int = int(os.environ.get("MUTATION_LOG_CAPACITY", 1000))
+
+# Tool outputs in windowed chat snapshots are cut to this many characters, the rest is fetched on demand
+CHAT_WINDOW_TOOL_OUTPUT_CHARS: int = int(os.environ.get("CHAT_WINDOW_TOOL_OUTPUT_CHARS", 2000))
+
+# Chats are loaded into memory when used, the least recently used ones without unsaved changes are dropped
+# from memory once the loaded chats take more than CHAT_CACHE_MAX_BYTES (roughly, in characters of their texts)
+# or there are more than CHAT_CACHE_MAX_CHATS of them. The CHAT_PREFETCH_COUNT most recent chats are loaded
+# in the background after a project is opened (0 - none)
+CHAT_CACHE_MAX_BYTES: int = int(os.environ.get("CHAT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+CHAT_CACHE_MAX_CHATS: int = int(os.environ.get("CHAT_CACHE_MAX_CHATS", 50))
+CHAT_PREFETCH_COUNT: int = int(os.environ.get("CHAT_PREFETCH_COUNT", 4))
+
+# Chat objects changed by mutations are indexed for search once their chat stops changing for this long
+CHAT_SEARCH_INDEX_DELAY_SECONDS: float = float(os.environ.get("CHAT_SEARCH_INDEX_DELAY_SECONDS", 1))
+
+# Waiting for a lock of a chat fails after LOCK_TIMEOUT_SECONDS, a lock whose holder neither mutates the chat
+# nor releases the lock for LOCK_LEASE_SECONDS is taken away from it (0 - never)
+LOCK_TIMEOUT_SECONDS: float = float(os.environ.get("LOCK_TIMEOUT_SECONDS", 30))
+LOCK_LEASE_SECONDS: float = float(os.environ.get("LOCK_LEASE_SECONDS", 0))
+
+# Assets modified by mutations are written to disk once they stop changing for this long,
+# but not less often than every ASSET_WRITE_MAX_DELAY_SECONDS
+ASSET_WRITE_DEBOUNCE_SECONDS: float = float(os.environ.get("ASSET_WRITE_DEBOUNCE_SECONDS", 0.5))
+ASSET_WRITE_MAX_DELAY_SECONDS: float = float(os.environ.get("ASSET_WRITE_MAX_DELAY_SECONDS", 2))
+
+# "snapshot" rewrites the whole chat file on every write, "journal" appends mutations to chats/<id>.journal
+# and folds the journal into the chat file once it grows over CHAT_JOURNAL_COMPACTION_BYTES
+CHAT_STORAGE_MODE: str = os.environ.get("CHAT_STORAGE_MODE", "snapshot")
+CHAT_JOURNAL_COMPACTION_BYTES: int = int(os.environ.get("CHAT_JOURNAL_COMPACTION_BYTES", 1024 * 1024))
+
+# Chat files taking at least this many bytes are written gzip compressed, under the same name (0 - never).
+# Off by default, versions of the app from before cannot read compressed chats
+CHAT_COMPRESSION_MIN_BYTES: int = int(os.environ.get("CHAT_COMPRESSION_MIN_BYTES", 0))
+
+# Changes to watched files (assets, settings) are reloaded in batches, once the files did not change for this long
+FILE_WATCHER_DEBOUNCE_SECONDS: float = float(os.environ.get("FILE_WATCHER_DEBOUNCE_SECONDS", 1))
+
+# Blobs (.aic/blobs/) no chat refers to are removed when a project is opened, at most this often (0 - never)
+BLOB_GC_INTERVAL_SECONDS: float = float(os.environ.get("BLOB_GC_INTERVAL_SECONDS", 24 * 60 * 60))
+
+# "files" keeps the assets of a project in its folders (chats/, agents/, materials/, users/), "sqlite" keeps them
+# in .aic/ASSETS_DB, see aiconsole.core.assets.sqlite.import_export for moving a project between the two
+ASSETS_STORAGE: str = os.environ.get("ASSETS_STORAGE", "files")
+ASSETS_DB: str = "assets.db"
+
+# Messages waiting to be sent to a websocket client, when a slow client lets more pile up "resync" drops them
+# and tells the client to subscribe again, "disconnect" closes the connection
+WEBSOCKET_SEND_QUEUE_SIZE: int = int(os.environ.get("WEBSOCKET_SEND_QUEUE_SIZE", 1000))
+WEBSOCKET_SEND_QUEUE_OVERFLOW: str = os.environ.get("WEBSOCKET_SEND_QUEUE_OVERFLOW", "resync")
+
+# Idle connections get a heartbeat this often, connections which can't send a message for
+# WEBSOCKET_SEND_TIMEOUT_SECONDS are considered dead and closed
+WEBSOCKET_HEARTBEAT_SECONDS: float = float(os.environ.get("WEBSOCKET_HEARTBEAT_SECONDS", 15))
+WEBSOCKET_SEND_TIMEOUT_SECONDS: float = float(os.environ.get("WEBSOCKET_SEND_TIMEOUT_SECONDS", 30))
+
 DIRECTOR_AGENT_ID = "director"
 
 LOG_FORMAT: str = "{name} {funcName} {message}"
@@ -1,37 +1,184 @@
 import asyncio
 import logging
+import weakref
 from collections import defaultdict, deque
-from typing import Any, Callable, Deque, Tuple, Type, cast, overload
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Deque, Tuple, Type, cast, overload
 
 from aiconsole.api.websockets.connection_manager import (
     AICConnection,
     connection_manager,
 )
 from aiconsole.api.websockets.server_messages import (
+    MutationsAppliedServerMessage,
     NotifyAboutAssetMutationServerMessage,
+    NotifyAboutAssetMutationsServerMessage,
+)
+from aiconsole.consts import (
+    CHAT_CACHE_MAX_BYTES,
+    CHAT_CACHE_MAX_CHATS,
+    CHAT_SEARCH_INDEX_DELAY_SECONDS,
+    LOCK_LEASE_SECONDS,
+    LOCK_TIMEOUT_SECONDS,
+    MUTATION_COALESCING_MAX_BYTES,
+    MUTATION_COALESCING_WINDOW_SECONDS,
+    MUTATION_LOG_CAPACITY,
 )
 from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.assets_service import AssetsUpdatedEvent
+from aiconsole.core.assets.chat_cache import (
+    ChatCache,
+    estimate_chat_size,
+    estimate_mutation_size,
+)
 from aiconsole.core.assets.materials.material import AICMaterial
+from aiconsole.core.assets.types import Asset, AssetType
 from aiconsole.core.assets.users.users import AICUserProfile
+from aiconsole.core.chat.chat_search_index import ChatSearchIndex, sync_chats
 from aiconsole.core.chat.root import Root
 from aiconsole.core.chat.types import AICChat, AICMessage, AICMessageGroup, AICToolCall
 from aiconsole.core.project.project import get_project_assets
+from aiconsole.utils.events import internal_events
 from fastmutation.apply_mutation import apply_mutation
+from fastmutation.coalescing import MutationCoalescer
 from fastmutation.data_context import DataContext
+from fastmutation.lock_manager import LockManager, LockNotHeldError
+from fastmutation.mutation_log import LoggedMutation, MutationLog
 from fastmutation.mutations import AssetMutation
+from fastmutation.object_index import ObjectIndex
 from fastmutation.types import AnyRef, BaseObject, CollectionRef, ObjectRef
 
 _log = logging.getLogger(__name__)
 
 
-def create_set_event() -> asyncio.Event:
-    e = asyncio.Event()
-    e.set()
-    return e
+# Locks of refs acquired by clients and agents for the duration of an edit or a run
+_lock_manager = LockManager(timeout=LOCK_TIMEOUT_SECONDS, lease=LOCK_LEASE_SECONDS or None)
+
+# Mutations, releases and writes of one asset are serialised, different assets (chats) proceed in parallel.
+# The lock of an asset is forgotten as soon as nobody holds or waits for it.
+_asset_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+_mutation_log = MutationLog(capacity=MUTATION_LOG_CAPACITY)
+_logged_assets: dict[str, weakref.ref] = {}
+
+
+def _mutation_log_channel(asset_id: str) -> str:
+    asset = get_project_assets().get_asset(asset_id)
+    logged = _logged_assets.get(asset_id)
+
+    # Assets are replaced on reload, mutations logged for a previous instance do not lead to the current one
+    if logged is None or logged() is not asset:
+        _mutation_log.reset(asset_id)
+
+        if asset is not None:
+            _logged_assets[asset_id] = weakref.ref(asset)
+        else:
+            _logged_assets.pop(asset_id, None)
+
+    return asset_id
+
+
+def _record_mutations(asset_id: str, mutations: list[AssetMutation], request_id: str) -> LoggedMutation:
+    """
+    Logs applied mutations for clients which resync and marks the changed chat objects for the search index.
+    Returns the last logged mutation.
+    """
+    channel = _mutation_log_channel(asset_id)
+    logged = [_mutation_log.record(channel, mutation, request_id) for mutation in mutations]
+
+    if _chat_search_index is not None:
+        for mutation in mutations:
+            _chat_search_index.mutated(asset_id, mutation)
+
+    return logged[-1]
+
+
+async def _send_mutation_notification(mutation: AssetMutation, meta: tuple[str, AICConnection | None]) -> None:
+    request_id, origin = meta
+    asset_id = _asset_id_of(mutation.ref)
+    logged = _record_mutations(asset_id, [mutation], request_id)
+
+    await connection_manager().send_to_ref(
+        NotifyAboutAssetMutationServerMessage(
+            request_id=request_id,
+            mutation=mutation,
+            seq=logged.seq,
+        ),
+        mutation.ref,
+        except_connection=origin,
+    )
+
+    if origin is not None:
+        await origin.send(MutationsAppliedServerMessage(request_id=request_id, asset_id=asset_id, seq=logged.seq))
+
+
+_coalescer = MutationCoalescer(
+    emit=_send_mutation_notification,
+    window=MUTATION_COALESCING_WINDOW_SECONDS,
+    max_bytes=MUTATION_COALESCING_MAX_BYTES,
+)
+
+
+_object_indexes: dict[str, ObjectIndex] = {}
+
+
+def _object_index(asset: BaseObject) -> ObjectIndex:
+    index = _object_indexes.get(asset.id)
+
+    # Assets are replaced on reload, an index of a previous instance is useless
+    if index is None or index.root is not asset:
+        index = _object_indexes[asset.id] = ObjectIndex(asset)
+
+    return index
+
+
+def _existing_object_index(ref: AnyRef) -> ObjectIndex | None:
+    segments = ref.ref_segments
+    index = _object_indexes.get(segments[1]) if len(segments) > 1 else None
+
+    if index is None or index.root is not get_project_assets().get_asset(segments[1]):
+        return None
+
+    return index
+
+
+def _asset_id_of(ref: AnyRef) -> str:
+    segments = ref.ref_segments
+    return segments[1] if len(segments) > 1 else segments[0]
 
 
-_acquired_locks: dict[ObjectRef, asyncio.Event] = defaultdict(create_set_event)
-_lock = asyncio.Lock()
+def _lock_of_asset(asset_id: str) -> asyncio.Lock:
+    asset_lock = _asset_locks.get(asset_id)
+    if asset_lock is None:
+        asset_lock = _asset_locks[asset_id] = asyncio.Lock()
+    return asset_lock
+
+
+def _asset_lock(ref: AnyRef) -> asyncio.Lock:
+    return _lock_of_asset(_asset_id_of(ref))
+
+
+def _backup_asset(asset_id: str) -> BaseObject | None:
+    asset = get_project_assets().get_asset(asset_id)
+    return asset.model_copy(deep=True) if asset else None
+
+
+def _restore_asset(asset_id: str, backup: BaseObject | None) -> None:
+    """
+    Restores the state of an asset in place, so references to the asset instance stay valid.
+    """
+    _object_indexes.pop(asset_id, None)
+
+    # The asset did not exist before, it was created in memory only
+    if backup is None:
+        get_project_assets().discard_in_memory(asset_id)
+        return
+
+    asset = get_project_assets().get_asset(asset_id)
+    for name in type(backup).model_fields:
+        setattr(asset, name, getattr(backup, name))
 
 
 def _find_object(root: BaseObject, obj: ObjectRef) -> BaseObject | None:
@@ -55,12 +202,205 @@ def _find_collection(root: BaseObject, collection: CollectionRef):
     return cast(list[Any], getattr(base_object, collection.id, None))
 
 
-async def _wait_for_lock(ref: ObjectRef, lock_timeout=30) -> None:
-    try:
-        _log.debug(f"Waiting for lock {ref}")
-        await asyncio.wait_for(_acquired_locks[ref].wait(), timeout=lock_timeout)
-    except asyncio.TimeoutError:
-        raise Exception(f"Lock acquisition timed out for {ref}")
+def lock_manager() -> LockManager:
+    return _lock_manager
+
+
+_chat_cache = ChatCache(max_bytes=CHAT_CACHE_MAX_BYTES, max_chats=CHAT_CACHE_MAX_CHATS)
+_prefetch_task: asyncio.Task | None = None
+
+
+def chat_cache() -> ChatCache:
+    return _chat_cache
+
+
+def _is_chat_in_use(asset_id: str) -> bool:
+    asset_lock = _asset_locks.get(asset_id)
+    if asset_lock is not None and asset_lock.locked():
+        return True
+
+    return any(holder.key.segments[1:2] == (asset_id,) for holder, _ in _lock_manager.holders())
+
+
+def _evict_chats() -> None:
+    assets = get_project_assets()
+
+    for asset_id in _chat_cache.eviction_candidates():
+        if not _chat_cache.is_over_budget:
+            return
+
+        asset = assets.get_asset(asset_id)
+        if not isinstance(asset, AICChat):
+            # Reloaded or deleted meanwhile, nothing to drop
+            _chat_cache.remove(asset_id)
+            continue
+
+        if assets.is_dirty(asset_id) or _is_chat_in_use(asset_id):
+            continue
+
+        assets.dehydrate(asset_id)
+        _chat_cache.remove(asset_id)
+        _object_indexes.pop(asset_id, None)
+        _chat_cache.stats.evictions += 1
+
+
+async def hydrated_asset(asset_id: str) -> Asset | None:
+    """
+    Returns the whole asset, loading it if only its headline is in memory.
+    Loading a chat may drop other chats from memory, to keep the loaded ones within the budget.
+    """
+    assets = get_project_assets()
+    asset = assets.get_asset(asset_id)
+
+    if asset is None or asset.type != AssetType.CHAT:
+        return asset
+
+    if isinstance(asset, AICChat):
+        _chat_cache.stats.hits += 1
+    else:
+        _chat_cache.stats.misses += 1
+        asset = await assets.hydrate(asset_id)
+        if not isinstance(asset, AICChat):
+            return asset
+
+    # The whole chat is measured only when it starts being tracked, mutations add to its size afterwards
+    if not _chat_cache.touch(asset_id):
+        _chat_cache.add(asset_id, estimate_chat_size(asset))
+    if _chat_cache.is_over_budget:
+        _evict_chats()
+
+    return asset
+
+
+def prefetch_recent_chats(count: int) -> None:
+    """
+    Loads the count most recently modified chats in the background, so opening them does not wait for a load.
+    """
+    global _prefetch_task
+
+    if _prefetch_task is not None:
+        _prefetch_task.cancel()
+
+    _prefetch_task = asyncio.create_task(_prefetch_recent_chats(count)) if count > 0 else None
+
+
+async def _prefetch_recent_chats(count: int) -> None:
+    chats = [assets[0] for assets in get_project_assets().unified_assets.values() if assets]
+    chats = [chat for chat in chats if chat.type == AssetType.CHAT]
+    chats.sort(key=lambda chat: chat.last_modified, reverse=True)
+
+    for chat in chats[:count]:
+        try:
+            await hydrated_asset(chat.id)
+        except Exception as e:
+            _log.warning(f"Failed to prefetch chat {chat.id}: {e}")
+
+
+async def read_chat(asset_id: str) -> AICChat | None:
+    """
+    Returns the whole chat without keeping it in memory, unless it already was or got used meanwhile.
+    """
+    assets = get_project_assets()
+    asset = assets.get_asset(asset_id)
+
+    if asset is None or asset.type != AssetType.CHAT or isinstance(asset, AICChat):
+        return asset if isinstance(asset, AICChat) else None
+
+    chat = await assets.hydrate(asset_id)
+
+    if isinstance(chat, AICChat) and asset_id not in _chat_cache and not _is_chat_in_use(asset_id):
+        assets.dehydrate(asset_id)
+
+    return chat if isinstance(chat, AICChat) else None
+
+
+_chat_search_index: ChatSearchIndex | None = None
+_chat_search_sync_task: asyncio.Task | None = None
+_chat_search_sync_requested = False
+
+
+def chat_search_index() -> ChatSearchIndex | None:
+    return _chat_search_index
+
+
+async def open_chat_search_index(index_file_path: Path) -> None:
+    """
+    Loads the search index of the project in the background and brings it up to date with its chats.
+    """
+    global _chat_search_index
+
+    await close_chat_search_index()
+
+    _chat_search_index = ChatSearchIndex(
+        index_file_path,
+        get_chat=lambda asset_id: get_project_assets().get_asset(asset_id),
+        update_delay=CHAT_SEARCH_INDEX_DELAY_SECONDS,
+    )
+    internal_events().subscribe(AssetsUpdatedEvent, _sync_chat_search_index_on_update)
+    sync_chat_search_index()
+
+
+async def close_chat_search_index() -> None:
+    global _chat_search_index, _chat_search_sync_task
+
+    if _chat_search_index is None:
+        return
+
+    internal_events().unsubscribe(AssetsUpdatedEvent, _sync_chat_search_index_on_update)
+
+    task, _chat_search_sync_task = _chat_search_sync_task, None
+    if task is not None and not task.done():
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    _chat_search_index.close()
+    _chat_search_index = None
+
+
+def sync_chat_search_index() -> None:
+    """
+    Indexes the chats which changed since they were indexed, in the background. Syncs requested while
+    a sync is running are done once it finishes.
+    """
+    global _chat_search_sync_task, _chat_search_sync_requested
+
+    if _chat_search_sync_task is not None and not _chat_search_sync_task.done():
+        _chat_search_sync_requested = True
+        return
+
+    _chat_search_sync_task = asyncio.create_task(_sync_chat_search_index())
+
+
+async def _sync_chat_search_index_on_update(event: AssetsUpdatedEvent) -> None:
+    sync_chat_search_index()
+
+
+async def _sync_chat_search_index() -> None:
+    global _chat_search_sync_requested
+
+    index = _chat_search_index
+    if index is None:
+        return
+
+    if not index.loaded:
+        await index.load()
+
+    while True:
+        _chat_search_sync_requested = False
+        chats = {
+            assets[0].id: assets[0].last_modified.timestamp()
+            for assets in get_project_assets().unified_assets.values()
+            if assets and assets[0].type == AssetType.CHAT
+        }
+
+        try:
+            await sync_chats(index, chats, read_chat)
+        except Exception as e:
+            _log.exception(f"Failed to sync the chat search index: {e}")
+
+        if not _chat_search_sync_requested:
+            return
 
 
 class AssetOperationManager:
@@ -83,26 +423,89 @@ class AICFileDataContext(DataContext):
         self.asset_operation_manager = AssetOperationManager()
 
     async def mutate(self, mutation: "AssetMutation", originating_from_server: bool) -> None:
-        async with _lock:
+        async with _asset_lock(mutation.ref):
+            self._renew_leases(_asset_id_of(mutation.ref))
+
             try:
                 await apply_mutation(self, mutation)
-                if mutation.ref not in _acquired_locks or (
-                    mutation.ref not in _acquired_locks and _acquired_locks[mutation.ref].is_set()
-                ):
+                _chat_cache.grow(_asset_id_of(mutation.ref), estimate_mutation_size(mutation))
+                if not _lock_manager.is_locked(mutation.ref.key):
                     await self.asset_operation_manager.execute_operations()
             except Exception as e:
                 _log.exception(f"Error during mutation: {e}")
                 raise e
 
-            await connection_manager().send_to_ref(
-                NotifyAboutAssetMutationServerMessage(
-                    request_id=self.lock_id,
-                    mutation=mutation,
-                ),
-                mutation.ref,
-                except_connection=None if originating_from_server else self.origin,
+            await _coalescer.push(
+                _asset_id_of(mutation.ref),
+                mutation,
+                meta=(self.lock_id, None if originating_from_server else self.origin),
             )
 
+    async def mutate_batch(self, mutations: list[AssetMutation], originating_from_server: bool) -> None:
+        """
+        Applies the mutations atomically, if any of them fails the modified assets are restored.
+        Every modified asset is written once and its subscribers get one notification with all of its mutations.
+        """
+        mutations_by_asset: dict[str, list[AssetMutation]] = defaultdict(list)
+        for mutation in mutations:
+            mutations_by_asset[_asset_id_of(mutation.ref)].append(mutation)
+
+        asset_ids = sorted(mutations_by_asset.keys())
+
+        async with AsyncExitStack() as stack:
+            # Locks are always taken in the same order, so two batches can not deadlock
+            for asset_id in asset_ids:
+                await stack.enter_async_context(_lock_of_asset(asset_id))
+
+            # The assets are locked, so they are not dropped from memory until the batch is done
+            for asset_id in asset_ids:
+                await hydrated_asset(asset_id)
+
+            for asset_id in asset_ids:
+                self._renew_leases(asset_id)
+
+            backups = {asset_id: _backup_asset(asset_id) for asset_id in asset_ids}
+
+            try:
+                for mutation in mutations:
+                    await apply_mutation(self, mutation)
+            except Exception as e:
+                self.asset_operation_manager.operations.clear()
+                for asset_id, backup in backups.items():
+                    _restore_asset(asset_id, backup)
+
+                _log.exception(f"Error during batch of mutations, rolled back: {e}")
+                raise e
+
+            for mutation in mutations:
+                _chat_cache.grow(_asset_id_of(mutation.ref), estimate_mutation_size(mutation))
+
+            await self.asset_operation_manager.execute_operations()
+
+            for asset_id in asset_ids:
+                await get_project_assets().flush(asset_id)
+
+                asset_mutations = mutations_by_asset[asset_id]
+
+                async def notify():
+                    seq = _record_mutations(asset_id, asset_mutations, self.lock_id).seq
+                    origin = None if originating_from_server else self.origin
+
+                    await connection_manager().send_to_any_ref(
+                        NotifyAboutAssetMutationsServerMessage(
+                            request_id=self.lock_id, mutations=asset_mutations, seq=seq
+                        ),
+                        [mutation.ref for mutation in asset_mutations],
+                        except_connection=origin,
+                    )
+
+                    if origin is not None:
+                        await origin.send(
+                            MutationsAppliedServerMessage(request_id=self.lock_id, asset_id=asset_id, seq=seq)
+                        )
+
+                await _coalescer.emit_in_order(asset_id, notify)
+
         # HANDLE DELETE
 
         # Remove message group if it's empty
@@ -127,32 +530,61 @@ class AICFileDataContext(DataContext):
         # else:
         #    message_group.role = "assistant"
 
+    @asynccontextmanager
+    async def mutation_stream_position(self, ref: ObjectRef) -> AsyncIterator[tuple[str, int]]:
+        """
+        Holds off mutations of the asset of ref and yields the stream id and the sequence number
+        of its last mutation sent to subscribers, so a snapshot sent meanwhile is exactly at that position.
+        """
+        asset_id = _asset_id_of(ref)
+
+        async with _asset_lock(ref):
+            await _coalescer.flush(asset_id)
+            yield _mutation_log.stream_id, _mutation_log.last_seq(_mutation_log_channel(asset_id))
+
+    def mutations_since(self, ref: ObjectRef, stream_id: str, seq: int) -> list[LoggedMutation] | None:
+        """
+        Mutations of the asset of ref sent after the given position, None if they are not all known anymore.
+        """
+        if stream_id != _mutation_log.stream_id:
+            return None
+
+        return _mutation_log.since(_mutation_log_channel(_asset_id_of(ref)), seq)
+
     async def acquire_lock(self, ref: ObjectRef):
         _log.debug(f"[Lock] Acquiring {ref} {self.lock_id}")
 
-        if ref in _acquired_locks:
-            await _wait_for_lock(ref)
+        origin = self.origin
+
+        def lease_expired():
+            if origin:
+                origin.lock_released(ref=ref, request_id=self.lock_id)
 
-        _acquired_locks[ref].clear()
+        await _lock_manager.acquire(ref.key, self.lock_id, on_expired=lease_expired)
 
-        if self.origin:
-            self.origin.lock_acquired(ref=ref, request_id=self.lock_id)
+        if origin:
+            origin.lock_acquired(ref=ref, request_id=self.lock_id)
 
     async def release_lock(self, ref: ObjectRef):
         _log.debug(f"[Lock] Releasing {ref} {self.lock_id}")
 
-        async with _lock:
-            obj = await self.get(ref)
-            if obj and ref in _acquired_locks:
-                _acquired_locks[ref].set()
-                del _acquired_locks[ref]
+        async with _asset_lock(ref):
+            await _coalescer.flush(_asset_id_of(ref))
 
-                if self.origin:
-                    self.origin.lock_released(ref=ref, request_id=self.lock_id)
+            if await self.get(ref) is None:
+                raise LockNotHeldError(f"Lock {ref} is not acquired by {self.lock_id}")
 
-                await self.asset_operation_manager.execute_operations()
-            else:
-                raise Exception(f"Lock {ref} is not acquired by {self.lock_id}")
+            # Not released if its lease expired, what was changed while holding it is still written
+            if _lock_manager.release(ref.key, self.lock_id) and self.origin:
+                self.origin.lock_released(ref=ref, request_id=self.lock_id)
+
+            await self.asset_operation_manager.execute_operations()
+            await get_project_assets().flush(_asset_id_of(ref))
+
+    def _renew_leases(self, asset_id: str) -> None:
+        for holder, _ in _lock_manager.holders():
+            if holder.owner == self.lock_id and holder.lease and holder.key.segments[1:2] == (asset_id,):
+                _lock_manager.renew(holder.key, self.lock_id)
 
     @overload
     async def get(self, ref: ObjectRef) -> "BaseObject | None":  # fmt: off
@@ -163,40 +595,36 @@ class AICFileDataContext(DataContext):
         ...
 
     async def get(self, ref: "AnyRef") -> "BaseObject | list[BaseObject] | None":
-        obj: BaseObject | None = Root(id="root", assets=[])
-
         segments = ref.ref_segments
 
         if not segments:
-            return obj
+            return Root(id="root", assets=[])
+
+        if segments[0] != "assets":
+            raise Exception(f"Unknown ref type {ref}")
 
-        segment = segments.pop(0)
-        if segment == "assets":
-            if not segments:
-                return cast(list[BaseObject], get_project_assets().unified_assets)
-            # Get the object from the assets collection
-            segment = segments.pop(0)
-            obj = get_project_assets().get_asset(segment)
+        if len(segments) == 1:
+            return cast(list[BaseObject], get_project_assets().unified_assets)
 
-            if obj is None or not segments:
-                return obj
+        # Get the object from the assets collection
+        asset = await hydrated_asset(segments[1])
 
-            while True:
-                # Get the sub collection
-                segment = segments.pop(0)
-                col = cast(list[BaseObject], getattr(obj, segment))
+        if asset is None or len(segments) == 2:
+            return asset
 
-                if col is None or not segments:
-                    return col
+        return _object_index(asset).resolve(segments[2:])
 
-                # Get the object from the sub collection
-                segment = segments.pop(0)
-                obj = next((x for x in col if x.id == segment), None)
+    def object_created(self, ref: ObjectRef, obj: BaseObject) -> None:
+        if index := _existing_object_index(ref):
+            index.on_created(ref.ref_segments[2:], obj)
 
-                if obj is None or not segments:
-                    return obj
-        else:
-            raise Exception(f"Unknown ref type {ref}")
+    def object_deleted(self, ref: ObjectRef) -> None:
+        if index := _existing_object_index(ref):
+            index.on_deleted(ref.ref_segments[2:])
+
+    def value_set(self, ref: ObjectRef, key: str) -> None:
+        if index := _existing_object_index(ref):
+            index.on_value_set(ref.ref_segments[2:], key)
 
     async def exists(self, ref: "AnyRef") -> bool:
         return await self.get(ref) is not None
@@ -3,19 +3,25 @@ from dataclasses import dataclass
 from functools import lru_cache
 
 from aiconsole.api.websockets.server_messages import AssetsUpdatedServerMessage
+from aiconsole.consts import ASSET_WRITE_DEBOUNCE_SECONDS, ASSET_WRITE_MAX_DELAY_SECONDS
 from aiconsole.core.assets.assets_storage import AssetsStorage
 from aiconsole.core.assets.types import Asset, AssetLocation, AssetType
+from aiconsole.core.assets.write_behind import WriteBehindQueue, WriteBehindStats
 from aiconsole.core.settings.settings import settings
 from aiconsole.utils.events import InternalEvent, internal_events
 from aiconsole.utils.notifications import Notifications
 from aiconsole_toolkit.settings.partial_settings_data import PartialSettingsData
+from fastmutation.mutations import AssetMutation
 
 _log = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True, slots=True)
 class AssetsUpdatedEvent(InternalEvent):
-    pass
+    # Ids of the added, changed and removed assets, None if any asset may have changed
+    asset_ids: frozenset[str] | None = None
+    # Changed by someone else than the server, e.g. edited in the project folder
+    external: bool = False
 
 
 class AssetsAlreadyConfiguredError(Exception):
@@ -29,6 +35,7 @@ class AssetsCleanUpBeforeConfigurationError(Exception):
 class Assets:
     _storage: AssetsStorage | None = None
     _notifications: Notifications | None = None
+    _write_behind: WriteBehindQueue | None = None
 
     async def configure(self, storage: AssetsStorage) -> None:
         """
@@ -45,6 +52,11 @@ class Assets:
         await storage.setup()
         self._storage = storage
         self._notifications = Notifications()
+        self._write_behind = WriteBehindQueue(
+            write=self._write_dirty_asset,
+            debounce=ASSET_WRITE_DEBOUNCE_SECONDS,
+            max_delay=ASSET_WRITE_MAX_DELAY_SECONDS,
+        )
 
         internal_events().subscribe(
             AssetsUpdatedEvent,
@@ -100,6 +112,7 @@ class Assets:
     def clean_up(self) -> None:
         """
         Cleans up resources used by the assets, such as storage and notifications.
+        Pending deferred writes are dropped, call `flush_all` before to keep them.
         """
         if not self.is_configured:
             raise AssetsCleanUpBeforeConfigurationError
@@ -108,17 +121,18 @@ class Assets:
 
         self._storage = None
         self._notifications = None
+        self._write_behind = None
 
         internal_events().unsubscribe(
             AssetsUpdatedEvent,
             self._when_reloaded,
         )
 
-    async def _when_reloaded(self, AssetsUpdatedEvent) -> None:
+    async def _when_reloaded(self, event: AssetsUpdatedEvent) -> None:
         """
         Handles the assets updated event asynchronously.
 
-        :param AssetsUpdatedEvent: The event indicating that assets have been updated.
+        :param event: The event indicating that assets have been updated.
         """
         if not self._storage or not self._notifications:
             _log.error("Assets not configured.")
@@ -126,8 +140,9 @@ class Assets:
 
         await self._notifications.notify(
             AssetsUpdatedServerMessage(
-                initial=self._notifications.to_suppress,
+                initial=not event.external,
                 count=len(self.unified_assets),
+                asset_ids=sorted(event.asset_ids) if event.asset_ids is not None else None,
             )
         )
 
@@ -149,13 +164,45 @@ class Assets:
 
         return None
 
-    # TODO: Why do we need to suppress for all or maybe supress to a specific connection
+    async def hydrate(self, asset_id: str) -> Asset | None:
+        """
+        Returns the whole asset, loading it if only its headline is in memory (chats are loaded on demand).
+        """
+        if not self._storage or not self._notifications:
+            _log.error("Assets not configured.")
+            raise ValueError("Assets not configured")
+
+        return await self._storage.hydrate(asset_id)
+
+    def dehydrate(self, asset_id: str) -> None:
+        """
+        Drops the whole asset from memory, leaving just its headline. Assets with pending writes are kept.
+        """
+        if not self._storage or not self._notifications:
+            _log.error("Assets not configured.")
+            raise ValueError("Assets not configured")
+
+        if not self.is_dirty(asset_id):
+            self._storage.dehydrate(asset_id)
+
+    def discard_in_memory(self, asset_id: str) -> None:
+        """
+        Forgets an asset which exists in memory only, e.g. created by a mutation which was rolled back.
+        """
+        if not self._storage or not self._notifications:
+            _log.error("Assets not configured.")
+            raise ValueError("Assets not configured")
+
+        self._storage.discard_in_memory(asset_id)
+
+    def is_dirty(self, asset_id: str) -> bool:
+        return self._write_behind is not None and self._write_behind.pending(asset_id) is not None
+
     async def create_asset(self, asset: Asset) -> None:
         if not self._storage or not self._notifications:
             _log.error("Assets not configured.")
             raise ValueError("Assets not configured")
 
-        self._notifications.suppress_next_notification()
         await self._storage.create_asset(asset)
 
     async def update_asset(self, original_asset_id: str, updated_asset: Asset, scope: str | None = None):
@@ -163,7 +210,13 @@ class Assets:
             _log.error("Assets not configured.")
             raise ValueError("Assets not configured")
 
-        self._notifications.suppress_next_notification()
+        # Keep the order of writes, unless this very instance is about to be written anyway
+        if self._write_behind:
+            if self._write_behind.pending(original_asset_id) is updated_asset and scope is None:
+                self._write_behind.discard(original_asset_id)
+            else:
+                await self._write_behind.flush(original_asset_id)
+
         await self._storage.update_asset(original_asset_id, updated_asset, scope)
 
         if original_asset_id != updated_asset.id:
@@ -173,12 +226,52 @@ class Assets:
             )
             settings().save(partial_settings, to_global=False)
 
+    async def mark_dirty(self, asset: Asset, mutation: AssetMutation | None = None) -> None:
+        """
+        Schedules a deferred write of an asset that was modified in memory, e.g. by a mutation.
+
+        :param asset: The modified asset instance.
+        :param mutation: The mutation which modified the asset, if any, lets the storage persist just the change.
+        """
+        if not self._write_behind:
+            _log.error("Assets not configured.")
+            raise ValueError("Assets not configured")
+
+        self._write_behind.mark_dirty(asset, mutation)
+
+    async def flush(self, asset_id: str) -> None:
+        """
+        Writes a pending deferred write of the given asset right away.
+        """
+        if self._write_behind:
+            await self._write_behind.flush(asset_id)
+
+    async def flush_all(self) -> None:
+        """
+        Writes all pending deferred writes, used on lock release and before closing the project.
+        """
+        if self._write_behind:
+            await self._write_behind.flush_all()
+
+    @property
+    def write_behind_stats(self) -> WriteBehindStats | None:
+        return self._write_behind.stats if self._write_behind else None
+
+    async def _write_dirty_asset(self, asset: Asset, mutations: list[AssetMutation] | None) -> None:
+        if not self._storage or not self._notifications:
+            _log.error("Assets not configured.")
+            raise ValueError("Assets not configured")
+
+        await self._storage.persist_mutations(asset, mutations)
+
     async def delete_asset(self, asset_id: str) -> None:
         if not self._storage or not self._notifications:
             _log.error("Assets not configured.")
             raise ValueError("Assets not configured")
 
-        self._notifications.suppress_next_notification()
+        if self._write_behind:
+            self._write_behind.discard(asset_id)
+
         await self._storage.delete_asset(asset_id)
 
     def is_asset_enabled(self, asset_id: str) -> bool:
@@ -1,5 +1,7 @@
 from typing import Protocol
 
+from fastmutation.mutations import AssetMutation
+
 from .types import Asset
 
 
@@ -13,6 +15,30 @@ class AssetsStorage(Protocol):
     ) -> None:  # fmt: off
         ...
 
+    async def persist_mutations(self, asset: Asset, mutations: list[AssetMutation] | None) -> None:  # fmt: off
+        """
+        Persists an asset which was modified in memory by the mutations, all of it if mutations are None.
+        """
+        ...
+
+    async def hydrate(self, asset_id: str) -> Asset | None:  # fmt: off
+        """
+        Replaces a headline of an asset (e.g. a chat without its messages) with the whole asset and returns it.
+        """
+        ...
+
+    def dehydrate(self, asset_id: str) -> None:  # fmt: off
+        """
+        Replaces a whole asset with its headline, the asset must not have any changes waiting to be persisted.
+        """
+        ...
+
+    def discard_in_memory(self, asset_id: str) -> None:  # fmt: off
+        """
+        Forgets an asset which exists in memory only, e.g. created by a mutation which was rolled back.
+        """
+        ...
+
     async def create_asset(self, asset: Asset) -> None:  # fmt: off
         ...
 
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from aiconsole.core.chat.types import AICChat
+from fastmutation.mutations import (
+    AppendToStringMutation,
+    AssetMutation,
+    CreateMutation,
+    SetValueMutation,
+)
+
+
+@dataclass
+class ChatCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class ChatCache:
+    """
+    Order of use and estimated sizes of the chats hydrated in memory, with a budget of their total size and count.
+
+    It only tracks the chats, the owner decides which of the least recently used ones can be evicted
+    (e.g. not the ones with changes waiting to be written) and dehydrates them.
+    """
+
+    def __init__(self, max_bytes: int, max_chats: int):
+        self.max_bytes = max_bytes
+        self.max_chats = max_chats
+        self.total_bytes = 0
+        self.stats = ChatCacheStats()
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+
+    def __contains__(self, chat_id: str) -> bool:
+        return chat_id in self._sizes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def touch(self, chat_id: str) -> bool:
+        """
+        Marks the chat as the most recently used one, returns False if the chat is not tracked.
+        """
+        if chat_id not in self._sizes:
+            return False
+
+        self._sizes.move_to_end(chat_id)
+        return True
+
+    def add(self, chat_id: str, size: int) -> None:
+        """
+        Starts tracking the chat as the most recently used one.
+        """
+        self.remove(chat_id)
+        self._sizes[chat_id] = size
+        self.total_bytes += size
+
+    def grow(self, chat_id: str, size: int) -> None:
+        """
+        Adds to the size of a tracked chat, e.g. by the text a mutation added.
+        """
+        if chat_id in self._sizes:
+            self._sizes[chat_id] += size
+            self.total_bytes += size
+
+    def remove(self, chat_id: str) -> None:
+        size = self._sizes.pop(chat_id, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    @property
+    def is_over_budget(self) -> bool:
+        return self.total_bytes > self.max_bytes or len(self._sizes) > self.max_chats
+
+    def eviction_candidates(self) -> list[str]:
+        """
+        Chats from the least recently used one, except for the most recently used one.
+        """
+        return list(self._sizes)[:-1]
+
+
+def estimate_chat_size(chat: AICChat) -> int:
+    """
+    Rough size of a chat in memory, the length of its texts.
+    """
+    size = len(chat.name)
+
+    for group in chat.message_groups:
+        size += len(group.analysis) + len(group.task)
+        for message in group.messages:
+            size += len(message.content)
+            for tool_call in message.tool_calls:
+                size += len(tool_call.code) + len(tool_call.headline) + len(tool_call.output or "")
+
+    return size
+
+
+def estimate_mutation_size(mutation: AssetMutation) -> int:
+    """
+    Rough size a mutation adds to a chat in memory, the length of the texts it adds. Texts it replaces or deletes
+    are not subtracted, the size is estimated anew when the chat is hydrated again.
+    """
+    if isinstance(mutation, AppendToStringMutation):
+        return len(mutation.value)
+
+    if isinstance(mutation, SetValueMutation):
+        return len(mutation.value) if isinstance(mutation.value, str) else 0
+
+    if isinstance(mutation, CreateMutation):
+        return _estimate_value_size(mutation.object)
+
+    return 0
+
+
+def _estimate_value_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+
+    if isinstance(value, dict):
+        return sum(_estimate_value_size(item) for item in value.values())
+
+    if isinstance(value, list):
+        return sum(_estimate_value_size(item) for item in value)
+
+    return 0
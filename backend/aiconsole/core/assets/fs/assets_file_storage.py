@@ -1,17 +1,20 @@
-import json
+import asyncio
 import logging
 import os
 import shutil
 from collections import defaultdict
 from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 import aiofiles
 import aiofiles.os as async_os
 import rtoml
 from send2trash import send2trash
 
+from aiconsole.consts import CHAT_INDEX_JSON
 from aiconsole.core.assets.agents.agent import AICAgent
 from aiconsole.core.assets.assets_service import AssetsUpdatedEvent
 from aiconsole.core.assets.fs.exceptions import UserIsAnInvalidAgentIdError
@@ -19,17 +22,29 @@ from aiconsole.core.assets.fs.load_asset_from_fs import load_asset_from_fs
 from aiconsole.core.assets.materials.material import AICMaterial, MaterialContentType
 from aiconsole.core.assets.types import Asset, AssetLocation, AssetType
 from aiconsole.core.assets.users.users import AICUserProfile
+from aiconsole.core.chat.chat_index import ChatIndex, ChatIndexEntry
+from aiconsole.core.chat.chat_journal import (
+    append_to_chat_journal,
+    compact_chat_journal,
+    get_chat_journal_path,
+    read_chat_file_data,
+    write_chat_snapshot,
+)
 from aiconsole.core.chat.list_possible_historic_chat_ids import (
     list_possible_historic_chat_ids,
 )
 from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.core.chat.types import AICChat, AICChatHeadline
 from aiconsole.core.project.paths import (
+    get_aic_directory,
     get_core_assets_directory,
     get_project_assets_directory,
 )
+from aiconsole.utils.atomic_write import write_text_atomically
 from aiconsole.utils.events import InternalEvent, internal_events
-from aiconsole.utils.file_observer import FileObserver
+from aiconsole.utils.file_observer import FileObserver, own_file_writes
 from aiconsole.utils.list_files_in_file_system import list_files_in_file_system
+from fastmutation.mutations import AssetMutation
 
 _log = logging.getLogger(__name__)
 
@@ -44,6 +59,63 @@ class AssetDoesNotExisitErrorEvent(InternalEvent):
     pass
 
 
+class ChatStorageMode(str, Enum):
+    SNAPSHOT = "snapshot"
+    JOURNAL = "journal"
+
+
+def _make_sure_starts_and_ends_with_newline(s: str) -> str:
+    if not s.startswith("\n"):
+        s = "\n" + s
+
+    if not s.endswith("\n"):
+        s = s + "\n"
+
+    return s
+
+
+def asset_toml_data(asset: Asset) -> dict[str, Any]:
+    """
+    Contents of the .toml file of an asset which is not a chat.
+    """
+    toml_data: dict[str, Any] = {
+        "name": asset.name,
+        "version": asset.version,
+        "usage": asset.usage,
+        "usage_examples": asset.usage_examples,
+        "enabled_by_default": asset.enabled_by_default,
+    }
+
+    if isinstance(asset, AICMaterial):
+        toml_data["content_type"] = asset.content_type.value
+        content_key = {
+            MaterialContentType.STATIC_TEXT: "content_static_text",
+            MaterialContentType.DYNAMIC_TEXT: "content_dynamic_text",
+            MaterialContentType.API: "content_api",
+        }[asset.content_type]
+        toml_data[content_key] = _make_sure_starts_and_ends_with_newline(asset.content)
+
+    if isinstance(asset, AICAgent):
+        toml_data.update(
+            {
+                "system": asset.system,
+                "gpt_mode": str(asset.gpt_mode),
+                "execution_mode": asset.execution_mode,
+                "execution_mode_params_values": asset.execution_mode_params_values,
+            }
+        )
+
+    if isinstance(asset, AICUserProfile):
+        toml_data.update(
+            {
+                "display_name": asset.display_name,
+                "profile_picture": asset.profile_picture,
+            }
+        )
+
+    return toml_data
+
+
 # TODO: Check if CRUD operations need to modify _assets or are reloaded with each modification
 class AssetsFileStorage:
     paths: list[Path]
@@ -53,9 +125,19 @@ class AssetsFileStorage:
         self,
         paths: list[Path],
         disable_observer: bool = False,
+        chat_storage_mode: ChatStorageMode = ChatStorageMode.SNAPSHOT,
+        chat_journal_compaction_bytes: int = 1024 * 1024,
+        chat_compression_min_bytes: int = 0,
     ):
         self.paths = paths
+        self.chat_storage_mode = chat_storage_mode
+        self.chat_journal_compaction_bytes = chat_journal_compaction_bytes
+        self.chat_compression_min_bytes = chat_compression_min_bytes
         self._assets: dict[str, list[Asset]] = defaultdict(list)
+        # Writes of a chat file and its journal must not interleave
+        self._chat_file_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._compactions: dict[str, asyncio.Task] = {}
+        self._chat_index = ChatIndex(get_aic_directory(paths[0]) / CHAT_INDEX_JSON)
 
         if not disable_observer:
             self._observer = FileObserver()
@@ -69,21 +151,131 @@ class AssetsFileStorage:
                 for path in self.paths:
                     self._get_asset_folder_path(asset_type, path).mkdir(parents=True, exist_ok=True)
 
+            self._chat_index.load()
             await self._load_assets()
             # FIXME: seems like between loading and spawning observer smth can happen
             if self._observer:
-                self._observer.start(file_paths=self.paths, on_changed=self._reload)
+                self._observer.start(
+                    file_paths=[
+                        self._get_asset_folder_path(asset_type, path)
+                        for path in self.paths
+                        for asset_type in AssetType
+                    ],
+                    on_changed=self._reload,
+                    extensions=(".toml", ".json", ".journal"),
+                )
 
             return True, None
         except Exception as e:
             _log.exception(f"[{self.__class__.__name__}] Failed to setup: \n{e}")
             return False, e
 
-    async def _reload(self) -> None:
-        await self._load_assets()
-        await internal_events().emit(AssetsUpdatedEvent())
+    async def _reload(self, changed_paths: set[Path] | None = None) -> None:
+        """
+        Reloads the assets stored in the changed files, or all assets if it's not known which files changed.
+        """
+        if changed_paths is None:
+            await self._load_assets()
+            await internal_events().emit(AssetsUpdatedEvent(external=True))
+            return
+
+        changed_assets = {asset for path in changed_paths if (asset := self._asset_of_path(path)) is not None}
+        if not changed_assets:
+            return
+
+        for asset_type, asset_id in changed_assets:
+            await self._reload_asset(asset_type, asset_id)
+
+        await internal_events().emit(
+            AssetsUpdatedEvent(asset_ids=frozenset(asset_id for _, asset_id in changed_assets), external=True)
+        )
+
+    def _record_own_writes(self, asset_type: AssetType, *asset_ids: str) -> None:
+        """
+        Lets the observer leave out the files just written by the storage itself, see own_file_writes.
+        """
+        own_file_writes().record(
+            *(path for asset_id in asset_ids for path in self._get_asset_file_paths(asset_id, asset_type))
+        )
+
+    def _asset_of_path(self, path: Path) -> tuple[AssetType, str] | None:
+        """
+        Type and id of the project asset stored in the file, None if it's not a file of an asset.
+        """
+        if path.name.startswith("."):
+            return None
+
+        for asset_type in AssetType:
+            if path.parent.absolute() != self._get_asset_folder_path(asset_type, self.paths[0]).absolute():
+                continue
+
+            if asset_type == AssetType.CHAT:
+                # Chat ids have no dots, see list_possible_historic_chat_ids
+                return (asset_type, path.name.split(".")[0]) if path.suffix in (".json", ".journal") else None
+
+            return (asset_type, path.stem) if path.suffix == ".toml" else None
+
+        return None
+
+    async def _reload_asset(self, asset_type: AssetType, asset_id: str) -> None:
+        """
+        Loads the project asset again, adds it if it's new or drops it if its file is gone.
+        The assets of the same id defined elsewhere (e.g. in AIConsole itself) are kept as they are.
+        """
+        assets = self._assets.get(asset_id, [])
+        current = next(
+            (asset for asset in assets if asset.type == asset_type and asset.defined_in == AssetLocation.PROJECT_DIR),
+            None,
+        )
+        reloaded: Asset | None = None
+
+        if self._get_asset_file_path(asset_id, asset_type, self.paths[0]).exists():
+            try:
+                if asset_type == AssetType.CHAT:
+                    loaded_chat = current if isinstance(current, AICChat) else None
+                    reloaded = await self._load_chat_headline(asset_id, loaded_chat)
+                else:
+                    reloaded = await load_asset_from_fs(asset_type, asset_id, AssetLocation.PROJECT_DIR)
+            except Exception as e:
+                _log.exception(e)
+                await internal_events().emit(
+                    AssetLoadErrorEvent(), details=f"Error loading asset `{asset_id}`, error is `{e}`"
+                )
+        elif asset_type == AssetType.CHAT:
+            self._chat_index.remove(asset_id)
+
+        self._set_project_asset(asset_type, asset_id, reloaded)
+
+    def _set_project_asset(self, asset_type: AssetType, asset_id: str, asset: Asset | None) -> None:
+        """
+        Replaces the project asset in memory, removes it if asset is None.
+        The assets of the same id defined elsewhere (e.g. in AIConsole itself) are kept as they are.
+        """
+        assets = self._assets.get(asset_id, [])
+        current = next(
+            (other for other in assets if other.type == asset_type and other.defined_in == AssetLocation.PROJECT_DIR),
+            None,
+        )
+
+        # Assets of the project go first, as when all assets are loaded
+        assets = ([asset] if asset else []) + [other for other in assets if other is not current]
+
+        if assets:
+            self._assets[asset_id] = assets
+        else:
+            self._assets.pop(asset_id, None)
 
     def destroy(self) -> None:
+        # An interrupted compaction is harmless, the journal is folded again on the next one
+        for compaction in self._compactions.values():
+            compaction.cancel()
+
+        if self._chat_index.has_unsaved_changes:
+            try:
+                self._chat_index.save()
+            except OSError as e:
+                _log.warning(f"Failed to save the chat index: {e}")
+
         if self._observer:
             self._observer.stop()
             del self._observer
@@ -93,6 +285,38 @@ class AssetsFileStorage:
         return self._assets
 
     async def update_asset(self, original_asset_id: str, updated_asset: Asset, scope: str | None = None) -> None:
+        await self._write_asset(original_asset_id, updated_asset, scope)
+
+        if original_asset_id != updated_asset.id:
+            self._set_project_asset(updated_asset.type, original_asset_id, None)
+        self._set_project_asset(updated_asset.type, updated_asset.id, self._written_asset(updated_asset))
+
+        await internal_events().emit(AssetsUpdatedEvent(asset_ids=frozenset({original_asset_id, updated_asset.id})))
+
+    def _written_asset(self, asset: Asset) -> Asset:
+        """
+        The asset to keep in memory after writing it, without reading it back.
+        """
+        if asset.type != AssetType.CHAT:
+            # The fields load_asset_from_fs takes from the location of the file rather than from its content
+            file_path = self._get_asset_file_path(asset.id, asset.type, self.paths[0])
+            return asset.model_copy(
+                update={
+                    "defined_in": AssetLocation.PROJECT_DIR,
+                    "override": (get_core_assets_directory(asset.type) / file_path.name).exists(),
+                    "last_modified": datetime.fromtimestamp(file_path.stat().st_mtime),
+                }
+            )
+
+        # A loaded chat stays loaded, otherwise the written file (e.g. with just the name updated) is loaded
+        # when the chat is needed
+        loaded = next((other for other in self._assets.get(asset.id, []) if other is asset), None)
+        if loaded is not None:
+            return loaded
+
+        return self._chat_headline(asset.id, self._chat_index.entries[asset.id])
+
+    async def _write_asset(self, original_asset_id: str, updated_asset: Asset, scope: str | None = None) -> None:
         self._validate_asset(updated_asset, validation_scope="update")
 
         project_assets_directory_path = self._get_asset_folder_path(updated_asset.type, self.paths[0])
@@ -113,9 +337,9 @@ class AssetsFileStorage:
             update_last_modified = True
             new_content = updated_asset.model_dump(exclude={"id", "last_modified"})
 
-            if original_asset_file_path.exists():
-                async with aiofiles.open(original_asset_file_path, "r", encoding="utf8", errors="replace") as f:
-                    old_content = json.loads(await f.read())
+            async with self._chat_file_locks[updated_asset.id]:
+                if original_asset_file_path.exists():
+                    old_content = await read_chat_file_data(original_asset_file_path)
                     if scope == "chat_options" and (
                         "chat_options" not in old_content or old_content["chat_options"] != new_content["chat_options"]
                     ):
@@ -139,8 +363,10 @@ class AssetsFileStorage:
                         new_content = old_content
                         update_last_modified = False
 
-            async with aiofiles.open(updated_asset_file_path, "w", encoding="utf8", errors="replace") as f:
-                await f.write(json.dumps(new_content))
+                await write_chat_snapshot(updated_asset_file_path, new_content, self.chat_compression_min_bytes)
+
+            if original_asset_id != updated_asset.id:
+                self._chat_index.remove(original_asset_id)
         else:
             try:
                 original_asset = await load_asset_from_fs(updated_asset.type, original_asset_id)
@@ -155,46 +381,12 @@ class AssetsFileStorage:
             current_version_parts[-1] = str(int(current_version_parts[-1]) + 1)
             updated_asset.version = ".".join(current_version_parts)
 
-            toml_data = {
-                "name": updated_asset.name,
-                "version": updated_asset.version,
-                "usage": updated_asset.usage,
-                "usage_examples": updated_asset.usage_examples,
-                "enabled_by_default": updated_asset.enabled_by_default,
-            }
-
-            if isinstance(updated_asset, AICMaterial):
-                material: AICMaterial = updated_asset
-                toml_data["content_type"] = updated_asset.content_type.value
-                content_key = {
-                    MaterialContentType.STATIC_TEXT: "content_static_text",
-                    MaterialContentType.DYNAMIC_TEXT: "content_dynamic_text",
-                    MaterialContentType.API: "content_api",
-                }[updated_asset.content_type]
-                toml_data[content_key] = self._make_sure_starts_and_ends_with_newline(material.content)
-
-            if isinstance(updated_asset, AICAgent):
-                toml_data.update(
-                    {
-                        "system": updated_asset.system,
-                        "gpt_mode": str(updated_asset.gpt_mode),
-                        "execution_mode": updated_asset.execution_mode,
-                        "execution_mode_params_values": updated_asset.execution_mode_params_values,
-                    }
-                )
-
-            if isinstance(updated_asset, AICUserProfile):
-                toml_data.update(
-                    {
-                        "display_name": updated_asset.display_name,
-                        "profile_picture": updated_asset.profile_picture,
-                    }
-                )
+            toml_data = asset_toml_data(updated_asset)
 
             if original_asset and original_asset_file_path != updated_asset_file_path:
                 original_asset_file_path.rename(updated_asset_file_path)
 
-            rtoml.dump(toml_data, updated_asset_file_path)
+            await write_text_atomically(updated_asset_file_path, rtoml.dumps(toml_data))
 
             extensions = [".jpeg", ".jpg", ".png", ".gif", ".SVG"]
             for extension in extensions:
@@ -213,24 +405,70 @@ class AssetsFileStorage:
         if original_st_mtime and not update_last_modified:
             os.utime(updated_asset_file_path, (original_st_mtime, original_st_mtime))
 
+        if updated_asset.type == AssetType.CHAT:
+            stat = await async_os.stat(updated_asset_file_path)
+            self._chat_index.update_from_data(updated_asset.id, new_content, stat)
+
+        self._record_own_writes(updated_asset.type, original_asset_id, updated_asset.id)
+
+    async def persist_mutations(self, asset: Asset, mutations: list[AssetMutation] | None) -> None:
+        # The asset in memory is what gets written, clients got the mutations, just a new chat name is announced
+        indexed = self._chat_index.entries.get(asset.id)
+        indexed_name = indexed.name if indexed else None
+
+        await self._persist_mutations(asset, mutations)
+
+        indexed = self._chat_index.entries.get(asset.id)
+        if asset.type == AssetType.CHAT and indexed is not None and indexed.name != indexed_name:
+            self._set_project_asset(asset.type, asset.id, self._written_asset(asset))
+            await internal_events().emit(AssetsUpdatedEvent(asset_ids=frozenset({asset.id})))
+
+    async def _persist_mutations(self, asset: Asset, mutations: list[AssetMutation] | None) -> None:
+        file_path = self._get_asset_file_path(asset.id, asset.type, self.paths[0])
+
+        if (
+            self.chat_storage_mode != ChatStorageMode.JOURNAL
+            or asset.type != AssetType.CHAT
+            or not mutations
+            or not file_path.exists()
+        ):
+            await self._write_asset(asset.id, asset)
+            return
+
+        async with self._chat_file_locks[asset.id]:
+            journal_size = await append_to_chat_journal(get_chat_journal_path(file_path), mutations)
+            # The chat file stays untouched, but its mtime is the last modification time of the chat
+            os.utime(file_path)
+            self._record_own_writes(asset.type, asset.id)
+
+        if isinstance(asset, AICChat):
+            self._chat_index.update_from_chat(asset, await async_os.stat(file_path))
+
+        if journal_size > self.chat_journal_compaction_bytes and asset.id not in self._compactions:
+            self._compactions[asset.id] = asyncio.create_task(self._compact_chat_journal(asset.id, file_path))
+
+    async def _compact_chat_journal(self, chat_id: str, file_path: Path) -> None:
+        try:
+            async with self._chat_file_locks[chat_id]:
+                await compact_chat_journal(file_path, self.chat_compression_min_bytes)
+                self._chat_index.update_stat(chat_id, await async_os.stat(file_path))
+                self._record_own_writes(AssetType.CHAT, chat_id)
+        except Exception as e:
+            _log.exception(f"Failed to compact the journal of chat {chat_id}: {e}")
+        finally:
+            self._compactions.pop(chat_id, None)
+
     async def create_asset(self, asset: Asset) -> None:
         self._validate_asset(asset, validation_scope="create")
 
         file_path = self._get_asset_file_path(asset.id, asset.type, self.paths[0])
 
         if asset.type == AssetType.CHAT:
-            async with aiofiles.open(file_path, "w", encoding="utf8", errors="replace") as f:
-                await f.write(json.dumps(asset.model_dump(exclude={"id", "last_modified"})))
+            data = asset.model_dump(exclude={"id", "last_modified"})
+            await write_chat_snapshot(file_path, data, self.chat_compression_min_bytes)
+            self._chat_index.update_from_data(asset.id, data, await async_os.stat(file_path))
 
         else:
-            toml_data = {
-                "name": asset.name,
-                "version": asset.version,
-                "usage": asset.usage,
-                "usage_examples": asset.usage_examples,
-                "enabled_by_default": asset.enabled_by_default,
-            }
-
             if isinstance(asset, AICMaterial):
                 if asset.content_type in (
                     MaterialContentType.DYNAMIC_TEXT,
@@ -239,34 +477,11 @@ class AssetsFileStorage:
                     file_path = await AICMaterial.save_content_to_file(asset.id, asset.content)
                     asset.content = f"file://{file_path}"
 
-                toml_data["content_type"] = asset.content_type.value
-                content_key = {
-                    MaterialContentType.STATIC_TEXT: "content_static_text",
-                    MaterialContentType.DYNAMIC_TEXT: "content_dynamic_text",
-                    MaterialContentType.API: "content_api",
-                }[asset.content_type]
-                toml_data[content_key] = self._make_sure_starts_and_ends_with_newline(asset.content)
-
-            if isinstance(asset, AICAgent):
-                toml_data.update(
-                    {
-                        "system": asset.system,
-                        "gpt_mode": str(asset.gpt_mode),
-                        "execution_mode": asset.execution_mode,
-                        "execution_mode_params_values": asset.execution_mode_params_values,
-                    }
-                )
-
-            if isinstance(asset, AICUserProfile):
-                toml_data.update(
-                    {
-                        "display_name": asset.display_name,
-                        "profile_picture": asset.profile_picture,
-                    }
-                )
+            await write_text_atomically(file_path, rtoml.dumps(asset_toml_data(asset), pretty=True))
 
-            async with aiofiles.open(file_path, "w", encoding="utf8", errors="replace") as f:
-                await f.write(rtoml.dumps(toml_data, pretty=True))
+        self._record_own_writes(asset.type, asset.id)
+        self._set_project_asset(asset.type, asset.id, self._written_asset(asset))
+        await internal_events().emit(AssetsUpdatedEvent(asset_ids=frozenset({asset.id})))
 
     # TODO: rework for proper async
     async def delete_asset(self, asset_id: str) -> None:
@@ -290,7 +505,8 @@ class AssetsFileStorage:
             case AssetType.AGENT:
                 extensions = [".toml", ".jpeg", ".jpg", ".png", ".gif", ".SVG"]
             case AssetType.CHAT:
-                extensions = [".json"]
+                extensions = [".json", ".journal"]
+                self._chat_index.remove(asset_id)
             case AssetType.MATERIAL:
                 extensions = [".toml"]
             case _:
@@ -302,19 +518,61 @@ class AssetsFileStorage:
             if asset_file_path.exists():
                 send2trash(asset_file_path)
 
+        self._record_own_writes(asset.type, asset_id)
+        await internal_events().emit(AssetsUpdatedEvent(asset_ids=frozenset({asset_id})))
+
+    async def hydrate(self, asset_id: str) -> Asset | None:
+        assets = self._assets.get(asset_id)
+        if not assets:
+            return None
+
+        asset = assets[0]
+        if asset.type != AssetType.CHAT or isinstance(asset, AICChat):
+            return asset
+
+        async with self._chat_file_locks[asset_id]:
+            chat = await load_chat_history(asset_id)
+            file_path = self._get_asset_file_path(asset_id, AssetType.CHAT, self.paths[0])
+            if await async_os.path.exists(file_path):
+                self._chat_index.update_from_chat(chat, await async_os.stat(file_path))
+
+        # Hydrated or reloaded meanwhile
+        assets = self._assets.get(asset_id)
+        if not assets or assets[0] is not asset:
+            return assets[0] if assets else None
+
+        assets[0] = chat
+        return chat
+
+    def dehydrate(self, asset_id: str) -> None:
+        assets = self._assets.get(asset_id)
+        if assets and isinstance(assets[0], AICChat):
+            chat = assets[0]
+            assets[0] = AICChatHeadline(**{name: getattr(chat, name) for name in AICChatHeadline.model_fields})
+
+    def discard_in_memory(self, asset_id: str) -> None:
+        self._assets.pop(asset_id, None)
+
     # TODO: rework to use self.paths
     async def _load_assets(self) -> None:
+        # Chats are listed by their headlines and loaded on demand (see hydrate),
+        # the loaded ones which did not change are kept as they are
+        loaded_chats = {
+            asset.id: asset for assets in self._assets.values() for asset in assets if isinstance(asset, AICChat)
+        }
         self._assets.clear()
 
         for asset_type in AssetType:
             if asset_type == AssetType.CHAT:
-                for chat_id in list_possible_historic_chat_ids():
-                    try:
-                        chat = await load_chat_history(chat_id)
+                chat_ids = list_possible_historic_chat_ids()
 
-                        if chat:
-                            self._assets[chat_id].append(chat)
+                for chat_id in set(self._chat_index.entries).difference(chat_ids):
+                    self._chat_index.remove(chat_id)
 
+                for chat_id in chat_ids:
+                    try:
+                        headline = await self._load_chat_headline(chat_id, loaded_chats.get(chat_id))
+                        self._assets[chat_id].append(headline)
                     except Exception as e:
                         _log.exception(e)
                         await internal_events().emit(
@@ -345,6 +603,33 @@ class AssetsFileStorage:
                             )
                             continue
 
+    async def _load_chat_headline(self, chat_id: str, loaded_chat: AICChat | None) -> AICChatHeadline:
+        """
+        The headline of the chat from the chat index, or the loaded chat as it is if its file did not change.
+        """
+        file_path = self._get_asset_file_path(chat_id, AssetType.CHAT, self.paths[0])
+        stat = await async_os.stat(file_path)
+        entry = self._chat_index.get_valid(chat_id, stat)
+
+        if entry is not None and loaded_chat is not None:
+            return loaded_chat
+
+        if entry is None:
+            entry = await self._chat_index.refresh_name(chat_id, file_path)
+
+        return self._chat_headline(chat_id, entry)
+
+    def _chat_headline(self, chat_id: str, entry: ChatIndexEntry) -> AICChatHeadline:
+        return AICChatHeadline(
+            id=chat_id,
+            name=entry.name,
+            usage="",
+            usage_examples=[],
+            defined_in=AssetLocation.PROJECT_DIR,
+            override=False,
+            last_modified=datetime.fromtimestamp(entry.mtime),
+        )
+
     def _get_asset_folder_path(self, asset_type: AssetType, assets_folder_path: Path) -> Path:
         return assets_folder_path / f"{asset_type.value}s"
 
@@ -352,14 +637,12 @@ class AssetsFileStorage:
         extension = "json" if asset_type == AssetType.CHAT else "toml"
         return self._get_asset_folder_path(asset_type, assets_folder_path) / f"{asset_id}.{extension}"
 
-    def _make_sure_starts_and_ends_with_newline(self, s: str) -> str:
-        if not s.startswith("\n"):
-            s = "\n" + s
-
-        if not s.endswith("\n"):
-            s = s + "\n"
-
-        return s
+    def _get_asset_file_paths(self, asset_id: str, asset_type: AssetType) -> list[Path]:
+        """
+        The files of the project asset which the observer watches.
+        """
+        file_path = self._get_asset_file_path(asset_id, asset_type, self.paths[0])
+        return [file_path, get_chat_journal_path(file_path)] if asset_type == AssetType.CHAT else [file_path]
 
     def _validate_asset(self, asset: Asset, validation_scope: Literal["create"] | Literal["update"]) -> None:
         if isinstance(asset, AICAgent) and asset.id == "user":
@@ -48,9 +48,9 @@ execution_mode_path_mapping = {
 
 
 async def _find_asset_path(
-    asset_type: AssetType, asset_id: str, location: AssetLocation | None
+    asset_type: AssetType, asset_id: str, location: AssetLocation | None, project_path: pathlib.Path | None = None
 ) -> tuple[AssetLocation, pathlib.Path]:
-    project_dir_path = get_project_assets_directory(asset_type)
+    project_dir_path = get_project_assets_directory(asset_type, project_path)
     core_resource_path = get_core_assets_directory(asset_type)
     asset_filename = f"{asset_id}.toml"
 
@@ -65,11 +65,16 @@ async def _find_asset_path(
         raise KeyError(f"Asset {asset_id} not found")
 
 
-async def load_asset_from_fs(asset_type: AssetType, asset_id: str, location: AssetLocation | None = None) -> Asset:
+async def load_asset_from_fs(
+    asset_type: AssetType,
+    asset_id: str,
+    location: AssetLocation | None = None,
+    project_path: pathlib.Path | None = None,
+) -> Asset:
     if asset_type == AssetType.AGENT and asset_id == _USER_AGENT_ID:
         raise UserIsAnInvalidAgentIdError()
 
-    location, path = await _find_asset_path(asset_type, asset_id, location)
+    location, path = await _find_asset_path(asset_type, asset_id, location, project_path)
 
     async with aiofiles.open(path, mode="r", encoding="utf8", errors="replace") as file:
         content = await file.read()
@@ -0,0 +1,143 @@
+"""
+Moves the assets of a project between its folders (AssetsFileStorage) and .aic/assets.db (SqliteAssetsStorage).
+
+    python -m aiconsole.core.assets.sqlite.import_export import <project_dir>
+    python -m aiconsole.core.assets.sqlite.import_export export <project_dir>
+
+Both directions copy, nothing is removed from the source. Assets already at the destination are overwritten.
+The project must not be open in the app meanwhile.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+
+import rtoml
+
+from aiconsole.consts import ASSETS_DB
+from aiconsole.core.assets.fs.assets_file_storage import asset_toml_data
+from aiconsole.core.assets.fs.load_asset_from_fs import load_asset_from_fs
+from aiconsole.core.assets.materials.material import AICMaterial
+from aiconsole.core.assets.sqlite.sqlite_assets_storage import (
+    asset_from_row_data,
+    asset_row_data,
+    connect_assets_db,
+    read_chat_data,
+    write_asset_row,
+    write_chat_rows,
+)
+from aiconsole.core.assets.types import AssetLocation, AssetType
+from aiconsole.core.chat.chat_index import chat_headline_name
+from aiconsole.core.chat.chat_journal import write_chat_snapshot
+from aiconsole.core.chat.list_possible_historic_chat_ids import (
+    list_possible_historic_chat_ids,
+)
+from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.core.project.paths import (
+    get_assets_db_path,
+    get_project_assets_directory,
+)
+from aiconsole.utils.atomic_write import write_text_atomically
+
+_log = logging.getLogger(__name__)
+
+
+async def import_project_assets(project_path: Path, db_path: Path | None = None) -> int:
+    """
+    Copies the assets from the folders of the project to the database, returns the number of copied assets.
+    """
+    db = connect_assets_db(db_path or get_assets_db_path(project_path))
+    count = 0
+
+    try:
+        for chat_id in list_possible_historic_chat_ids(project_path):
+            chat = await load_chat_history(chat_id, project_path)
+            data = chat.model_dump(mode="json", exclude={"id", "last_modified"})
+
+            with db:
+                write_chat_rows(db, chat_id, chat_headline_name(chat), chat.last_modified.timestamp(), data)
+            count += 1
+
+        for asset_type in (AssetType.AGENT, AssetType.MATERIAL, AssetType.USER):
+            directory = get_project_assets_directory(asset_type, project_path)
+            if not directory.is_dir():
+                continue
+
+            for path in sorted(directory.glob("*.toml")):
+                try:
+                    asset = await load_asset_from_fs(asset_type, path.stem, AssetLocation.PROJECT_DIR, project_path)
+                except Exception as e:
+                    _log.warning(f"Skipping {path}: {e}")
+                    continue
+
+                if isinstance(asset, AICMaterial) and asset.content.startswith("file://"):
+                    # The database holds the whole material, not a path to its content
+                    content_path = directory / asset.content[len("file://") :]
+                    asset.content = content_path.read_text(encoding="utf8", errors="replace")
+
+                with db:
+                    write_asset_row(
+                        db, asset.id, asset.type, asset.name, asset.last_modified.timestamp(), asset_row_data(asset)
+                    )
+                count += 1
+    finally:
+        db.close()
+
+    return count
+
+
+async def export_project_assets(project_path: Path, db_path: Path | None = None) -> int:
+    """
+    Copies the assets from the database to the folders of the project, returns the number of copied assets.
+    """
+    db = connect_assets_db(db_path or get_assets_db_path(project_path))
+    count = 0
+
+    try:
+        for asset_id, asset_type, last_modified, data in db.execute(
+            "SELECT id, type, last_modified, data FROM assets"
+        ).fetchall():
+            asset_type = AssetType(asset_type)
+            directory = get_project_assets_directory(asset_type, project_path)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            if asset_type == AssetType.CHAT:
+                chat_data = read_chat_data(db, asset_id)
+                assert chat_data is not None
+                del chat_data["last_modified"]
+
+                file_path = directory / f"{asset_id}.json"
+                await write_chat_snapshot(file_path, chat_data)
+            else:
+                asset = asset_from_row_data(asset_type, asset_id, json.loads(data), last_modified, override=False)
+
+                file_path = directory / f"{asset_id}.toml"
+                await write_text_atomically(file_path, rtoml.dumps(asset_toml_data(asset), pretty=True))
+
+            os.utime(file_path, (last_modified, last_modified))
+            count += 1
+    finally:
+        db.close()
+
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Moves the assets of a project between its folders and a database")
+    parser.add_argument("direction", choices=["import", "export"], help="import to the database, export from it")
+    parser.add_argument("project_dir", type=Path)
+    parser.add_argument("--db", type=Path, default=None, help=f"defaults to <project_dir>/.aic/{ASSETS_DB}")
+    args = parser.parse_args()
+
+    if args.direction == "import":
+        count = asyncio.run(import_project_assets(args.project_dir, args.db))
+    else:
+        count = asyncio.run(export_project_assets(args.project_dir, args.db))
+
+    print(f"{args.direction}ed {count} assets")
+
+
+if __name__ == "__main__":
+    main()
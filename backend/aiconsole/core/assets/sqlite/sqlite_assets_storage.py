@@ -0,0 +1,626 @@
+"""
+Assets of a project in a single SQLite database (.aic/assets.db) instead of its folders.
+
+Chats are stored as a row per message group, message and tool call, so the mutations of a chat become updates
+of single rows, e.g. a streamed append to a message updates just the row of that message. The database runs in
+WAL mode, readers never see a half written chat and do not block the writes.
+
+Core assets stay in the aiconsole package and are read from their files, pictures of agents stay in the project
+folder. Unlike AssetsFileStorage it does not watch for changes made outside of the app.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, Literal, TypeVar
+
+from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.assets_service import AssetsUpdatedEvent
+from aiconsole.core.assets.fs.exceptions import UserIsAnInvalidAgentIdError
+from aiconsole.core.assets.fs.load_asset_from_fs import load_asset_from_fs
+from aiconsole.core.assets.materials.material import AICMaterial
+from aiconsole.core.assets.types import Asset, AssetLocation, AssetType
+from aiconsole.core.assets.users.users import AICUserProfile
+from aiconsole.core.chat.chat_index import chat_headline_name
+from aiconsole.core.chat.types import AICChat, AICChatHeadline
+from aiconsole.core.project.paths import (
+    get_core_assets_directory,
+    get_project_assets_directory,
+)
+from aiconsole.utils.events import internal_events
+from aiconsole.utils.list_files_in_file_system import list_files_in_file_system
+from fastmutation.mutations import (
+    AppendToStringMutation,
+    AssetMutation,
+    CreateMutation,
+    DeleteMutation,
+    SetValueMutation,
+)
+
+_log = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Bumped with every change of the tables below
+DB_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    last_modified REAL NOT NULL,
+    -- The asset as JSON, without id, last_modified and (for chats) message_groups
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_by_type ON assets (type, last_modified DESC);
+
+CREATE TABLE IF NOT EXISTS chat_objects (
+    chat_id TEXT NOT NULL,
+    -- message_groups, messages or tool_calls
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    -- The message group of a message, the message of a tool call
+    parent_id TEXT,
+    -- Order within the parent
+    position INTEGER NOT NULL,
+    -- The object as JSON, without id and its nested collection
+    data TEXT NOT NULL,
+    PRIMARY KEY (chat_id, collection, id)
+);
+CREATE INDEX IF NOT EXISTS chat_objects_by_parent ON chat_objects (chat_id, collection, parent_id, position);
+"""
+
+# Nested collection of the objects of a collection
+_CHILD_COLLECTIONS: dict[str, str | None] = {
+    "message_groups": "messages",
+    "messages": "tool_calls",
+    "tool_calls": None,
+}
+_PARENT_COLLECTIONS = {child: parent for parent, child in _CHILD_COLLECTIONS.items() if child}
+
+_ASSET_CLASSES: dict[AssetType, type[Asset]] = {
+    AssetType.AGENT: AICAgent,
+    AssetType.MATERIAL: AICMaterial,
+    AssetType.USER: AICUserProfile,
+}
+
+_PICTURE_EXTENSIONS = [".jpeg", ".jpg", ".png", ".gif", ".SVG"]
+
+
+class _ChatRowsOutOfSync(Exception):
+    """
+    A mutation does not match the rows of the chat, the chat is written whole instead.
+    """
+
+
+def _json_path(key: str) -> str:
+    return f'$."{key}"'
+
+
+class SqliteAssetsStorage:
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._assets: dict[str, list[Asset]] = defaultdict(list)
+        self._core_assets: dict[str, Asset] = {}
+        self._connection: sqlite3.Connection | None = None
+        # One connection is shared by the calls run in threads, they must not overlap
+        self._db_lock = asyncio.Lock()
+
+    async def setup(self) -> tuple[bool, Exception | None]:
+        try:
+            self._connection = connect_assets_db(self.db_path)
+            await self._load_core_assets()
+            await self._load_assets()
+            return True, None
+        except Exception as e:
+            _log.exception(f"[{self.__class__.__name__}] Failed to setup: \n{e}")
+            return False, e
+
+    def destroy(self) -> None:
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    @property
+    def assets(self) -> dict[str, list[Asset]]:
+        return self._assets
+
+    async def _run(self, fn: Callable[..., _T], *args: Any) -> _T:
+        async with self._db_lock:
+            return await asyncio.to_thread(fn, *args)
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            raise ValueError(f"{self.__class__.__name__} is not set up")
+        return self._connection
+
+    async def update_asset(self, original_asset_id: str, updated_asset: Asset, scope: str | None = None) -> None:
+        self._validate_asset(updated_asset, validation_scope="update")
+
+        if isinstance(updated_asset, AICChat):
+            data = updated_asset.model_dump(mode="json", exclude={"id", "last_modified"})
+            name = chat_headline_name(updated_asset)
+
+            if scope in ("name", "chat_options") and original_asset_id == updated_asset.id:
+                updated = await self._run(self._update_chat_header, updated_asset.id, scope, data)
+            else:
+                updated = False
+
+            if not updated:
+                await self._run(self._write_chat, original_asset_id, updated_asset.id, name, data)
+
+            # Only the passed instance has the current content of the chat, any other is loaded again
+            loaded = self._assets.get(updated_asset.id)
+            if loaded and loaded[0] is not updated_asset:
+                self._assets.pop(updated_asset.id)
+        else:
+            original_asset = next(iter(self._assets.get(original_asset_id) or []), None)
+            original_version = original_asset.version if original_asset else "0.0.1"
+
+            version_parts = original_version.split(".")
+            version_parts[-1] = str(int(version_parts[-1]) + 1)
+
+            keep_last_modified = original_asset is not None and self._only_name_changed(original_asset, updated_asset)
+            updated_asset.version = ".".join(version_parts)
+
+            await self._run(self._write_asset, original_asset_id, updated_asset, keep_last_modified)
+            self._rename_pictures(original_asset_id, updated_asset)
+
+        await self._reload({original_asset_id, updated_asset.id})
+
+    async def persist_mutations(self, asset: Asset, mutations: list[AssetMutation] | None) -> None:
+        if not isinstance(asset, AICChat) or not mutations:
+            await self.update_asset(asset.id, asset)
+            return
+
+        try:
+            await self._run(self._apply_chat_mutations, asset.id, chat_headline_name(asset), mutations)
+        except _ChatRowsOutOfSync as e:
+            _log.warning(f"Writing the whole chat {asset.id}: {e}")
+            data = asset.model_dump(mode="json", exclude={"id", "last_modified"})
+            await self._run(self._write_chat, asset.id, asset.id, chat_headline_name(asset), data)
+
+        await internal_events().emit(AssetsUpdatedEvent(asset_ids=frozenset({asset.id})))
+
+    async def create_asset(self, asset: Asset) -> None:
+        self._validate_asset(asset, validation_scope="create")
+
+        if await self._run(self._asset_exists, asset.id):
+            raise ValueError(f"Asset with ID '{asset.id}' already exists.")
+
+        if isinstance(asset, AICChat):
+            data = asset.model_dump(mode="json", exclude={"id", "last_modified"})
+            await self._run(self._write_chat, asset.id, asset.id, chat_headline_name(asset), data)
+        else:
+            await self._run(self._write_asset, asset.id, asset, False)
+
+        await self._reload({asset.id})
+
+    async def delete_asset(self, asset_id: str) -> None:
+        """
+        Delete a specific asset.
+        """
+        if not await self._run(self._delete_asset, asset_id):
+            raise KeyError(f"Asset {asset_id} not found")
+
+        self._assets.pop(asset_id, None)
+        await self._reload({asset_id})
+
+    async def hydrate(self, asset_id: str) -> Asset | None:
+        assets = self._assets.get(asset_id)
+        if not assets:
+            return None
+
+        asset = assets[0]
+        if asset.type != AssetType.CHAT or isinstance(asset, AICChat):
+            return asset
+
+        chat = await self._run(self._read_chat, asset_id)
+
+        # Hydrated, reloaded or deleted meanwhile
+        assets = self._assets.get(asset_id)
+        if not assets or assets[0] is not asset or chat is None:
+            return assets[0] if assets else None
+
+        assets[0] = chat
+        return chat
+
+    def dehydrate(self, asset_id: str) -> None:
+        assets = self._assets.get(asset_id)
+        if assets and isinstance(assets[0], AICChat):
+            chat = assets[0]
+            assets[0] = AICChatHeadline(**{name: getattr(chat, name) for name in AICChatHeadline.model_fields})
+
+    def discard_in_memory(self, asset_id: str) -> None:
+        self._assets.pop(asset_id, None)
+
+    async def _reload(self, asset_ids: set[str]) -> None:
+        await self._load_assets()
+        await internal_events().emit(AssetsUpdatedEvent(asset_ids=frozenset(asset_ids)))
+
+    async def _load_core_assets(self) -> None:
+        for asset_type in _ASSET_CLASSES:
+            for path in list_files_in_file_system(get_core_assets_directory(asset_type)):
+                path = Path(path)
+                if path.suffix != ".toml":
+                    continue
+
+                try:
+                    asset = await load_asset_from_fs(asset_type, path.stem, AssetLocation.AICONSOLE_CORE)
+                    self._core_assets[asset.id] = asset
+                except Exception as e:
+                    _log.exception(f"Error loading asset `{path.stem}`, error is `{e}`")
+
+    async def _load_assets(self) -> None:
+        # Chats are listed by their headlines and loaded on demand (see hydrate),
+        # the loaded ones are kept, the database only changes through this storage
+        loaded_chats = {
+            asset.id: asset for assets in self._assets.values() for asset in assets if isinstance(asset, AICChat)
+        }
+        rows = await self._run(self._read_headline_rows)
+
+        self._assets.clear()
+
+        for asset_id, asset_type, name, last_modified, data in rows:
+            try:
+                self._assets[asset_id].append(
+                    loaded_chats.get(asset_id) or self._asset_from_row(asset_id, asset_type, name, last_modified, data)
+                )
+            except Exception as e:
+                _log.exception(f"Error loading asset `{asset_id}`, error is `{e}`")
+
+        for asset_id, asset in self._core_assets.items():
+            self._assets[asset_id].append(asset)
+
+    def _asset_from_row(self, asset_id: str, asset_type: str, name: str, last_modified: float, data: str | None):
+        if asset_type == AssetType.CHAT:
+            return AICChatHeadline(
+                id=asset_id,
+                name=name,
+                usage="",
+                usage_examples=[],
+                defined_in=AssetLocation.PROJECT_DIR,
+                override=False,
+                last_modified=datetime.fromtimestamp(last_modified),
+            )
+
+        return asset_from_row_data(
+            AssetType(asset_type), asset_id, json.loads(data or "{}"), last_modified, asset_id in self._core_assets
+        )
+
+    def _rename_pictures(self, original_asset_id: str, asset: Asset) -> None:
+        if original_asset_id == asset.id:
+            return
+
+        directory = get_project_assets_directory(asset.type)
+        for extension in _PICTURE_EXTENSIONS:
+            picture_path = directory / f"{original_asset_id}{extension}"
+            if picture_path.exists():
+                picture_path.rename(directory / f"{asset.id}{extension}")
+
+    def _validate_asset(self, asset: Asset, validation_scope: Literal["create"] | Literal["update"]) -> None:
+        if isinstance(asset, AICAgent) and asset.id == "user":
+            raise UserIsAnInvalidAgentIdError()
+
+        if asset.id == "new":
+            raise ValueError("Cannot save asset with id 'new'")
+
+        if validation_scope == "update" and asset.defined_in == AssetLocation.AICONSOLE_CORE:
+            raise ValueError(f"Asset located in '{AssetLocation.AICONSOLE_CORE.value}' cannot be updated")
+
+    def _only_name_changed(self, old_asset: Asset, asset: Asset) -> bool:
+        exclude = {"name", "version", "last_modified", "defined_in", "override"}
+        return old_asset.model_dump(exclude=exclude) == asset.model_dump(exclude=exclude)
+
+    # The methods below run in a thread, under _db_lock
+
+    def _read_headline_rows(self) -> list[tuple[str, str, str, float, str | None]]:
+        # The data of chats is not needed for their headlines
+        return self._db.execute(
+            "SELECT id, type, name, last_modified, CASE WHEN type = ? THEN NULL ELSE data END FROM assets"
+            " ORDER BY type, last_modified DESC",
+            (AssetType.CHAT.value,),
+        ).fetchall()
+
+    def _asset_exists(self, asset_id: str) -> bool:
+        return self._db.execute("SELECT 1 FROM assets WHERE id = ?", (asset_id,)).fetchone() is not None
+
+    def _delete_asset(self, asset_id: str) -> bool:
+        with self._db:
+            self._db.execute("DELETE FROM chat_objects WHERE chat_id = ?", (asset_id,))
+            return self._db.execute("DELETE FROM assets WHERE id = ?", (asset_id,)).rowcount > 0
+
+    def _write_asset(self, original_asset_id: str, asset: Asset, keep_last_modified: bool) -> None:
+        last_modified = datetime.now().timestamp()
+
+        with self._db:
+            if keep_last_modified:
+                row = self._db.execute(
+                    "SELECT last_modified FROM assets WHERE id = ?", (original_asset_id,)
+                ).fetchone()
+                if row:
+                    last_modified = row[0]
+
+            if original_asset_id != asset.id:
+                self._db.execute("DELETE FROM assets WHERE id = ?", (original_asset_id,))
+
+            write_asset_row(self._db, asset.id, asset.type, asset.name, last_modified, asset_row_data(asset))
+
+    def _write_chat(self, original_chat_id: str, chat_id: str, name: str, data: dict[str, Any]) -> None:
+        with self._db:
+            if original_chat_id != chat_id:
+                self._db.execute("DELETE FROM chat_objects WHERE chat_id = ?", (original_chat_id,))
+                self._db.execute("DELETE FROM assets WHERE id = ?", (original_chat_id,))
+
+            write_chat_rows(self._db, chat_id, name, datetime.now().timestamp(), data)
+
+    def _update_chat_header(self, chat_id: str, scope: str, data: dict[str, Any]) -> bool:
+        """
+        Updates just the name or the options of a chat, returns False if the chat is not in the database.
+        """
+        with self._db:
+            row = self._db.execute("SELECT data FROM assets WHERE id = ?", (chat_id,)).fetchone()
+            if row is None:
+                return False
+
+            old_data = json.loads(row[0])
+
+            if scope == "name":
+                old_data["name"] = data["name"]
+                old_data["title_edited"] = True
+                self._db.execute(
+                    "UPDATE assets SET name = ?, data = ? WHERE id = ?", (data["name"], json.dumps(old_data), chat_id)
+                )
+                return True
+
+            old_draft_command = (old_data.get("chat_options") or {}).get("draft_command") or ""
+            new_draft_command = data["chat_options"].get("draft_command") or ""
+            old_data["chat_options"] = data["chat_options"]
+
+            # Typing a command is a modification of the chat, unlike picking an agent or materials
+            if old_draft_command != new_draft_command and "@" not in set(old_draft_command) ^ set(new_draft_command):
+                self._db.execute(
+                    "UPDATE assets SET data = ?, last_modified = ? WHERE id = ?",
+                    (json.dumps(old_data), datetime.now().timestamp(), chat_id),
+                )
+            else:
+                self._db.execute("UPDATE assets SET data = ? WHERE id = ?", (json.dumps(old_data), chat_id))
+
+            return True
+
+    def _read_chat(self, chat_id: str) -> AICChat | None:
+        data = read_chat_data(self._db, chat_id)
+        if data is None:
+            return None
+
+        last_modified = data.pop("last_modified")
+        return AICChat(id=chat_id, last_modified=datetime.fromtimestamp(last_modified), **data)
+
+    def _apply_chat_mutations(self, chat_id: str, name: str, mutations: list[AssetMutation]) -> None:
+        with self._db:
+            for mutation in mutations:
+                self._apply_chat_mutation(chat_id, mutation)
+
+            updated = self._db.execute(
+                "UPDATE assets SET name = ?, last_modified = ? WHERE id = ?",
+                (name, datetime.now().timestamp(), chat_id),
+            )
+            if updated.rowcount == 0:
+                raise _ChatRowsOutOfSync(f"chat {chat_id} is not in the database")
+
+    def _apply_chat_mutation(self, chat_id: str, mutation: AssetMutation) -> None:
+        # [0] is 'assets' and [1] is the chat id, the rest are pairs of a collection and an object id
+        path = mutation.ref.ref_segments[2:]
+
+        if isinstance(mutation, CreateMutation):
+            if len(path) < 2 or path[-2] not in _CHILD_COLLECTIONS:
+                raise _ChatRowsOutOfSync(f"can't create {path}")
+
+            collection, object_id = path[-2:]
+            parent_id = path[-3] if len(path) > 2 else None
+            position = self._db.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM chat_objects"
+                " WHERE chat_id = ? AND collection = ? AND parent_id IS ?",
+                (chat_id, collection, parent_id),
+            ).fetchone()[0]
+
+            obj = {**mutation.object, "id": object_id}
+            rows = _chat_object_rows(chat_id, collection, parent_id, [obj], position)
+            self._db.executemany(_INSERT_CHAT_OBJECT, rows)
+            return
+
+        if isinstance(mutation, DeleteMutation):
+            if len(path) < 2 or not self._delete_chat_object(chat_id, path[-2], path[-1]):
+                raise _ChatRowsOutOfSync(f"can't delete {path}")
+            return
+
+        if not path:
+            # A field of the chat itself
+            if mutation.key == "message_groups":
+                raise _ChatRowsOutOfSync("message groups replaced")
+            table, where, params = "assets", "id = ?", (chat_id,)
+        else:
+            collection, object_id = path[-2:]
+
+            if isinstance(mutation, SetValueMutation) and mutation.key == _CHILD_COLLECTIONS.get(collection):
+                self._replace_children(chat_id, collection, object_id, mutation.value or [])
+                return
+
+            table, where, params = "chat_objects", "chat_id = ? AND collection = ? AND id = ?", (chat_id,) + path[-2:]
+
+        key_path = _json_path(mutation.key)
+
+        if isinstance(mutation, SetValueMutation):
+            cursor = self._db.execute(
+                f"UPDATE {table} SET data = json_set(data, ?, json(?)) WHERE {where}",
+                (key_path, json.dumps(mutation.value)) + params,
+            )
+        elif isinstance(mutation, AppendToStringMutation):
+            cursor = self._db.execute(
+                f"UPDATE {table} SET data = json_set(data, ?, COALESCE(json_extract(data, ?), '') || ?) WHERE {where}",
+                (key_path, key_path, mutation.value) + params,
+            )
+        else:
+            raise _ChatRowsOutOfSync(f"unknown mutation {mutation.type}")
+
+        if cursor.rowcount == 0:
+            raise _ChatRowsOutOfSync(f"{path} not found")
+
+    def _delete_chat_object(self, chat_id: str, collection: str, object_id: str) -> bool:
+        if child_collection := _CHILD_COLLECTIONS.get(collection):
+            self._delete_children(chat_id, child_collection, object_id)
+
+        return (
+            self._db.execute(
+                "DELETE FROM chat_objects WHERE chat_id = ? AND collection = ? AND id = ?",
+                (chat_id, collection, object_id),
+            ).rowcount
+            > 0
+        )
+
+    def _delete_children(self, chat_id: str, collection: str, parent_id: str) -> None:
+        if grandchild_collection := _CHILD_COLLECTIONS.get(collection):
+            for (child_id,) in self._db.execute(
+                "SELECT id FROM chat_objects WHERE chat_id = ? AND collection = ? AND parent_id = ?",
+                (chat_id, collection, parent_id),
+            ).fetchall():
+                self._delete_children(chat_id, grandchild_collection, child_id)
+
+        self._db.execute(
+            "DELETE FROM chat_objects WHERE chat_id = ? AND collection = ? AND parent_id = ?",
+            (chat_id, collection, parent_id),
+        )
+
+    def _replace_children(self, chat_id: str, collection: str, object_id: str, children: list[dict[str, Any]]) -> None:
+        child_collection = _CHILD_COLLECTIONS[collection]
+        assert child_collection is not None
+
+        self._delete_children(chat_id, child_collection, object_id)
+        self._db.executemany(_INSERT_CHAT_OBJECT, _chat_object_rows(chat_id, child_collection, object_id, children))
+
+
+_INSERT_CHAT_OBJECT = (
+    "INSERT INTO chat_objects (chat_id, collection, id, parent_id, position, data) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def connect_assets_db(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Used from the threads of asyncio.to_thread, one at a time
+    connection = sqlite3.connect(db_path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode = WAL")
+    # In WAL mode a crash can lose the last transactions, but never corrupts the database
+    connection.execute("PRAGMA synchronous = NORMAL")
+
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version > DB_SCHEMA_VERSION:
+        connection.close()
+        raise ValueError(f"Assets database {db_path} is of a newer version {version} (supported {DB_SCHEMA_VERSION})")
+
+    with connection:
+        connection.executescript(_SCHEMA)
+        connection.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+
+    return connection
+
+
+def asset_row_data(asset: Asset) -> dict[str, Any]:
+    """
+    Data of an asset which is not a chat, as stored in its row. Where it is defined is known from the row itself.
+    """
+    return asset.model_dump(mode="json", exclude={"id", "last_modified", "defined_in", "override"})
+
+
+def asset_from_row_data(
+    asset_type: AssetType, asset_id: str, data: dict[str, Any], last_modified: float, override: bool
+) -> Asset:
+    return _ASSET_CLASSES[asset_type](
+        **{
+            **data,
+            "id": asset_id,
+            "defined_in": AssetLocation.PROJECT_DIR,
+            "override": override,
+            "last_modified": datetime.fromtimestamp(last_modified),
+        }
+    )
+
+
+def write_asset_row(
+    db: sqlite3.Connection, asset_id: str, asset_type: AssetType, name: str, last_modified: float, data: dict[str, Any]
+) -> None:
+    db.execute(
+        "INSERT INTO assets (id, type, name, last_modified, data) VALUES (?, ?, ?, ?, ?)"
+        " ON CONFLICT (id) DO UPDATE SET type = excluded.type, name = excluded.name,"
+        " last_modified = excluded.last_modified, data = excluded.data",
+        (asset_id, asset_type.value, name, last_modified, json.dumps(data)),
+    )
+
+
+def _chat_object_rows(
+    chat_id: str, collection: str, parent_id: str | None, objects: list[dict[str, Any]], position: int = 0
+) -> Iterator[tuple[str, str, str, str | None, int, str]]:
+    child_collection = _CHILD_COLLECTIONS[collection]
+
+    for i, obj in enumerate(objects):
+        obj = dict(obj)
+        object_id = obj.pop("id")
+        children = (obj.pop(child_collection, None) or []) if child_collection else []
+
+        yield chat_id, collection, object_id, parent_id, position + i, json.dumps(obj)
+
+        if child_collection:
+            yield from _chat_object_rows(chat_id, child_collection, object_id, children)
+
+
+def write_chat_rows(
+    db: sqlite3.Connection, chat_id: str, name: str, last_modified: float, data: dict[str, Any]
+) -> None:
+    """
+    Writes the whole chat given its data (as dumped, without id and last_modified), within the transaction of db.
+    """
+    data = dict(data)
+    message_groups = data.pop("message_groups")
+
+    write_asset_row(db, chat_id, AssetType.CHAT, name, last_modified, data)
+    db.execute("DELETE FROM chat_objects WHERE chat_id = ?", (chat_id,))
+    db.executemany(_INSERT_CHAT_OBJECT, _chat_object_rows(chat_id, "message_groups", None, message_groups))
+
+
+def read_chat_data(db: sqlite3.Connection, chat_id: str) -> dict[str, Any] | None:
+    """
+    Reads the data of a chat as written by write_chat_rows, with its name and last_modified timestamp.
+    """
+    row = db.execute(
+        "SELECT name, last_modified, data FROM assets WHERE id = ? AND type = ?", (chat_id, AssetType.CHAT.value)
+    ).fetchone()
+    if row is None:
+        return None
+
+    name, last_modified, data = row
+    data = json.loads(data)
+
+    message_groups: list[dict[str, Any]] = []
+    # Children of (collection, id), an object may come before or after its parent
+    children: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
+
+    for collection, object_id, parent_id, object_data in db.execute(
+        "SELECT collection, id, parent_id, data FROM chat_objects WHERE chat_id = ? ORDER BY position", (chat_id,)
+    ):
+        obj = json.loads(object_data)
+        obj["id"] = object_id
+
+        if child_collection := _CHILD_COLLECTIONS[collection]:
+            obj[child_collection] = children[(collection, object_id)]
+
+        if parent_id is None:
+            message_groups.append(obj)
+        else:
+            children[(_PARENT_COLLECTIONS[collection], parent_id)].append(obj)
+
+    return {**data, "name": name, "last_modified": last_modified, "message_groups": message_groups}
@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+import pytest_asyncio
+
+from aiconsole.core.assets import aic_data_context
+from aiconsole.core.assets.aic_data_context import AICFileDataContext
+from aiconsole.core.assets.assets_service import Assets
+from aiconsole.core.assets.chat_cache import ChatCache
+from aiconsole.core.assets.fs.assets_file_storage import AssetsFileStorage
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.chat.types import AICChat
+from aiconsole.core.project import project
+from fastmutation.mutations import AppendToStringMutation
+
+
+@pytest_asyncio.fixture
+async def project_assets(project_dir: Path, monkeypatch: pytest.MonkeyPatch, make_chat: Callable[..., AICChat]):
+    (project_dir / "chats").mkdir()
+    for chat_id in ("c0", "c1", "c2"):
+        data = make_chat(chat_id, 2).model_dump(mode="json", exclude={"id", "last_modified"})
+        (project_dir / "chats" / f"{chat_id}.json").write_text(json.dumps(data))
+
+    monkeypatch.setattr(aic_data_context, "_chat_cache", ChatCache(max_bytes=10**9, max_chats=2))
+
+    assets = Assets()
+    await assets.configure(AssetsFileStorage(paths=[project_dir], disable_observer=True))
+    monkeypatch.setattr(project, "_assets", assets)
+
+    yield assets
+
+    assets.clean_up()
+
+
+def _is_hydrated(assets: Assets, chat_id: str) -> bool:
+    return isinstance(assets.get_asset(chat_id), AICChat)
+
+
+@pytest.mark.asyncio
+async def test_should_hydrate_chats_on_demand(project_assets: Assets):
+    assert not any(_is_hydrated(project_assets, chat_id) for chat_id in ("c0", "c1", "c2"))
+
+    context = AICFileDataContext(origin=None, lock_id="test")
+    message = await ChatRef(id="c1", context=context).message_groups["group-1"].messages["message-1"].get()
+
+    assert message is not None and message.content.startswith("Lorem ipsum")
+    assert _is_hydrated(project_assets, "c1")
+    assert not _is_hydrated(project_assets, "c0")
+
+
+@pytest.mark.asyncio
+async def test_should_evict_least_recently_used_clean_chats(project_assets: Assets):
+    context = AICFileDataContext(origin=None, lock_id="test")
+
+    dirty = await ChatRef(id="c0", context=context).get()
+    await project_assets.mark_dirty(dirty)  # type: ignore
+    await ChatRef(id="c1", context=context).get()
+    await ChatRef(id="c2", context=context).get()
+
+    # c0 was used the longest ago, but it has changes waiting to be written
+    assert [_is_hydrated(project_assets, chat_id) for chat_id in ("c0", "c1", "c2")] == [True, False, True]
+
+    await project_assets.flush_all()
+    await ChatRef(id="c1", context=context).get()
+
+    assert [_is_hydrated(project_assets, chat_id) for chat_id in ("c0", "c1", "c2")] == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_should_track_size_of_growing_chat(project_assets: Assets):
+    context = AICFileDataContext(origin=None, lock_id="test")
+    message_ref = ChatRef(id="c0", context=context).message_groups["group-1"].messages["message-1"]
+
+    await message_ref.get()
+    size = aic_data_context.chat_cache().total_bytes
+
+    await context.mutate(AppendToStringMutation(ref=message_ref, key="content", value="żółw"), True)
+    await message_ref.get()
+
+    assert aic_data_context.chat_cache().total_bytes == size + 4
+    await project_assets.flush_all()
@@ -0,0 +1,121 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.assets_service import AssetsUpdatedEvent
+from aiconsole.core.assets.fs.assets_file_storage import AssetsFileStorage
+from aiconsole.core.assets.types import AssetLocation
+from aiconsole.core.chat.types import AICChat
+from aiconsole.utils.events import internal_events
+from aiconsole.utils.file_observer import own_file_writes
+
+
+@pytest.fixture
+def write_chat(project_dir: Path, make_chat: Callable[..., AICChat]) -> Callable[[str, str], None]:
+    def write(chat_id: str, name: str) -> None:
+        chat = make_chat(chat_id, 2)
+        chat.name, chat.title_edited = name, True
+        (project_dir / "chats" / f"{chat_id}.json").write_text(
+            json.dumps(chat.model_dump(mode="json", exclude={"id", "last_modified"}))
+        )
+
+    return write
+
+
+@pytest.mark.asyncio
+async def test_should_reload_only_changed_assets(project_dir: Path, write_chat: Callable[[str, str], None]):
+    (project_dir / "chats").mkdir()
+    (project_dir / "agents").mkdir()
+    for chat_id in ("c0", "c1"):
+        write_chat(chat_id, chat_id)
+
+    storage = AssetsFileStorage(paths=[project_dir], disable_observer=True)
+    await storage.setup()
+    hydrated = await storage.hydrate("c0")
+    assert isinstance(hydrated, AICChat)
+
+    events: list[AssetsUpdatedEvent] = []
+
+    async def on_updated(event: AssetsUpdatedEvent):
+        events.append(event)
+
+    internal_events().subscribe(AssetsUpdatedEvent, on_updated)
+    try:
+        write_chat("c1", "Renamed")
+        agent_path = project_dir / "agents" / "writer.toml"
+        agent_path.write_text('name = "Writer"\nusage = "Writes"\nsystem = "You write"\n')
+
+        await storage._reload({project_dir / "chats" / "c1.json", agent_path, project_dir / "chats" / ".c1.json.tmp"})
+
+        assert events[-1].asset_ids == frozenset({"c1", "writer"})
+        assert storage.assets["c1"][0].name == "Renamed"
+        assert storage.assets["writer"][0].defined_in == AssetLocation.PROJECT_DIR
+        # Unchanged chats stay loaded
+        assert storage.assets["c0"][0] is hydrated
+
+        (project_dir / "chats" / "c1.json").unlink()
+        await storage._reload({project_dir / "chats" / "c1.json"})
+
+        assert events[-1].asset_ids == frozenset({"c1"})
+        assert "c1" not in storage.assets
+    finally:
+        internal_events().unsubscribe(AssetsUpdatedEvent, on_updated)
+        storage.destroy()
+
+
+@pytest.mark.asyncio
+async def test_should_reload_own_writes_without_observer(project_dir: Path, make_chat: Callable[..., AICChat]):
+    storage = AssetsFileStorage(paths=[project_dir], disable_observer=True)
+    await storage.setup()
+
+    events: list[AssetsUpdatedEvent] = []
+
+    async def on_updated(event: AssetsUpdatedEvent):
+        events.append(event)
+
+    internal_events().subscribe(AssetsUpdatedEvent, on_updated)
+    try:
+        agent = AICAgent(
+            id="poet",
+            name="Poet",
+            usage="Writes poems",
+            usage_examples=[],
+            system="You write poems",
+            defined_in=AssetLocation.AICONSOLE_CORE,
+            override=True,
+            last_modified=datetime(2000, 1, 1),
+        )
+        await storage.create_asset(agent)
+
+        assert events[-1].asset_ids == frozenset({"poet"}) and not events[-1].external
+        # The written asset is kept, not read back, but with what its file says about it
+        kept = storage.assets["poet"][0]
+        assert isinstance(kept, AICAgent) and kept.system == "You write poems"
+        assert (kept.defined_in, kept.override) == (AssetLocation.PROJECT_DIR, False)
+        assert kept.last_modified == datetime.fromtimestamp((project_dir / "agents" / "poet.toml").stat().st_mtime)
+        assert own_file_writes().is_own(project_dir / "agents" / "poet.toml")
+
+        chat = make_chat("chat", 2)
+        await storage.create_asset(chat)
+        chat = await storage.hydrate("chat")
+        assert isinstance(chat, AICChat)
+        events.clear()
+
+        # Clients get the mutations, a write behind flush is not announced
+        chat.message_groups[-1].messages[-1].content += " more"
+        await storage.persist_mutations(chat, None)
+
+        assert events == []
+        assert storage.assets["chat"][0] is chat
+
+        await storage.delete_asset("poet")
+
+        assert events[-1].asset_ids == frozenset({"poet"})
+        assert "poet" not in storage.assets
+    finally:
+        internal_events().unsubscribe(AssetsUpdatedEvent, on_updated)
+        storage.destroy()
@@ -0,0 +1,89 @@
+from typing import Awaitable, Callable
+
+import pytest
+
+from aiconsole.api.websockets.connection_manager import (
+    AICConnection,
+    connection_manager,
+)
+from aiconsole.api.websockets.server_messages import (
+    NotifyAboutAssetMutationsServerMessage,
+)
+from aiconsole.core.assets import aic_data_context
+from aiconsole.core.assets.aic_data_context import AICFileDataContext
+from aiconsole.core.assets.assets_service import Assets
+from aiconsole.core.assets.types import Asset
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.chat.types import AICChat
+from fastmutation.mutations import AppendToStringMutation, DeleteMutation
+
+
+class _Subscriber(AICConnection):
+    def __init__(self):
+        super().__init__(websocket=None, subscriptions=connection_manager().subscriptions)  # type: ignore
+        self.messages = []
+
+    async def send_encoded(self, encoded):
+        self.messages.append(encoded.message)
+
+
+@pytest.fixture
+def subscriber():
+    subscriber = _Subscriber()
+    subscriber.subscribe_to_ref(ChatRef("chat"))
+    yield subscriber
+    subscriber.unsubscribe_all()
+
+
+@pytest.mark.asyncio
+async def test_should_apply_batch_with_one_write_and_one_notification(
+    subscriber: _Subscriber,
+    make_chat: Callable[..., AICChat],
+    configure_project_assets: Callable[[list[Asset]], Awaitable[Assets]],
+):
+    chat = make_chat("chat", 10)
+    assets = await configure_project_assets([chat])
+    context = AICFileDataContext(origin=None, lock_id="batch")
+    chat_ref = ChatRef(id="chat", context=context)
+
+    await context.mutate_batch(
+        [DeleteMutation(ref=chat_ref.message_groups[f"group-{i}"]) for i in range(5)],
+        originating_from_server=True,
+    )
+
+    assert [group.id for group in chat.message_groups] == [f"group-{i}" for i in range(5, 10)]
+    assert assets.write_behind_stats.flushed == 1
+    # Nobody holds the lock of the chat any more
+    assert "chat" not in aic_data_context._asset_locks
+    assert len(subscriber.messages) == 1
+    assert isinstance(subscriber.messages[0], NotifyAboutAssetMutationsServerMessage)
+    assert len(subscriber.messages[0].mutations) == 5
+
+
+@pytest.mark.asyncio
+async def test_should_roll_back_whole_batch_when_a_mutation_fails(
+    subscriber: _Subscriber,
+    make_chat: Callable[..., AICChat],
+    configure_project_assets: Callable[[list[Asset]], Awaitable[Assets]],
+):
+    chat = make_chat("chat", 3)
+    assets = await configure_project_assets([chat])
+    context = AICFileDataContext(origin=None, lock_id="batch")
+    message_ref = ChatRef(id="chat", context=context).message_groups["group-2"].messages["message-2"]
+    content = chat.message_groups[2].messages[0].content
+
+    with pytest.raises(ValueError):
+        await context.mutate_batch(
+            [
+                AppendToStringMutation(ref=message_ref, key="content", value="appended"),
+                DeleteMutation(ref=ChatRef(id="chat", context=context).message_groups["group-1"]),
+                DeleteMutation(ref=ChatRef(id="chat", context=context).message_groups["missing"]),
+            ],
+            originating_from_server=True,
+        )
+
+    assert chat.message_groups[2].messages[0].content == content
+    assert [group.id for group in chat.message_groups] == ["group-0", "group-1", "group-2"]
+    assert await context.get(message_ref) is chat.message_groups[2].messages[0]
+    assert assets.write_behind_stats.flushed == 0
+    assert subscriber.messages == []
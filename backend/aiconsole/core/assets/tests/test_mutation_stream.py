@@ -0,0 +1,85 @@
+from typing import Awaitable, Callable
+
+import pytest
+
+from aiconsole.api.websockets.connection_manager import (
+    AICConnection,
+    connection_manager,
+)
+from aiconsole.api.websockets.server_messages import (
+    MutationsAppliedServerMessage,
+    NotifyAboutAssetMutationServerMessage,
+)
+from aiconsole.core.assets.aic_data_context import AICFileDataContext
+from aiconsole.core.assets.assets_service import Assets
+from aiconsole.core.assets.types import Asset
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.chat.types import AICChat
+from fastmutation.mutations import SetValueMutation
+
+
+class _Connection(AICConnection):
+    def __init__(self):
+        super().__init__(websocket=None, subscriptions=connection_manager().subscriptions)  # type: ignore
+        self.messages = []
+
+    async def send_encoded(self, encoded):
+        self.messages.append(encoded.message)
+
+
+@pytest.fixture
+def subscriber():
+    subscriber = _Connection()
+    subscriber.subscribe_to_ref(ChatRef("chat"))
+    yield subscriber
+    subscriber.unsubscribe_all()
+
+
+@pytest.mark.asyncio
+async def test_should_number_mutations_and_return_missed_ones(
+    subscriber: _Connection,
+    make_chat: Callable[..., AICChat],
+    configure_project_assets: Callable[[list[Asset]], Awaitable[Assets]],
+):
+    await configure_project_assets([make_chat("chat", 1)])
+    context = AICFileDataContext(origin=None, lock_id="stream")
+    chat_ref = ChatRef(id="chat", context=context)
+
+    async with context.mutation_stream_position(chat_ref) as (stream_id, start):
+        pass
+
+    for i in range(5):
+        await context.mutate(
+            SetValueMutation(ref=chat_ref, key="name", value=f"name {i}"), originating_from_server=True
+        )
+
+    async with context.mutation_stream_position(chat_ref) as (_, end):
+        pass
+
+    assert [message.seq for message in subscriber.messages] == list(range(start + 1, end + 1))
+
+    missed = context.mutations_since(chat_ref, stream_id, end - 2)
+    assert [entry.mutation.value for entry in missed or []] == ["name 3", "name 4"]
+    assert context.mutations_since(chat_ref, "other stream", end - 2) is None
+
+
+@pytest.mark.asyncio
+async def test_should_acknowledge_client_mutations_to_their_sender(
+    subscriber: _Connection,
+    make_chat: Callable[..., AICChat],
+    configure_project_assets: Callable[[list[Asset]], Awaitable[Assets]],
+):
+    await configure_project_assets([make_chat("chat", 1)])
+    sender = _Connection()
+    context = AICFileDataContext(origin=sender, lock_id="edit")  # type: ignore
+
+    await context.mutate(
+        SetValueMutation(ref=ChatRef(id="chat", context=context), key="name", value="edited"),
+        originating_from_server=False,
+    )
+
+    [notification] = subscriber.messages
+    [ack] = sender.messages
+    assert isinstance(notification, NotifyAboutAssetMutationServerMessage)
+    assert isinstance(ack, MutationsAppliedServerMessage)
+    assert ack.seq == notification.seq and ack.request_id == "edit"
@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from aiconsole.core.assets.fs.load_asset_from_fs import load_asset_from_fs
+from aiconsole.core.assets.sqlite.import_export import (
+    export_project_assets,
+    import_project_assets,
+)
+from aiconsole.core.assets.sqlite.sqlite_assets_storage import SqliteAssetsStorage
+from aiconsole.core.assets.types import AssetLocation, AssetType
+from aiconsole.core.chat.chat_journal import (
+    mutation_to_journal_record,
+    replay_chat_journal,
+)
+from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.chat.types import AICChat, AICChatHeadline
+from fastmutation.mutations import (
+    AppendToStringMutation,
+    CreateMutation,
+    DeleteMutation,
+    SetValueMutation,
+)
+
+
+async def _storage(project_dir: Path) -> SqliteAssetsStorage:
+    storage = SqliteAssetsStorage(project_dir / ".aic" / "assets.db")
+    success, error = await storage.setup()
+    assert success, error
+    return storage
+
+
+def _mutations():
+    group_ref = ChatRef(id="chat").message_groups["group-0"]
+    message_ref = group_ref.messages["message-0"]
+
+    return [
+        AppendToStringMutation(ref=message_ref, key="content", value=" appended"),
+        AppendToStringMutation(ref=message_ref.tool_calls["tool-call-0"], key="output", value="done"),
+        SetValueMutation(ref=group_ref, key="task", value="Greet"),
+        CreateMutation(
+            ref=group_ref.messages["message-new"],
+            object_type="AICMessage",
+            object={"timestamp": "", "content": "New", "tool_calls": [{"id": "t", "code": "", "headline": ""}]},
+        ),
+        DeleteMutation(ref=ChatRef(id="chat").message_groups["group-1"]),
+        SetValueMutation(ref=ChatRef(id="chat"), key="title_edited", value=True),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_should_persist_mutations_as_row_updates(
+    project_dir: Path, caplog: pytest.LogCaptureFixture, make_chat: Callable[..., AICChat]
+):
+    storage = await _storage(project_dir)
+    chat = make_chat("chat", 3)
+    await storage.create_asset(chat)
+
+    expected = chat.model_dump(mode="json", exclude={"id", "last_modified"})
+    replay_chat_journal(expected, [mutation_to_journal_record(mutation) for mutation in _mutations()])
+    chat = AICChat(id="chat", last_modified=chat.last_modified, **expected)
+
+    await storage.persist_mutations(chat, _mutations())
+    storage.destroy()
+
+    # Not written whole as a fallback
+    assert "Writing the whole chat" not in caplog.text
+
+    reopened = await _storage(project_dir)
+    assert isinstance(reopened.assets["chat"][0], AICChatHeadline)
+
+    loaded = await reopened.hydrate("chat")
+
+    assert isinstance(loaded, AICChat)
+    assert loaded.model_dump(exclude={"last_modified"}) == chat.model_dump(exclude={"last_modified"})
+    reopened.destroy()
+
+
+@pytest.mark.asyncio
+async def test_should_import_and_export_folder_layout(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, make_chat: Callable[..., AICChat]
+):
+    source, destination = tmp_path / "source", tmp_path / "destination"
+    (source / "chats").mkdir(parents=True)
+    data = make_chat("chat", 2).model_dump(mode="json", exclude={"id", "last_modified"})
+    (source / "chats" / "chat.json").write_text(json.dumps(data))
+    (source / "agents").mkdir()
+    (source / "agents" / "writer.toml").write_text('name = "Writer"\nusage = "Writes"\nsystem = "You write"\n')
+
+    assert await import_project_assets(source, tmp_path / "assets.db") == 2
+    assert await export_project_assets(destination, tmp_path / "assets.db") == 2
+
+    exported = await load_chat_history("chat", destination)
+    assert exported.model_dump(exclude={"last_modified"}) == (await load_chat_history("chat", source)).model_dump(
+        exclude={"last_modified"}
+    )
+    agent = await load_asset_from_fs(AssetType.AGENT, "writer", AssetLocation.PROJECT_DIR, destination)
+    assert (agent.name, agent.usage, agent.system) == ("Writer", "Writes", "You write")  # type: ignore
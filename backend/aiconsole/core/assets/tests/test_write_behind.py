@@ -0,0 +1,95 @@
+import asyncio
+from typing import Callable
+
+import pytest
+
+from aiconsole.core.assets.write_behind import WriteBehindQueue
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.chat.types import AICChat
+from fastmutation.mutations import AppendToStringMutation
+
+
+@pytest.fixture
+def written() -> list:
+    return []
+
+
+@pytest.fixture
+def queue(written: list) -> WriteBehindQueue:
+    async def write(asset, mutations):
+        written.append(asset.id)
+
+    return WriteBehindQueue(write=write, debounce=0.05, max_delay=0.2)
+
+
+@pytest.mark.asyncio
+async def test_should_write_once_after_burst_of_modifications(
+    queue: WriteBehindQueue, written: list, make_chat: Callable[..., AICChat]
+):
+    chat = make_chat("chat", 1)
+
+    for _ in range(100):
+        queue.mark_dirty(chat)
+
+    assert written == []
+
+    await asyncio.sleep(0.1)
+
+    assert written == ["chat"]
+    assert queue.stats.marked == 100
+    assert queue.stats.flushed == 1
+    assert queue.stats.write_amplification == 0.01
+
+
+@pytest.mark.asyncio
+async def test_should_write_at_least_every_max_delay(
+    queue: WriteBehindQueue, written: list, make_chat: Callable[..., AICChat]
+):
+    chat = make_chat("chat", 1)
+
+    for _ in range(15):
+        queue.mark_dirty(chat)
+        await asyncio.sleep(0.03)
+
+    assert len(written) >= 2
+
+
+@pytest.mark.asyncio
+async def test_should_flush_and_discard_pending_writes(
+    queue: WriteBehindQueue, written: list, make_chat: Callable[..., AICChat]
+):
+    first, second = make_chat("first", 1), make_chat("second", 1)
+
+    queue.mark_dirty(first)
+    queue.mark_dirty(second)
+    queue.discard("second")
+    await queue.flush_all()
+
+    assert written == ["first"]
+    assert queue.pending("first") is None
+
+
+@pytest.mark.asyncio
+async def test_should_retry_failed_write_of_whole_asset(make_chat: Callable[..., AICChat]):
+    writes: list = []
+
+    async def write(asset, mutations):
+        writes.append(mutations)
+        if len(writes) == 1:
+            raise OSError("No space left on device")
+
+    queue = WriteBehindQueue(write=write, debounce=0.01, max_delay=0.05)
+    chat = make_chat("chat", 1)
+    mutation = AppendToStringMutation(ref=ChatRef(id="chat"), key="name", value="a")
+    queue.mark_dirty(chat, mutation)
+
+    with pytest.raises(OSError):
+        await queue.flush("chat")
+
+    assert queue.pending("chat") is chat
+
+    await asyncio.sleep(0.1)
+
+    # Written whole, the mutations of the failed write may be persisted just in part
+    assert writes == [[mutation], None]
+    assert queue.pending("chat") is None
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from aiconsole.core.assets.types import Asset
+from fastmutation.mutations import AssetMutation
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass
+class WriteBehindStats:
+    marked: int = 0
+    flushed: int = 0
+    flush_seconds_total: float = 0
+    flush_seconds_max: float = 0
+
+    @property
+    def write_amplification(self) -> float:
+        """
+        Full asset writes per in memory modification, 1.0 means every modification rewrote the whole asset.
+        """
+        return self.flushed / self.marked if self.marked else 0
+
+    @property
+    def flush_seconds_avg(self) -> float:
+        return self.flush_seconds_total / self.flushed if self.flushed else 0
+
+
+@dataclass
+class _DirtyAsset:
+    asset: Asset
+    first_marked_at: float
+    marks: int = 0
+    # None when a modification was not described by a mutation and the whole asset has to be written
+    mutations: list[AssetMutation] | None = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = field(default=None, repr=False)
+
+
+class WriteBehindQueue:
+    """
+    Keeps track of assets modified in memory and writes them with a delay, so a burst of modifications
+    (e.g. a streamed response) results in a few writes instead of one per modification.
+
+    An asset is written when no modification happened for `debounce` seconds, but at least every `max_delay` seconds
+    while it keeps changing. flush / flush_all write pending assets right away.
+
+    The mutations which modified an asset are passed to `write` along with it, so a storage can persist
+    just the changes. They are None if any of the modifications was marked without a mutation.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Asset, list[AssetMutation] | None], Awaitable[None]],
+        debounce: float,
+        max_delay: float,
+    ):
+        self._write = write
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.stats = WriteBehindStats()
+        self._dirty: dict[str, _DirtyAsset] = {}
+        self._flush_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._timed_flushes: set[asyncio.Task] = set()
+
+    def mark_dirty(self, asset: Asset, mutation: AssetMutation | None = None) -> None:
+        now = time.monotonic()
+        dirty = self._dirty.get(asset.id)
+
+        if dirty is None or dirty.asset is not asset:
+            if dirty is not None and dirty.timer:
+                dirty.timer.cancel()
+            dirty = self._dirty[asset.id] = _DirtyAsset(asset=asset, first_marked_at=now)
+
+        dirty.marks += 1
+        if mutation is None:
+            dirty.mutations = None
+        elif dirty.mutations is not None:
+            dirty.mutations.append(mutation)
+        self.stats.marked += 1
+
+        if dirty.timer:
+            dirty.timer.cancel()
+
+        delay = min(self.debounce, max(0, dirty.first_marked_at + self.max_delay - now))
+        dirty.timer = asyncio.get_running_loop().call_later(delay, self._on_timer, asset.id)
+
+    def pending(self, asset_id: str) -> Asset | None:
+        dirty = self._dirty.get(asset_id)
+        return dirty.asset if dirty else None
+
+    def discard(self, asset_id: str) -> None:
+        dirty = self._dirty.pop(asset_id, None)
+
+        if dirty and dirty.timer:
+            dirty.timer.cancel()
+
+    async def flush(self, asset_id: str) -> None:
+        async with self._flush_locks[asset_id]:
+            dirty = self._dirty.pop(asset_id, None)
+
+            if dirty is None:
+                return
+
+            if dirty.timer:
+                dirty.timer.cancel()
+
+            start = time.perf_counter()
+            try:
+                await self._write(dirty.asset, dirty.mutations)
+            except Exception:
+                self._requeue(asset_id, dirty)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self.stats.flushed += 1
+                self.stats.flush_seconds_total += elapsed
+                self.stats.flush_seconds_max = max(self.stats.flush_seconds_max, elapsed)
+
+            _log.debug(
+                f"Flushed {asset_id} in {elapsed * 1000:.1f} ms ({dirty.marks} modifications), "
+                f"write amplification {self.stats.write_amplification:.3f}"
+            )
+
+    def _requeue(self, asset_id: str, failed: _DirtyAsset) -> None:
+        """
+        Puts back an asset which failed to be written, along with what was marked meanwhile. It's written whole
+        on the retry, as the storage may have persisted just a part of the mutations.
+        """
+        dirty = self._dirty.get(asset_id)
+
+        if dirty is None:
+            dirty = self._dirty[asset_id] = failed
+        elif dirty.asset is failed.asset:
+            dirty.marks += failed.marks
+            dirty.first_marked_at = min(dirty.first_marked_at, failed.first_marked_at)
+
+        dirty.mutations = None
+
+        if dirty.timer:
+            dirty.timer.cancel()
+        dirty.timer = asyncio.get_running_loop().call_later(self.max_delay, self._on_timer, asset_id)
+
+    async def flush_all(self) -> None:
+        for asset_id in list(self._dirty.keys()):
+            await self.flush(asset_id)
+
+    def _on_timer(self, asset_id: str) -> None:
+        flush = asyncio.ensure_future(self._flush_from_timer(asset_id))
+        self._timed_flushes.add(flush)
+        flush.add_done_callback(self._timed_flushes.discard)
+
+    async def _flush_from_timer(self, asset_id: str) -> None:
+        try:
+            await self.flush(asset_id)
+        except Exception as e:
+            _log.exception(f"Failed to write asset {asset_id}: {e}")
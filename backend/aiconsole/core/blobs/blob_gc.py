@@ -0,0 +1,113 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Removes the blobs no chat of the project refers to anymore, in the background after the project is opened.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Iterable
+
+from aiconsole.consts import BLOB_GC_INTERVAL_SECONDS
+from aiconsole.core.assets.aic_data_context import read_chat
+from aiconsole.core.assets.types import AssetType
+from aiconsole.core.blobs.blob_store import BlobStore, find_blob_refs, get_blob_store
+from aiconsole.core.chat.types import AICChat
+from aiconsole.core.project.project import get_project_assets
+
+_log = logging.getLogger(__name__)
+
+# Touched after every collection, outside of the buckets of blobs
+_LAST_COLLECTION_MARKER = ".last_collection"
+
+_collection_task: asyncio.Task | None = None
+
+
+def chat_blob_refs(chat: AICChat) -> set[str]:
+    refs: set[str] = set()
+
+    for group in chat.message_groups:
+        for message in group.messages:
+            refs |= find_blob_refs(message.content)
+            for tool_call in message.tool_calls:
+                refs |= find_blob_refs(tool_call.output or "")
+
+    return refs
+
+
+async def collect_blob_garbage(
+    store: BlobStore, chat_ids: Iterable[str], read_chat: Callable[[str], Awaitable[AICChat | None]]
+) -> int:
+    """
+    Removes the blobs none of the chats refers to, returns the number of removed ones.
+    Nothing is removed if any of the chats can't be read.
+    """
+    referenced: set[str] = set()
+
+    for chat_id in chat_ids:
+        if (chat := await read_chat(chat_id)) is not None:
+            referenced |= chat_blob_refs(chat)
+
+    return await asyncio.to_thread(store.collect_garbage, referenced)
+
+
+def schedule_blob_garbage_collection(interval_seconds: float = BLOB_GC_INTERVAL_SECONDS) -> None:
+    """
+    Collects the garbage of the blob store of the project in the background, unless it was done less than
+    interval_seconds ago.
+    """
+    global _collection_task
+
+    cancel_blob_garbage_collection()
+
+    if interval_seconds > 0:
+        _collection_task = asyncio.create_task(_collect_if_due(get_blob_store(), interval_seconds))
+
+
+def cancel_blob_garbage_collection() -> None:
+    global _collection_task
+
+    if _collection_task is not None:
+        _collection_task.cancel()
+        _collection_task = None
+
+
+async def _collect_if_due(store: BlobStore, interval_seconds: float) -> None:
+    marker_path = store.directory / _LAST_COLLECTION_MARKER
+
+    if not store.directory.is_dir():
+        return
+
+    try:
+        if time.time() - marker_path.stat().st_mtime < interval_seconds:
+            return
+    except FileNotFoundError:
+        pass
+
+    chat_ids = [
+        assets[0].id
+        for assets in get_project_assets().unified_assets.values()
+        if assets and assets[0].type == AssetType.CHAT
+    ]
+
+    try:
+        removed = await collect_blob_garbage(store, chat_ids, read_chat)
+    except Exception as e:
+        _log.exception(f"Failed to collect unreferenced blobs: {e}")
+        return
+
+    marker_path.touch()
+    _log.info(f"Removed {removed} unreferenced blobs")
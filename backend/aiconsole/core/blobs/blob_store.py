@@ -0,0 +1,136 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Content-addressed store of binary outputs of tool calls (.aic/blobs/), e.g. images drawn by Python code.
+
+A blob is stored once, under the SHA-256 of its content and the extension of its type
+(.aic/blobs/ab/ab12...ef.png). Chats refer to blobs by aic-blob:<blob id> references in their texts, blobs are
+served by GET /api/blobs/<blob id>. Blobs no chat refers to anymore are removed by collect_garbage.
+"""
+import hashlib
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Iterator
+from uuid import uuid4
+
+_log = logging.getLogger(__name__)
+
+BLOB_REF_PREFIX = "aic-blob:"
+
+_blob_id = re.compile(r"[0-9a-f]{64}\.[a-z0-9]+")
+_blob_ref = re.compile(re.escape(BLOB_REF_PREFIX) + f"({_blob_id.pattern})")
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "svg": "image/svg+xml",
+}
+
+
+def blob_ref(blob_id: str) -> str:
+    return f"{BLOB_REF_PREFIX}{blob_id}"
+
+
+def image_markdown(blob_id: str) -> str:
+    return f"![image]({blob_ref(blob_id)})"
+
+
+def find_blob_refs(text: str) -> set[str]:
+    """
+    Ids of the blobs referred to in the text.
+    """
+    return set(_blob_ref.findall(text)) if BLOB_REF_PREFIX in text else set()
+
+
+def media_type_of(blob_id: str) -> str:
+    return MEDIA_TYPES.get(blob_id.rsplit(".", 1)[-1], "application/octet-stream")
+
+
+class BlobStore:
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def path_of(self, blob_id: str) -> Path:
+        if not _blob_id.fullmatch(blob_id):
+            raise ValueError(f"Invalid blob id {blob_id!r}")
+
+        return self.directory / blob_id[:2] / blob_id
+
+    def put(self, content: bytes, extension: str) -> str:
+        """
+        Stores the content unless it already is stored, returns its blob id.
+        """
+        blob_id = f"{hashlib.sha256(content).hexdigest()}.{extension.lower()}"
+        blob_path = self.path_of(blob_id)
+
+        if blob_path.exists():
+            # Referred to again, it must outlive the grace period of collect_garbage like a new one
+            os.utime(blob_path)
+            return blob_id
+
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = blob_path.with_name(f".{blob_id}.{uuid4().hex}.tmp")
+
+        try:
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return blob_id
+
+    def _files(self) -> Iterator[os.DirEntry]:
+        """
+        Files of the stored blobs, and temporary files left behind by interrupted writes.
+        """
+        if not self.directory.is_dir():
+            return
+
+        for bucket in os.scandir(self.directory):
+            if bucket.is_dir():
+                yield from (entry for entry in os.scandir(bucket.path) if entry.is_file())
+
+    def collect_garbage(self, referenced: set[str], min_age_seconds: float = 3600) -> int:
+        """
+        Removes the blobs which are not referenced, returns the number of removed ones. Blobs stored less than
+        min_age_seconds ago are kept, the chats referring to them may not be saved yet.
+        """
+        removed = 0
+        now = time.time()
+
+        for entry in list(self._files()):
+            if entry.name in referenced or now - entry.stat().st_mtime < min_age_seconds:
+                continue
+
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+
+        return removed
+
+
+def get_blob_store(project_path: Path | None = None) -> BlobStore:
+    # The code interpreters use the store, they are imported along with the project module
+    from aiconsole.core.project.paths import get_aic_directory
+
+    return BlobStore(get_aic_directory(project_path) / "blobs")
@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aiconsole.api.endpoints import blobs
+from aiconsole.core.blobs.blob_gc import collect_blob_garbage
+from aiconsole.core.blobs.blob_store import BlobStore, find_blob_refs, image_markdown
+from aiconsole.core.chat.types import AICChat
+
+
+def test_should_store_content_once(tmp_path: Path):
+    store = BlobStore(tmp_path / "blobs")
+
+    blob_id = store.put(b"\x89PNG image", "PNG")
+
+    assert store.put(b"\x89PNG image", "png") == blob_id
+    assert store.path_of(blob_id).read_bytes() == b"\x89PNG image"
+    assert store.path_of(blob_id).parent.name == blob_id[:2]
+    assert [path.name for path in (tmp_path / "blobs").rglob("*")] == [blob_id[:2], blob_id]
+    assert find_blob_refs(f"Plot:\n{image_markdown(blob_id)}\n") == {blob_id}
+
+    with pytest.raises(ValueError):
+        store.path_of("../../secrets.png")
+
+
+@pytest.mark.asyncio
+async def test_should_collect_unreferenced_blobs(tmp_path: Path, make_chat: Callable[..., AICChat]):
+    store = BlobStore(tmp_path / "blobs")
+    kept, removed, recent = store.put(b"kept", "png"), store.put(b"removed", "png"), store.put(b"recent", "png")
+    for blob_id in (kept, removed):
+        os.utime(store.path_of(blob_id), (0, 0))
+
+    chat = make_chat("chat", 2)
+    chat.message_groups[1].messages[0].tool_calls[0].output = f"Plot:\n{image_markdown(kept)}\n"
+
+    async def read_chat(chat_id: str):
+        return chat
+
+    assert await collect_blob_garbage(store, ["chat"], read_chat) == 1
+    assert store.path_of(kept).exists() and store.path_of(recent).exists()
+    assert not store.path_of(removed).exists()
+
+
+def test_should_serve_blobs_cacheable(project_dir: Path):
+    blob_id = BlobStore(project_dir / ".aic" / "blobs").put(b"\x89PNG image", "png")
+
+    app = FastAPI()
+    app.include_router(blobs.router, prefix="/api/blobs")
+    client = TestClient(app)
+
+    response = client.get(f"/api/blobs/{blob_id}")
+    assert response.status_code == 200
+    assert response.content == b"\x89PNG image"
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+    assert client.get(f"/api/blobs/{blob_id}", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    assert client.get(f"/api/blobs/{'0' * 64}.png").status_code == 404
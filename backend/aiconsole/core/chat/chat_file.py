@@ -0,0 +1,104 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Encoding of chat files (chats/<id>.json).
+
+A chat file is either plain JSON or, when its JSON takes at least CHAT_COMPRESSION_MIN_BYTES, gzip compressed
+JSON under the same name. The two are told apart by the gzip magic number, a JSON file can never start with it.
+"""
+import asyncio
+import codecs
+import gzip
+import json
+import zlib
+from pathlib import Path
+from typing import Any
+
+import aiofiles
+
+from aiconsole.consts import CHAT_COMPRESSION_MIN_BYTES
+from aiconsole.utils.atomic_write import write_bytes_atomically
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Higher levels barely shrink chats further (base64 images dominate large ones) and take much longer
+_COMPRESSION_LEVEL = 1
+
+
+def encode_chat_file(data: dict[str, Any], compression_min_bytes: int = CHAT_COMPRESSION_MIN_BYTES) -> bytes:
+    """
+    :param compression_min_bytes: Chats taking less are stored as plain JSON, 0 - never compress.
+    """
+    content = json.dumps(data).encode("utf8", errors="replace")
+
+    if compression_min_bytes and len(content) >= compression_min_bytes:
+        # mtime=0, so the same chat always compresses to the same bytes
+        return gzip.compress(content, compresslevel=_COMPRESSION_LEVEL, mtime=0)
+
+    return content
+
+
+def decode_chat_file(content: bytes) -> dict[str, Any]:
+    if content.startswith(GZIP_MAGIC):
+        content = gzip.decompress(content)
+
+    return json.loads(content.decode("utf8", errors="replace"))
+
+
+async def read_chat_file(chat_file_path: Path) -> dict[str, Any]:
+    async with aiofiles.open(chat_file_path, mode="rb") as f:
+        return decode_chat_file(await f.read())
+
+
+async def write_chat_file(
+    chat_file_path: Path, data: dict[str, Any], compression_min_bytes: int = CHAT_COMPRESSION_MIN_BYTES
+) -> None:
+    # Compressing a large chat takes a while, it is done off the event loop
+    content = await asyncio.to_thread(encode_chat_file, data, compression_min_bytes)
+    await write_bytes_atomically(chat_file_path, content)
+
+
+class ChatFileTextReader:
+    """
+    Reads the JSON text of an open chat file (opened in binary mode) chunk by chunk, decompressing it if needed.
+    """
+
+    def __init__(self, f: Any):
+        self.f = f
+        self._decoder = codecs.getincrementaldecoder("utf8")(errors="replace")
+        self._decompressor: Any = None
+        self._started = False
+
+    async def read(self, size: int) -> str:
+        while True:
+            chunk = await self.f.read(size)
+
+            if not self._started:
+                self._started = True
+                if chunk.startswith(GZIP_MAGIC):
+                    # wbits for a gzip header and trailer
+                    self._decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+
+            if not chunk:
+                rest = self._decompressor.flush() if self._decompressor else b""
+                return self._decoder.decode(rest, final=True)
+
+            if self._decompressor:
+                chunk = self._decompressor.decompress(chunk)
+
+            # A chunk may decompress to nothing, or to a part of a character only
+            if text := self._decoder.decode(chunk):
+                return text
@@ -0,0 +1,276 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Index of the chats of a project (.aic/chat_index.json), for listing chats without parsing their files.
+
+An entry is valid as long as the chat file has the mtime and size it was indexed with. The app updates
+the entries of the chats it writes, chat files changed outside of it only get their name read again,
+with a partial read which stops at the first message.
+"""
+import json
+import logging
+import os
+import re
+from asyncio import TimerHandle, get_running_loop
+from pathlib import Path
+from typing import Any
+
+import aiofiles
+import aiofiles.os as async_os
+from pydantic import BaseModel, ValidationError
+
+from aiconsole.core.chat.chat_file import ChatFileTextReader, read_chat_file
+from aiconsole.core.chat.chat_journal import get_chat_journal_path, read_chat_file_data
+from aiconsole.core.chat.chat_schema import default_chat_name
+from aiconsole.core.chat.types import AICChat
+
+_log = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+class ChatIndexEntry(BaseModel):
+    id: str
+    name: str
+    mtime: float
+    size: int
+    # None if the chat was only partially read
+    message_count: int | None
+
+    def is_valid_for(self, stat: os.stat_result) -> bool:
+        return self.mtime == stat.st_mtime and self.size == stat.st_size
+
+
+class ChatIndex:
+    def __init__(self, index_file_path: Path, save_delay: float = 1.0):
+        self.index_file_path = index_file_path
+        self.save_delay = save_delay
+        self.entries: dict[str, ChatIndexEntry] = {}
+        self._save_timer: TimerHandle | None = None
+
+    def load(self) -> None:
+        try:
+            raw = json.loads(self.index_file_path.read_text(encoding="utf8"))
+            self.entries = {entry["id"]: ChatIndexEntry(**entry) for entry in raw["chats"]}
+        except FileNotFoundError:
+            self.entries = {}
+        except (ValueError, KeyError, TypeError, ValidationError) as e:
+            # The index only spares reading the chats, it is rebuilt from them
+            _log.warning(f"Ignoring invalid chat index {self.index_file_path}: {e}")
+            self.entries = {}
+
+    def save(self) -> None:
+        if self._save_timer:
+            self._save_timer.cancel()
+            self._save_timer = None
+
+        self.index_file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file_path = self.index_file_path.with_name(f".{self.index_file_path.name}.tmp")
+        tmp_file_path.write_text(
+            json.dumps({"chats": [entry.model_dump() for entry in self.entries.values()]}), encoding="utf8"
+        )
+        os.replace(tmp_file_path, self.index_file_path)
+
+    def schedule_save(self) -> None:
+        """
+        Saves the index after save_delay, so a burst of chat writes saves it once.
+        """
+        if self._save_timer is None:
+            self._save_timer = get_running_loop().call_later(self.save_delay, self._save_scheduled)
+
+    def _save_scheduled(self) -> None:
+        self._save_timer = None
+        try:
+            self.save()
+        except OSError as e:
+            _log.warning(f"Failed to save chat index {self.index_file_path}: {e}")
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        return self._save_timer is not None
+
+    def get_valid(self, chat_id: str, stat: os.stat_result) -> ChatIndexEntry | None:
+        entry = self.entries.get(chat_id)
+        return entry if entry is not None and entry.is_valid_for(stat) else None
+
+    def update(self, chat_id: str, stat: os.stat_result, name: str, message_count: int | None) -> None:
+        self.entries[chat_id] = ChatIndexEntry(
+            id=chat_id,
+            name=name,
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            message_count=message_count,
+        )
+        self.schedule_save()
+
+    def update_from_chat(self, chat: AICChat, stat: os.stat_result) -> None:
+        message_count = sum(len(group.messages) for group in chat.message_groups)
+        self.update(chat.id, stat, chat_headline_name(chat), message_count)
+
+    def update_from_data(self, chat_id: str, data: dict[str, Any], stat: os.stat_result) -> None:
+        message_count = sum(len(group.get("messages") or []) for group in data["message_groups"])
+        self.update(chat_id, stat, chat_name_of(data), message_count)
+
+    def update_stat(self, chat_id: str, stat: os.stat_result) -> None:
+        """
+        Revalidates the entry of a chat which was rewritten without being modified, e.g. compacted.
+        """
+        if entry := self.entries.get(chat_id):
+            self.update(chat_id, stat, entry.name, entry.message_count)
+
+    def remove(self, chat_id: str) -> None:
+        if self.entries.pop(chat_id, None) is not None:
+            self.schedule_save()
+
+    async def refresh_name(self, chat_id: str, chat_file_path: Path) -> ChatIndexEntry:
+        """
+        Returns a valid entry of the chat, reading just its name if the file changed since it was indexed.
+        """
+        stat = await async_os.stat(chat_file_path)
+
+        if entry := self.get_valid(chat_id, stat):
+            return entry
+
+        self.update(chat_id, stat, await read_chat_name(chat_file_path), message_count=None)
+        return self.entries[chat_id]
+
+
+class _PrefixReader:
+    """
+    Decodes JSON values one by one from the beginning of a file, reading only as much of it as needed.
+    """
+
+    def __init__(self, f: Any, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    async def _read_more(self) -> None:
+        chunk = await self.f.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+
+    async def _skip_whitespace(self) -> None:
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()  # type: ignore
+            if self.pos < len(self.buffer) or self.eof:
+                return
+            await self._read_more()
+
+    async def peek(self) -> str:
+        await self._skip_whitespace()
+        if self.pos >= len(self.buffer):
+            raise ValueError("Unexpected end of chat file")
+        return self.buffer[self.pos]
+
+    async def punctuation(self) -> str:
+        char = await self.peek()
+        self.pos += 1
+        return char
+
+    async def value(self) -> Any:
+        await self._skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A number or a literal at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            await self._read_more()
+
+
+async def read_chat_name(chat_file_path: Path, chunk_size: int = 16 * 1024) -> str:
+    """
+    Reads the name of a chat the way load_chat_history derives it, without reading more of the file than needed.
+    Chat files store their top level fields before the message groups, a chat with a journal is read whole.
+    Compressed chat files are decompressed as far as they are read.
+    """
+    if await async_os.path.exists(get_chat_journal_path(chat_file_path)):
+        return chat_name_of(await read_chat_file_data(chat_file_path))
+
+    async with aiofiles.open(chat_file_path, mode="rb") as f:
+        reader = _PrefixReader(ChatFileTextReader(f), chunk_size)
+        fields: dict[str, Any] = {}
+
+        if await reader.punctuation() != "{":
+            raise ValueError(f"Chat file {chat_file_path} is not a JSON object")
+
+        while await reader.peek() != "}":
+            key = await reader.value()
+            await reader.punctuation()  # :
+
+            if key == "message_groups":
+                if "title_edited" not in fields:
+                    # Files written before title_edited existed
+                    break
+
+                if fields["title_edited"] and fields.get("name"):
+                    return fields["name"]
+
+                return await _read_first_message_content(reader) or "New Chat"
+
+            fields[key] = await reader.value()
+
+            if await reader.punctuation() == "}":
+                break
+
+    return chat_name_of(await read_chat_file(chat_file_path))
+
+
+async def _read_first_message_content(reader: _PrefixReader) -> str | None:
+    if await reader.punctuation() != "[":
+        raise ValueError("message_groups is not a list")
+
+    while await reader.peek() != "]":
+        group = await reader.value()
+        for msg in group.get("messages") or []:
+            return msg.get("content")
+
+        if await reader.punctuation() == "]":
+            break
+
+    return None
+
+
+def chat_name_of(data: dict[str, Any]) -> str:
+    """
+    The name of a chat given its raw data, as load_chat_history derives it.
+    """
+    if data.get("title_edited") and data.get("name"):
+        return data["name"]
+    return default_chat_name(data)
+
+
+def chat_headline_name(chat: AICChat) -> str:
+    """
+    The name of a loaded chat, as chat_name_of derives it from the raw data.
+    """
+    if chat.title_edited and chat.name:
+        return chat.name
+
+    for group in chat.message_groups:
+        for message in group.messages:
+            return message.content or "New Chat"
+
+    return "New Chat"
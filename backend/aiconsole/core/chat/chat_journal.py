@@ -0,0 +1,216 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Append-only journal of mutations stored next to a chat snapshot (chats/<id>.json + chats/<id>.journal).
+Journals are never compressed, see chat_file for the snapshots.
+
+Every line of a journal is a JSON record of one mutation, addressed by the path of the mutated object
+inside of the chat. Replaying the records over the snapshot gives the current state of the chat.
+
+The first line of a journal is a header with a random journal id. A snapshot which already contains a journal
+stores its id, so a journal left behind by an interrupted write is never replayed twice.
+"""
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any
+
+import aiofiles
+import aiofiles.os as async_os
+
+from aiconsole.consts import CHAT_COMPRESSION_MIN_BYTES
+from aiconsole.core.chat.chat_file import read_chat_file, write_chat_file
+from aiconsole.core.chat.chat_schema import CHAT_SCHEMA_VERSION, SCHEMA_VERSION_KEY
+from fastmutation.mutations import (
+    AppendToStringMutation,
+    AssetMutation,
+    CreateMutation,
+    DeleteMutation,
+    SetValueMutation,
+)
+
+_log = logging.getLogger(__name__)
+
+JOURNAL_HEADER_TYPE = "JournalHeader"
+FOLDED_JOURNAL_ID_KEY = "folded_journal_id"
+
+
+def get_chat_journal_path(chat_file_path: Path) -> Path:
+    return chat_file_path.with_suffix(".journal")
+
+
+def mutation_to_journal_record(mutation: AssetMutation) -> dict[str, Any]:
+    # [0] is 'assets' and [1] is the chat id
+    record: dict[str, Any] = {"type": mutation.type, "path": mutation.ref.ref_segments[2:]}
+
+    if isinstance(mutation, CreateMutation):
+        record["object_type"] = mutation.object_type
+        record["object"] = mutation.object
+    elif isinstance(mutation, (SetValueMutation, AppendToStringMutation)):
+        record["key"] = mutation.key
+        record["value"] = mutation.value
+
+    return record
+
+
+async def append_to_chat_journal(journal_path: Path, mutations: list[AssetMutation]) -> int:
+    """
+    Appends the mutations to the journal and returns the size of the journal afterwards.
+    """
+    lines = "".join(json.dumps(mutation_to_journal_record(mutation)) + "\n" for mutation in mutations)
+
+    async with aiofiles.open(journal_path, "a", encoding="utf8", errors="replace") as f:
+        if await f.tell() == 0:
+            lines = json.dumps({"type": JOURNAL_HEADER_TYPE, "id": str(uuid.uuid4())}) + "\n" + lines
+
+        await f.write(lines)
+        return await f.tell()
+
+
+async def read_chat_journal_id(journal_path: Path) -> str | None:
+    if not await async_os.path.exists(journal_path):
+        return None
+
+    async with aiofiles.open(journal_path, "r", encoding="utf8", errors="replace") as f:
+        try:
+            header = json.loads(await f.readline())
+        except json.JSONDecodeError:
+            return None
+
+    return header.get("id") if header.get("type") == JOURNAL_HEADER_TYPE else None
+
+
+async def read_chat_journal(journal_path: Path) -> list[dict[str, Any]]:
+    if not await async_os.path.exists(journal_path):
+        return []
+
+    async with aiofiles.open(journal_path, "r", encoding="utf8", errors="replace") as f:
+        lines = (await f.read()).splitlines()
+
+    records = []
+    for i, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            # Only the last record can be incomplete, it was being written when the app went down
+            if i == len(lines) - 1:
+                _log.warning(f"Skipping incomplete last record of {journal_path}")
+            else:
+                raise
+
+    return records
+
+
+def replay_chat_journal(data: dict[str, Any], records: list[dict[str, Any]]) -> None:
+    """
+    Applies journal records to raw (not yet validated) chat data, in place.
+
+    KEEP THIS IN SYNC WITH fastmutation.apply_mutation
+    """
+    folded_journal_id = data.pop(FOLDED_JOURNAL_ID_KEY, None)
+
+    # Objects addressed by path, repeated appends to the same message are the common case
+    resolved: dict[tuple[str, ...], Any] = {(): data}
+
+    def resolve(path: tuple[str, ...]) -> Any:
+        if path not in resolved:
+            parent = resolve(path[:-1])
+            if len(path) % 2 == 1:
+                resolved[path] = parent.setdefault(path[-1], [])
+            else:
+                resolved[path] = next(item for item in parent if item.get("id") == path[-1])
+
+        return resolved[path]
+
+    def forget_resolved() -> None:
+        resolved.clear()
+        resolved[()] = data
+
+    for record in records:
+        if record["type"] == JOURNAL_HEADER_TYPE:
+            if record["id"] == folded_journal_id:
+                return
+            continue
+
+        path = tuple(record["path"])
+
+        match record["type"]:
+            case CreateMutation.__name__:
+                resolve(path[:-1]).append({**record["object"], "id": path[-1]})
+            case DeleteMutation.__name__:
+                collection = resolve(path[:-1])
+                collection[:] = [item for item in collection if item.get("id") != path[-1]]
+                forget_resolved()
+            case SetValueMutation.__name__:
+                resolve(path)[record["key"]] = record["value"]
+                # Replacing a whole collection
+                if path + (record["key"],) in resolved:
+                    forget_resolved()
+            case AppendToStringMutation.__name__:
+                obj = resolve(path)
+                obj[record["key"]] = (obj.get(record["key"]) or "") + record["value"]
+            case _:
+                raise ValueError(f"Unknown journal record type {record['type']}")
+
+
+async def read_chat_file_data(chat_file_path: Path) -> dict[str, Any]:
+    """
+    Reads the raw data of a chat snapshot with its journal replayed over it.
+    """
+    data = await read_chat_file(chat_file_path)
+    replay_chat_journal(data, await read_chat_journal(get_chat_journal_path(chat_file_path)))
+
+    return data
+
+
+async def write_chat_snapshot(
+    chat_file_path: Path, data: dict[str, Any], compression_min_bytes: int = CHAT_COMPRESSION_MIN_BYTES
+) -> None:
+    """
+    Writes the whole chat (in the current schema version), superseding its journal.
+    Must not run concurrently with appends to the same journal.
+    """
+    journal_path = get_chat_journal_path(chat_file_path)
+    journal_id = await read_chat_journal_id(journal_path)
+
+    data = {**data, SCHEMA_VERSION_KEY: CHAT_SCHEMA_VERSION}
+
+    if journal_id is not None:
+        data[FOLDED_JOURNAL_ID_KEY] = journal_id
+
+    await write_chat_file(chat_file_path, data, compression_min_bytes)
+
+    if await async_os.path.exists(journal_path):
+        await async_os.remove(journal_path)
+
+
+async def compact_chat_journal(chat_file_path: Path, compression_min_bytes: int = CHAT_COMPRESSION_MIN_BYTES) -> None:
+    """
+    Folds the journal into the snapshot.
+    Must not run concurrently with appends to the same journal.
+    """
+    if not await async_os.path.exists(get_chat_journal_path(chat_file_path)):
+        return
+
+    data = await read_chat_file_data(chat_file_path)
+    mtime = (await async_os.stat(chat_file_path)).st_mtime
+
+    await write_chat_snapshot(chat_file_path, data, compression_min_bytes)
+
+    # Compaction is not a modification of the chat
+    os.utime(chat_file_path, (mtime, mtime))
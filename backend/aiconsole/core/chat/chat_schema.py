@@ -0,0 +1,106 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Versions of the chat file format.
+
+Every chat file stores the version of its format under SCHEMA_VERSION_KEY (files written before versioning
+have none, they are version 0). Older files are migrated to CHAT_SCHEMA_VERSION when loaded and written back,
+so files in the current format are never migrated again.
+"""
+from typing import Any, Callable
+
+from aiconsole.core.assets.types import AssetLocation
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _migrate_to_v1(data: dict[str, Any]) -> None:
+    for group in data["message_groups"]:
+        # agent_id was replaced by actor_id
+        if "agent_id" in group:
+            group["actor_id"] = {
+                "type": "user" if group["agent_id"] == "user" else "agent",
+                "id": group["agent_id"],
+            }
+            del group["agent_id"]
+
+        if "analysis" not in group:
+            group["analysis"] = ""
+
+        for msg in group.get("messages") or []:
+            if "tool_calls" not in msg:
+                msg["tool_calls"] = []
+
+            for tool_call in msg["tool_calls"] or []:
+                if "headline" not in tool_call:
+                    tool_call["headline"] = ""
+
+                if tool_call.get("language") == "shell":
+                    tool_call["language"] = "python"
+
+                if "type" not in tool_call:
+                    tool_call["type"] = "function"
+
+    if not data.get("name"):
+        if data.get("headline"):
+            data["name"] = data["headline"]
+        elif data.get("title"):
+            data["name"] = data["title"]
+        else:
+            data["name"] = default_chat_name(data)
+
+    data.pop("id", None)
+    data.pop("last_modified", None)
+
+    data.setdefault("usage_examples", [])
+    data.setdefault("usage", "")
+    data.setdefault("defined_in", AssetLocation.PROJECT_DIR)
+    data.setdefault("override", False)
+
+
+# _MIGRATIONS[n] migrates raw chat data from version n to n + 1
+_MIGRATIONS: list[Callable[[dict[str, Any]], None]] = [
+    _migrate_to_v1,
+]
+
+CHAT_SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def default_chat_name(data: dict[str, Any]) -> str:
+    for group in data["message_groups"]:
+        for msg in group.get("messages") or []:
+            return msg.get("content") or "New Chat"
+
+    return "New Chat"
+
+
+def migrate_chat_data(data: dict[str, Any]) -> bool:
+    """
+    Migrates raw chat data to the current version in place, returns whether anything had to be migrated.
+    """
+    version = data.get(SCHEMA_VERSION_KEY, 0)
+
+    if version == CHAT_SCHEMA_VERSION:
+        return False
+
+    if version > CHAT_SCHEMA_VERSION:
+        raise ValueError(f"Chat schema version {version} is newer than the supported {CHAT_SCHEMA_VERSION}")
+
+    for migration in _MIGRATIONS[version:]:
+        migration(data)
+
+    data[SCHEMA_VERSION_KEY] = CHAT_SCHEMA_VERSION
+    return True
@@ -0,0 +1,497 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Full-text index of the chats of a project (.aic/chat_search_index.json): message contents, code and outputs
+of tool calls, analyses and tasks of message groups.
+
+Every indexed text is a document addressed by the path of its object in the chat and the field of the text.
+Mutations of chats mark the mutated objects, which are indexed again once the chat stops changing.
+Chats changed otherwise (loaded from disk, created or deleted) are found by comparing the last_modified of each
+chat with the one it was indexed at, see sync_chats.
+"""
+import asyncio
+import heapq
+import json
+import logging
+import math
+import os
+import re
+from asyncio import TimerHandle, get_running_loop
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from aiconsole.core.chat.types import AICChat
+from fastmutation.mutations import AssetMutation, CreateMutation, SetValueMutation
+
+_log = logging.getLogger(__name__)
+
+_INDEX_VERSION = 1
+
+_token = re.compile(r"\w+")
+
+# Indexed fields of the objects of each collection of a chat, and the nested collection of the objects
+_FIELDS: dict[str, tuple[str, ...]] = {
+    "message_groups": ("analysis", "task"),
+    "messages": ("content",),
+    "tool_calls": ("code", "output"),
+}
+_CHILD_COLLECTIONS: dict[str, str | None] = {
+    "message_groups": "messages",
+    "messages": "tool_calls",
+    "tool_calls": None,
+}
+
+# Rankings of recent queries are kept, each with at least this many top hits
+_RANKED_QUERIES = 16
+_RANKED_AT_ONCE = 100
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return _token.findall(text.lower())
+
+
+@dataclass(eq=False, slots=True)
+class _Document:
+    chat_id: str
+    # Path of the object within the chat, e.g. ("message_groups", "g1", "messages", "m1")
+    path: tuple[str, ...]
+    field: str
+    terms: dict[str, int]
+    length: int
+
+
+@dataclass(slots=True)
+class _IndexedChat:
+    # last_modified of the chat when it was indexed whole, None if it has to be indexed again
+    last_modified: float | None
+    documents: dict[tuple[tuple[str, ...], str], _Document] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class _Ranked:
+    # Of the index when ranked, the ranking is stale once it changes
+    generation: int
+    total: int
+    top: list[tuple[float, _Document]]
+
+
+def _score(scored_document: tuple[float, _Document]) -> float:
+    return scored_document[0]
+
+
+class ChatSearchHit(BaseModel):
+    chat_id: str
+    path: tuple[str, ...]
+    field: str
+    score: float
+
+
+class ChatSearchIndex:
+    def __init__(
+        self,
+        index_file_path: Path,
+        get_chat: Callable[[str], Any],
+        update_delay: float = 1.0,
+        save_delay: float = 5.0,
+    ):
+        """
+        :param get_chat: Returns the asset of the given id as it is in memory, used to index the mutated objects.
+        """
+        self.index_file_path = index_file_path
+        self.get_chat = get_chat
+        self.update_delay = update_delay
+        self.save_delay = save_delay
+        self.loaded = False
+        self._chats: dict[str, _IndexedChat] = {}
+        self._postings: dict[str, set[_Document]] = {}
+        self._total_length = 0
+        self._document_count = 0
+        # Changes with every added or removed document
+        self._generation = 0
+        self._ranked: dict[tuple[str, ...], _Ranked] = {}
+        # Paths of the objects mutated since the last update, () stands for the whole chat
+        self._pending: dict[str, set[tuple[str, ...]]] = {}
+        self._update_timer: TimerHandle | None = None
+        self._save_timer: TimerHandle | None = None
+        self._save_task: asyncio.Task | None = None
+
+    @property
+    def document_count(self) -> int:
+        return self._document_count
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        return self._save_timer is not None
+
+    def chat_ids(self) -> set[str]:
+        return set(self._chats)
+
+    def is_current(self, chat_id: str, last_modified: float) -> bool:
+        indexed = self._chats.get(chat_id)
+        return indexed is not None and indexed.last_modified == last_modified and chat_id not in self._pending
+
+    # Loading and saving
+
+    async def load(self) -> None:
+        """
+        Loads the saved index in a thread, mutations which come meanwhile are indexed once it is loaded.
+        """
+        try:
+            chats = await asyncio.to_thread(_read_index_file, self.index_file_path)
+        except FileNotFoundError:
+            chats = {}
+        except (ValueError, KeyError, TypeError) as e:
+            # The index is rebuilt from the chats
+            _log.warning(f"Ignoring invalid chat search index {self.index_file_path}: {e}")
+            chats = {}
+
+        for chat_id, indexed in chats.items():
+            if chat_id in self._chats:
+                continue
+
+            self._chats[chat_id] = indexed
+            for document in indexed.documents.values():
+                self._add_postings(document)
+
+        self.loaded = True
+        self._schedule_update()
+
+    async def save(self) -> None:
+        if self._save_timer:
+            self._save_timer.cancel()
+            self._save_timer = None
+
+        snapshot = self._snapshot()
+        await asyncio.to_thread(_write_index_file, self.index_file_path, snapshot)
+
+    def save_now(self) -> None:
+        if self._save_timer:
+            self._save_timer.cancel()
+            self._save_timer = None
+
+        _write_index_file(self.index_file_path, self._snapshot())
+
+    def close(self) -> None:
+        """
+        Saves pending changes, the index is not updated afterwards.
+        """
+        if self._update_timer:
+            self._update_timer.cancel()
+            self._update_timer = None
+
+        if self.loaded and self._pending:
+            self.update_pending()
+
+        if self.loaded and self.has_unsaved_changes:
+            try:
+                self.save_now()
+            except OSError as e:
+                _log.warning(f"Failed to save the chat search index: {e}")
+
+    def _snapshot(self) -> dict[str, Any]:
+        # Documents are never changed once created, the snapshot can be written while the index changes
+        return {
+            chat_id: (indexed.last_modified, list(indexed.documents.values()))
+            for chat_id, indexed in self._chats.items()
+        }
+
+    def _schedule_save(self) -> None:
+        if self._save_timer is None:
+            self._save_timer = get_running_loop().call_later(self.save_delay, self._save_scheduled)
+
+    def _save_scheduled(self) -> None:
+        self._save_timer = None
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_in_background())
+        else:
+            # Saved again once the running save is done
+            self._schedule_save()
+
+    async def _save_in_background(self) -> None:
+        try:
+            await self.save()
+        except OSError as e:
+            _log.warning(f"Failed to save chat search index {self.index_file_path}: {e}")
+
+    # Indexing
+
+    def index_chat(self, chat: AICChat, last_modified: float | None) -> None:
+        self._remove_documents(chat.id, ())
+        self._chats.setdefault(chat.id, _IndexedChat(last_modified=None)).last_modified = last_modified
+
+        for group in chat.message_groups:
+            self._index_object(chat.id, ("message_groups", group.id), group)
+
+        self._pending.pop(chat.id, None)
+        self._schedule_save()
+
+    def remove_chat(self, chat_id: str) -> None:
+        self._remove_documents(chat_id, ())
+        self._chats.pop(chat_id, None)
+        self._pending.pop(chat_id, None)
+        self._schedule_save()
+
+    def mutated(self, chat_id: str, mutation: AssetMutation) -> None:
+        """
+        Marks the object changed by the mutation to be indexed again, once the chat stops changing.
+        """
+        # [0] is 'assets' and [1] is the chat id
+        path = mutation.ref.ref_segments[2:]
+
+        if not path:
+            # Other fields of the chat itself are not indexed
+            if not isinstance(mutation, CreateMutation) and not (
+                isinstance(mutation, SetValueMutation) and mutation.key == "message_groups"
+            ):
+                return
+        elif path[-2] not in _FIELDS:
+            return
+
+        self._pending.setdefault(chat_id, set()).add(path)
+        self._schedule_update()
+
+    def _schedule_update(self) -> None:
+        if self._update_timer is not None:
+            self._update_timer.cancel()
+
+        if self._pending:
+            self._update_timer = get_running_loop().call_later(self.update_delay, self.update_pending)
+
+    def update_pending(self) -> None:
+        self._update_timer = None
+        if not self.loaded:
+            return
+
+        pending, self._pending = self._pending, {}
+
+        for chat_id, paths in pending.items():
+            chat = self.get_chat(chat_id)
+
+            if not isinstance(chat, AICChat):
+                # Not in memory anymore, indexed whole by the next sync
+                if chat_id in self._chats:
+                    self._chats[chat_id].last_modified = None
+                continue
+
+            if () in paths or chat_id not in self._chats:
+                indexed = self._chats.get(chat_id)
+                self.index_chat(chat, indexed.last_modified if indexed else None)
+                continue
+
+            for path in paths:
+                # Indexed along with one of its ancestors
+                if any(path[:i] in paths for i in range(2, len(path), 2)):
+                    continue
+
+                self._remove_documents(chat_id, path)
+                if (obj := _find_object(chat, path)) is not None:
+                    self._index_object(chat_id, path, obj)
+
+        self._schedule_save()
+
+    def _index_object(self, chat_id: str, path: tuple[str, ...], obj: Any) -> None:
+        collection = path[-2]
+
+        for field_name in _FIELDS[collection]:
+            self._add_document(chat_id, path, field_name, getattr(obj, field_name, None) or "")
+
+        if child_collection := _CHILD_COLLECTIONS[collection]:
+            for child in getattr(obj, child_collection, None) or []:
+                self._index_object(chat_id, path + (child_collection, child.id), child)
+
+    def _add_document(self, chat_id: str, path: tuple[str, ...], field_name: str, text: str) -> None:
+        tokens = tokenize(text)
+        if not tokens:
+            return
+
+        terms: dict[str, int] = {}
+        for token in tokens:
+            terms[token] = terms.get(token, 0) + 1
+
+        document = _Document(chat_id=chat_id, path=path, field=field_name, terms=terms, length=len(tokens))
+        self._chats.setdefault(chat_id, _IndexedChat(last_modified=None)).documents[(path, field_name)] = document
+        self._add_postings(document)
+
+    def _add_postings(self, document: _Document) -> None:
+        for term in document.terms:
+            self._postings.setdefault(term, set()).add(document)
+
+        self._total_length += document.length
+        self._document_count += 1
+        self._generation += 1
+
+    def _remove_documents(self, chat_id: str, path: tuple[str, ...]) -> None:
+        """
+        Removes the documents of the object at the path and of its nested objects.
+        """
+        indexed = self._chats.get(chat_id)
+        if indexed is None:
+            return
+
+        keys = [key for key in indexed.documents if key[0][: len(path)] == path]
+
+        for key in keys:
+            document = indexed.documents.pop(key)
+            for term in document.terms:
+                postings = self._postings[term]
+                postings.discard(document)
+                if not postings:
+                    del self._postings[term]
+
+            self._total_length -= document.length
+            self._document_count -= 1
+            self._generation += 1
+
+    # Searching
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> tuple[int, list[ChatSearchHit]]:
+        """
+        Documents containing all words of the query, ranked by BM25. Returns the total number of them and a page.
+        """
+        terms = tuple(dict.fromkeys(tokenize(query)))
+        if not terms or not self._document_count:
+            return 0, []
+
+        # Paging through the results of a query does not rank them again
+        ranked = self._ranked.get(terms)
+        if (
+            ranked is None
+            or ranked.generation != self._generation
+            or (len(ranked.top) < offset + limit and len(ranked.top) < ranked.total)
+        ):
+            ranked = self._rank(terms, max(offset + limit, _RANKED_AT_ONCE))
+
+            if len(self._ranked) >= _RANKED_QUERIES:
+                del self._ranked[next(iter(self._ranked))]
+            self._ranked[terms] = ranked
+
+        return ranked.total, [
+            ChatSearchHit(chat_id=document.chat_id, path=document.path, field=document.field, score=score)
+            for score, document in ranked.top[offset : offset + limit]
+        ]
+
+    def _rank(self, terms: tuple[str, ...], count: int) -> "_Ranked":
+        postings = [self._postings.get(term) for term in terms]
+        if not all(postings):
+            return _Ranked(generation=self._generation, total=0, top=[])
+
+        matching = set.intersection(*sorted(postings, key=len))  # type: ignore
+
+        # Constant parts of the BM25 formula, per term and per document length
+        weights = [
+            (term, math.log(1 + (self._document_count - len(p) + 0.5) / (len(p) + 0.5)) * (_K1 + 1))  # type: ignore
+            for term, p in zip(terms, postings)
+        ]
+        base_normalization = _K1 * (1 - _B)
+        length_normalization = _K1 * _B * self._document_count / self._total_length
+
+        scored = []
+        for document in matching:
+            normalization = base_normalization + length_normalization * document.length
+            document_terms = document.terms
+            score = 0.0
+            for term, weight in weights:
+                frequency = document_terms[term]
+                score += weight * frequency / (frequency + normalization)
+            scored.append((score, document))
+
+        return _Ranked(generation=self._generation, total=len(matching), top=heapq.nlargest(count, scored, key=_score))
+
+
+async def sync_chats(
+    index: ChatSearchIndex, chats: dict[str, float], read_chat: Callable[[str], Awaitable[AICChat | None]]
+) -> int:
+    """
+    Brings the index up to date with the chats of the project (ids and last_modified timestamps),
+    indexing the chats which changed since they were indexed. Returns the number of indexed chats.
+    """
+    for chat_id in index.chat_ids().difference(chats):
+        index.remove_chat(chat_id)
+
+    indexed = 0
+
+    for chat_id, last_modified in chats.items():
+        if index.is_current(chat_id, last_modified):
+            continue
+
+        try:
+            chat = await read_chat(chat_id)
+        except Exception as e:
+            _log.warning(f"Failed to index chat {chat_id}: {e}")
+            continue
+
+        if chat is not None:
+            index.index_chat(chat, last_modified)
+            indexed += 1
+
+    return indexed
+
+
+def _find_object(chat: AICChat, path: tuple[str, ...]) -> Any:
+    obj: Any = chat
+
+    for i in range(0, len(path), 2):
+        collection, object_id = path[i], path[i + 1]
+        obj = next((item for item in getattr(obj, collection, None) or [] if item.id == object_id), None)
+        if obj is None:
+            return None
+
+    return obj
+
+
+def _read_index_file(index_file_path: Path) -> dict[str, _IndexedChat]:
+    raw = json.loads(index_file_path.read_text(encoding="utf8"))
+    if raw["version"] != _INDEX_VERSION:
+        raise ValueError(f"Unsupported version {raw['version']}")
+
+    chats: dict[str, _IndexedChat] = {}
+
+    for chat_id, (last_modified, documents) in raw["chats"].items():
+        indexed = chats[chat_id] = _IndexedChat(last_modified=last_modified)
+
+        for path, field_name, terms in documents:
+            document = _Document(
+                chat_id=chat_id, path=tuple(path), field=field_name, terms=terms, length=sum(terms.values())
+            )
+            indexed.documents[(document.path, field_name)] = document
+
+    return chats
+
+
+def _write_index_file(index_file_path: Path, snapshot: dict[str, Any]) -> None:
+    chats = {
+        chat_id: [last_modified, [[document.path, document.field, document.terms] for document in documents]]
+        for chat_id, (last_modified, documents) in snapshot.items()
+    }
+
+    index_file_path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique, a scheduled save may still be writing when the index is saved on close
+    tmp_file_path = index_file_path.with_name(f".{index_file_path.name}.{uuid4().hex}.tmp")
+
+    try:
+        tmp_file_path.write_text(json.dumps({"version": _INDEX_VERSION, "chats": chats}), encoding="utf8")
+        os.replace(tmp_file_path, index_file_path)
+    except BaseException:
+        tmp_file_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,86 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Windowed snapshots of chats, for opening long chats without sending all of their history at once.
+
+A window contains only the last message groups of a chat with long tool outputs cut short. The rest is fetched
+on demand, addressed by the same refs as mutations are.
+"""
+from typing import Sequence, TypeVar
+
+from pydantic import BaseModel
+
+from aiconsole.core.chat.types import AICChat, AICMessage, AICMessageGroup, AICToolCall
+from fastmutation.types import BaseObject
+
+T = TypeVar("T", bound=BaseObject)
+
+
+class ChatWindow(BaseModel):
+    # Number of message groups preceding the ones sent
+    omitted_message_groups: int
+    # Full lengths of the tool outputs which were cut short, by tool call id
+    truncated_tool_call_outputs: dict[str, int]
+
+
+def window_chat(chat: AICChat, message_groups: int, tool_output_chars: int) -> tuple[AICChat, ChatWindow]:
+    """
+    Returns a copy of the chat with only its last message groups and tool outputs truncated to tool_output_chars.
+    The chat itself is not modified, objects which did not need to change are shared with it.
+    """
+    kept_groups = chat.message_groups[-message_groups:] if message_groups > 0 else []
+    truncated: dict[str, int] = {}
+
+    def window_tool_call(tool_call: AICToolCall) -> AICToolCall:
+        if tool_call.output is None or len(tool_call.output) <= tool_output_chars:
+            return tool_call
+
+        truncated[tool_call.id] = len(tool_call.output)
+        return tool_call.model_copy(update={"output": tool_call.output[:tool_output_chars]})
+
+    def window_message(message: AICMessage) -> AICMessage:
+        tool_calls = [window_tool_call(tool_call) for tool_call in message.tool_calls]
+        if all(a is b for a, b in zip(tool_calls, message.tool_calls)):
+            return message
+        return message.model_copy(update={"tool_calls": tool_calls})
+
+    def window_group(group: AICMessageGroup) -> AICMessageGroup:
+        messages = [window_message(message) for message in group.messages]
+        if all(a is b for a, b in zip(messages, group.messages)):
+            return group
+        return group.model_copy(update={"messages": messages})
+
+    windowed = chat.model_copy(update={"message_groups": [window_group(group) for group in kept_groups]})
+
+    return windowed, ChatWindow(
+        omitted_message_groups=len(chat.message_groups) - len(kept_groups),
+        truncated_tool_call_outputs=truncated,
+    )
+
+
+def page_of_collection(items: Sequence[T], before_id: str | None, limit: int | None) -> list[T]:
+    """
+    Returns up to limit items directly preceding the one with before_id (or the last ones if it is None).
+    """
+    end = len(items)
+    if before_id is not None:
+        before_index = next((i for i, item in enumerate(items) if item.id == before_id), None)
+        if before_index is None:
+            raise ValueError(f"Object {before_id} not found")
+        end = before_index
+
+    start = 0 if limit is None else max(0, end - limit)
+    return list(items[start:end])
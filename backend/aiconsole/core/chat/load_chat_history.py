@@ -13,16 +13,45 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import json
+import logging
+import os
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
-import aiofiles
 import aiofiles.os as async_os
 
 from aiconsole.core.assets.types import AssetLocation, AssetType
+from aiconsole.core.chat.chat_file import read_chat_file, write_chat_file
+from aiconsole.core.chat.chat_journal import (
+    get_chat_journal_path,
+    read_chat_journal,
+    replay_chat_journal,
+)
+from aiconsole.core.chat.chat_schema import (
+    SCHEMA_VERSION_KEY,
+    default_chat_name,
+    migrate_chat_data,
+)
 from aiconsole.core.chat.types import AICChat
 from aiconsole.core.project.paths import get_project_assets_directory
+from aiconsole.utils.file_observer import own_file_writes
+
+_log = logging.getLogger(__name__)
+
+
+async def _write_migrated_chat_file(file_path: Path, data: dict[str, Any], mtime: float) -> None:
+    try:
+        await write_chat_file(file_path, data)
+    except OSError as e:
+        # The chat is migrated again on the next load
+        _log.warning(f"Failed to write migrated chat {file_path}: {e}")
+        return
+
+    # Migration is not a modification of the chat
+    os.utime(file_path, (mtime, mtime))
+    # Nor is it a change for the file observer to reload
+    own_file_writes().record(file_path, get_chat_journal_path(file_path))
 
 
 async def load_chat_history(id: str, project_path: Path | None = None) -> AICChat:
@@ -33,100 +62,27 @@ async def load_chat_history(id: str, project_path: Path | None = None) -> AICCha
     file_path = history_directory / f"{id}.json"
 
     if await async_os.path.exists(file_path):
-        async with aiofiles.open(file_path, mode="r", encoding="utf8", errors="replace") as f:
-            data = json.loads(await f.read())
-
-            # Add tool_calls to each message
-            for group in data["message_groups"]:
-                if "messages" in group and group["messages"]:
-                    for msg in group["messages"]:
-                        if "tool_calls" not in msg:
-                            msg["tool_calls"] = []
-
-            # For all tool calls without headline add an empty headline
-            for group in data["message_groups"]:
-                if "messages" in group and group["messages"]:
-                    for msg in group["messages"]:
-                        if "tool_calls" in msg and msg["tool_calls"]:
-                            for tool_call in msg["tool_calls"]:
-                                if "headline" not in tool_call:
-                                    tool_call["headline"] = ""
-
-            # For each tool with "shell" language change it to "python"
-            for group in data["message_groups"]:
-                if "messages" in group and group["messages"]:
-                    for msg in group["messages"]:
-                        if "tool_calls" in msg and msg["tool_calls"]:
-                            for tool_call in msg["tool_calls"]:
-                                if "language" in tool_call and tool_call["language"] == "shell":
-                                    tool_call["language"] = "python"
-
-            # For each tool call add "type" field with default "function" value
-            for group in data["message_groups"]:
-                if "messages" in group and group["messages"]:
-                    for msg in group["messages"]:
-                        if "tool_calls" in msg and msg["tool_calls"]:
-                            for tool_call in msg["tool_calls"]:
-                                if "type" not in tool_call:
-                                    tool_call["type"] = "function"
-
-            # For each agent_id change it to actor_id
-            for group in data["message_groups"]:
-                if "agent_id" in group:
-                    group["actor_id"] = {
-                        "type": "user" if group["agent_id"] == "user" else "agent",
-                        "id": group["agent_id"],
-                    }
-                    del group["agent_id"]
-
-            # Add "analysis" to each message group
-            for group in data["message_groups"]:
-                if "analysis" not in group:
-                    group["analysis"] = ""
-
-            def extract_default_headline():
-                for group in data["message_groups"]:
-                    if "messages" in group and group["messages"]:
-                        for msg in group["messages"]:
-                            return msg.get("content")
-
-            if "name" not in data or not data["name"]:
-                if "headline" in data and data["headline"]:
-                    data["name"] = data["headline"]
-                elif "title" in data and data["title"]:
-                    data["name"] = data["title"]
-                else:
-                    data["name"] = extract_default_headline() or "New Chat"
-
-            if "title_edited" not in data or not data["title_edited"]:
-                data["title_edited"] = False
-                data["name"] = extract_default_headline() or "New Chat"
-
-            if "id" in data:
-                del data["id"]
-
-            if "last_modified" in data:
-                del data["last_modified"]
-
-            if "usage_examples" not in data:
-                data["usage_examples"] = []
-
-            if "usage" not in data:
-                data["usage"] = ""
-
-            if "defined_in" not in data:
-                data["defined_in"] = AssetLocation.PROJECT_DIR
-
-            if "override" not in data:
-                data["override"] = False
-
-            stat = await async_os.stat(file_path)
-
-            return AICChat(
-                id=id,
-                last_modified=datetime.fromtimestamp(stat.st_mtime),
-                **data,
-            )
+        data = await read_chat_file(file_path)
+
+        stat = await async_os.stat(file_path)
+
+        if migrate_chat_data(data):
+            await _write_migrated_chat_file(file_path, data, stat.st_mtime)
+
+        # Mutations journaled after the chat file was written, they already are in the current format
+        replay_chat_journal(data, await read_chat_journal(get_chat_journal_path(file_path)))
+
+        del data[SCHEMA_VERSION_KEY]
+
+        if not data.get("title_edited"):
+            data["title_edited"] = False
+            data["name"] = default_chat_name(data)
+
+        return AICChat(
+            id=id,
+            last_modified=datetime.fromtimestamp(stat.st_mtime),
+            **data,
+        )
     else:
         return AICChat(
             id=id,
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from aiconsole.core.chat.chat_file import GZIP_MAGIC, write_chat_file
+from aiconsole.core.chat.chat_index import read_chat_name
+from aiconsole.core.chat.chat_journal import compact_chat_journal, write_chat_snapshot
+from aiconsole.core.chat.list_possible_historic_chat_ids import (
+    list_possible_historic_chat_ids,
+)
+from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.core.chat.types import AICChat
+
+
+@pytest.fixture
+def chat_data(make_chat: Callable[..., AICChat]) -> dict:
+    return make_chat("chat", 20, tool_output="x" * 1000).model_dump(mode="json", exclude={"id", "last_modified"})
+
+
+@pytest.mark.asyncio
+async def test_should_compress_chats_over_threshold(tmp_path: Path, chat_data: dict):
+    (tmp_path / "chats").mkdir()
+    small, large = tmp_path / "chats" / "small.json", tmp_path / "chats" / "large.json"
+
+    await write_chat_snapshot(small, chat_data, compression_min_bytes=1024 * 1024)
+    await write_chat_snapshot(large, chat_data, compression_min_bytes=1024)
+
+    assert json.loads(small.read_text())["name"] == "Test chat"
+    assert large.read_bytes().startswith(GZIP_MAGIC)
+    assert large.stat().st_size < small.stat().st_size / 5
+
+    assert sorted(list_possible_historic_chat_ids(tmp_path)) == ["large", "small"]
+    loaded_small, loaded_large = await load_chat_history("small", tmp_path), await load_chat_history("large", tmp_path)
+    assert loaded_large.model_dump(exclude={"id", "last_modified"}) == loaded_small.model_dump(
+        exclude={"id", "last_modified"}
+    )
+
+    # Compaction of a plain chat which grew over the threshold compresses it
+    (tmp_path / "chats" / "small.journal").write_text("")
+    await compact_chat_journal(small, compression_min_bytes=1024)
+    assert small.read_bytes().startswith(GZIP_MAGIC)
+
+
+@pytest.mark.asyncio
+async def test_should_read_name_of_compressed_chat(tmp_path: Path, chat_data: dict):
+    chat_file_path = tmp_path / "chat.json"
+    chat_data["message_groups"][0]["messages"][0]["content"] = "Zażółć gęślą jaźń"
+    await write_chat_file(chat_file_path, chat_data, compression_min_bytes=1)
+
+    # Chunks small enough to split characters and compressed blocks
+    assert await read_chat_name(chat_file_path, chunk_size=3) == "Zażółć gęślą jaźń"
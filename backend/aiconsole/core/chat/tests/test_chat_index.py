@@ -0,0 +1,56 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from aiconsole.core.chat.chat_index import ChatIndex, read_chat_name
+
+
+def _chat_json(title_edited: bool, first_content: str) -> str:
+    group = {"id": "g1", "messages": [{"id": "m1", "content": first_content}]}
+    return json.dumps({"name": "Edited", "title_edited": title_edited, "chat_options": {}, "message_groups": [group]})
+
+
+@pytest.mark.asyncio
+async def test_should_read_name_without_reading_past_first_message(tmp_path: Path):
+    chat_file_path = tmp_path / "chat.json"
+    # Everything after the first message group is garbage, a full parse would fail
+    chat_file_path.write_text(_chat_json(False, "Hello there")[:-2] + ", not json at all")
+
+    assert await read_chat_name(chat_file_path, chunk_size=7) == "Hello there"
+
+
+@pytest.mark.asyncio
+async def test_should_read_edited_name(tmp_path: Path):
+    chat_file_path = tmp_path / "chat.json"
+    chat_file_path.write_text(_chat_json(True, "Hello there"))
+
+    assert await read_chat_name(chat_file_path) == "Edited"
+
+
+@pytest.mark.asyncio
+async def test_should_read_name_again_only_when_chat_file_changed(tmp_path: Path):
+    chat_file_path = tmp_path / "chat.json"
+    chat_file_path.write_text(_chat_json(False, "First"))
+    index = ChatIndex(tmp_path / ".aic" / "chat_index.json")
+
+    assert (await index.refresh_name("chat", chat_file_path)).name == "First"
+    index.save()
+
+    reloaded = ChatIndex(tmp_path / ".aic" / "chat_index.json")
+    reloaded.load()
+    chat_file_path.write_text(_chat_json(False, "Other"))
+    stat = chat_file_path.stat()
+    # Pretend the file did not change since it was indexed
+    os.utime(chat_file_path, (reloaded.entries["chat"].mtime, reloaded.entries["chat"].mtime))
+    reloaded.entries["chat"].size = stat.st_size
+
+    assert (await reloaded.refresh_name("chat", chat_file_path)).name == "First"
+
+    os.utime(chat_file_path, (stat.st_mtime + 10, stat.st_mtime + 10))
+
+    assert (await reloaded.refresh_name("chat", chat_file_path)).name == "Other"
+
+    reloaded.save()
+    assert json.loads((tmp_path / ".aic" / "chat_index.json").read_text())["chats"][0]["name"] == "Other"
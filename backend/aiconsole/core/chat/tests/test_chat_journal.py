@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from aiconsole.core.chat.chat_journal import (
+    append_to_chat_journal,
+    compact_chat_journal,
+    get_chat_journal_path,
+    read_chat_file_data,
+    read_chat_journal,
+    replay_chat_journal,
+)
+from aiconsole.core.chat.chat_schema import CHAT_SCHEMA_VERSION, SCHEMA_VERSION_KEY
+from aiconsole.core.chat.locations import ChatRef
+from fastmutation.mutations import (
+    AppendToStringMutation,
+    CreateMutation,
+    DeleteMutation,
+    SetValueMutation,
+)
+
+
+@pytest.fixture
+def chat_file_path(tmp_path: Path) -> Path:
+    file_path = tmp_path / "chat.json"
+    file_path.write_text(json.dumps({"name": "Chat", "message_groups": [{"id": "g1", "messages": []}]}))
+    return file_path
+
+
+def _mutations():
+    group_ref = ChatRef(id="chat").message_groups["g1"]
+    message_ref = group_ref.messages["m1"]
+
+    return [
+        CreateMutation(ref=message_ref, object_type="AICMessage", object={"content": ""}),
+        AppendToStringMutation(ref=message_ref, key="content", value="Hello"),
+        AppendToStringMutation(ref=message_ref, key="content", value=" world"),
+        SetValueMutation(ref=ChatRef(id="chat"), key="name", value="Greeting"),
+        CreateMutation(ref=group_ref.messages["m2"], object_type="AICMessage", object={"content": "Bye"}),
+        DeleteMutation(ref=group_ref.messages["m2"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_should_replay_journal_over_snapshot(chat_file_path: Path):
+    await append_to_chat_journal(get_chat_journal_path(chat_file_path), _mutations())
+
+    data = await read_chat_file_data(chat_file_path)
+
+    assert data["name"] == "Greeting"
+    assert data["message_groups"][0]["messages"] == [{"content": "Hello world", "id": "m1"}]
+
+
+@pytest.mark.asyncio
+async def test_should_fold_journal_into_snapshot_on_compaction(chat_file_path: Path):
+    journal_path = get_chat_journal_path(chat_file_path)
+    await append_to_chat_journal(journal_path, _mutations())
+    # Snapshots are written in the current schema version
+    expected = {**await read_chat_file_data(chat_file_path), SCHEMA_VERSION_KEY: CHAT_SCHEMA_VERSION}
+
+    await compact_chat_journal(chat_file_path)
+
+    assert not journal_path.exists()
+    assert await read_chat_file_data(chat_file_path) == expected
+
+
+@pytest.mark.asyncio
+async def test_should_not_replay_journal_left_by_interrupted_compaction(chat_file_path: Path):
+    journal_path = get_chat_journal_path(chat_file_path)
+    await append_to_chat_journal(journal_path, _mutations())
+    journal = journal_path.read_text()
+
+    await compact_chat_journal(chat_file_path)
+    journal_path.write_text(journal)
+
+    data = await read_chat_file_data(chat_file_path)
+
+    assert data["message_groups"][0]["messages"][0]["content"] == "Hello world"
+
+
+@pytest.mark.asyncio
+async def test_should_skip_incomplete_last_record(chat_file_path: Path):
+    journal_path = get_chat_journal_path(chat_file_path)
+    await append_to_chat_journal(journal_path, _mutations()[:2])
+
+    with open(journal_path, "a") as f:
+        f.write('{"type": "AppendToStr')
+
+    data = json.loads(chat_file_path.read_text())
+    replay_chat_journal(data, await read_chat_journal(journal_path))
+
+    assert data["message_groups"][0]["messages"][0]["content"] == "Hello"
@@ -0,0 +1,76 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from aiconsole.core.chat.chat_schema import CHAT_SCHEMA_VERSION, SCHEMA_VERSION_KEY
+from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.utils.file_observer import own_file_writes
+
+LEGACY_CHAT = {
+    "headline": "Legacy",
+    "message_groups": [
+        {
+            "id": "g1",
+            "agent_id": "user",
+            "role": "user",
+            "task": "",
+            "materials_ids": [],
+            "messages": [
+                {
+                    "id": "m1",
+                    "timestamp": "",
+                    "content": "Hello",
+                    "tool_calls": [{"id": "t1", "language": "shell", "code": "ls"}],
+                }
+            ],
+        }
+    ],
+}
+
+
+def _write_chat(project_path: Path, data: dict) -> Path:
+    chat_file_path = project_path / "chats" / "chat.json"
+    chat_file_path.parent.mkdir()
+    # Indented unlike the files written by the app, so a rewrite is visible
+    chat_file_path.write_text(json.dumps(data, indent=2))
+    os.utime(chat_file_path, (1_000_000, 1_000_000))
+    return chat_file_path
+
+
+@pytest.mark.asyncio
+async def test_should_migrate_legacy_chat_once_and_write_it_back(tmp_path: Path):
+    chat_file_path = _write_chat(tmp_path, LEGACY_CHAT)
+
+    chat = await load_chat_history("chat", tmp_path)
+
+    tool_call = chat.message_groups[0].messages[0].tool_calls[0]
+    assert chat.message_groups[0].actor_id.type == "user"
+    assert (tool_call.language, tool_call.headline) == ("python", "")
+
+    data = json.loads(chat_file_path.read_text())
+    assert data[SCHEMA_VERSION_KEY] == CHAT_SCHEMA_VERSION
+    assert data["message_groups"][0]["actor_id"] == {"type": "user", "id": "user"}
+    # Migration is not a modification of the chat
+    assert chat_file_path.stat().st_mtime == 1_000_000
+    assert own_file_writes().is_own(chat_file_path)
+
+
+@pytest.mark.asyncio
+async def test_should_not_migrate_current_chat(tmp_path: Path):
+    data = json.loads(json.dumps(LEGACY_CHAT))
+    group = data["message_groups"][0]
+    group["actor_id"] = {"type": "user", "id": "user"}
+    group["analysis"] = ""
+    del group["agent_id"]
+    group["messages"][0]["tool_calls"][0].update(language="python", headline="", type="function")
+    data.update(name="Current", usage="", usage_examples=[], defined_in="project", override=False)
+    data[SCHEMA_VERSION_KEY] = CHAT_SCHEMA_VERSION
+    chat_file_path = _write_chat(tmp_path, data)
+    content = chat_file_path.read_text()
+
+    chat = await load_chat_history("chat", tmp_path)
+
+    assert chat.message_groups[0].messages[0].tool_calls[0].language == "python"
+    assert chat_file_path.read_text() == content
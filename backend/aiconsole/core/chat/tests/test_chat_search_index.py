@@ -0,0 +1,68 @@
+import asyncio
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from aiconsole.core.chat.chat_search_index import ChatSearchIndex
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.chat.types import AICChat, AICMessage
+from fastmutation.mutations import AppendToStringMutation, CreateMutation
+
+
+@pytest.mark.asyncio
+async def test_should_rank_and_paginate_hits(tmp_path: Path, make_chat: Callable[..., AICChat]):
+    chat = make_chat("chat", 3)
+    # Of the same length, so the number of occurrences decides
+    chat.message_groups[0].messages[0].content = "deploy the parser now"
+    chat.message_groups[1].messages[0].content = "deploy parser, deploy parser"
+    chat.message_groups[2].messages[0].tool_calls[0].output = "deploy parser once more"
+
+    index = ChatSearchIndex(tmp_path / "index.json", get_chat=lambda chat_id: None)
+    index.loaded = True
+    index.index_chat(chat, chat.last_modified.timestamp())
+
+    total, first_page = index.search("Deploy PARSER", limit=2)
+    assert total == 3
+    assert first_page[0].path == ("message_groups", "group-1", "messages", "message-1")
+    assert first_page[0].score > first_page[1].score
+
+    total, second_page = index.search("deploy parser", offset=2, limit=2)
+    assert total == 3
+    assert {(hit.path[-1], hit.field) for hit in first_page[1:] + second_page} == {
+        ("message-0", "content"),
+        ("tool-call-2", "output"),
+    }
+
+    assert index.search("deploy nothing") == (0, [])
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_should_index_mutations_and_reload(tmp_path: Path, make_chat: Callable[..., AICChat]):
+    chat = make_chat("chat", 2)
+    index = ChatSearchIndex(tmp_path / "index.json", get_chat=lambda chat_id: chat, update_delay=0.01)
+    index.loaded = True
+    index.index_chat(chat, chat.last_modified.timestamp())
+
+    group_ref = ChatRef(id="chat").message_groups["group-1"]
+    message_ref = group_ref.messages["message-1"]
+    chat.message_groups[1].messages[0].content += " kangaroo"
+    index.mutated("chat", AppendToStringMutation(ref=message_ref, key="content", value=" kangaroo"))
+    chat.message_groups[1].messages.append(AICMessage(id="new", timestamp="", content="wombat", tool_calls=[]))
+    index.mutated("chat", CreateMutation(ref=group_ref.messages["new"], object_type="AICMessage", object={}))
+
+    assert index.search("kangaroo") == (0, [])
+    await asyncio.sleep(0.05)
+
+    assert index.search("kangaroo")[0] == 1
+    assert index.search("wombat")[1][0].path == ("message_groups", "group-1", "messages", "new")
+    assert index.is_current("chat", chat.last_modified.timestamp())
+    index.close()
+
+    reloaded = ChatSearchIndex(tmp_path / "index.json", get_chat=lambda chat_id: None)
+    await reloaded.load()
+
+    assert reloaded.search("wombat")[0] == 1
+    assert reloaded.search("lorem ipsum") == index.search("lorem ipsum")
+    assert reloaded.is_current("chat", chat.last_modified.timestamp())
@@ -0,0 +1,42 @@
+from typing import Callable
+
+import pytest
+
+from aiconsole.core.chat.chat_window import page_of_collection, window_chat
+from aiconsole.core.chat.types import AICChat
+
+
+def test_should_send_only_last_groups_with_truncated_outputs(make_chat: Callable[..., AICChat]):
+    chat = make_chat("chat", 10, tool_output="x" * 100)
+
+    windowed, window = window_chat(chat, message_groups=3, tool_output_chars=10)
+
+    assert [group.id for group in windowed.message_groups] == ["group-7", "group-8", "group-9"]
+    assert windowed.message_groups[0].messages[0].tool_calls[0].output == "x" * 10
+    assert window.omitted_message_groups == 7
+    assert window.truncated_tool_call_outputs == {"tool-call-7": 100, "tool-call-8": 100, "tool-call-9": 100}
+
+    # The chat itself is left intact
+    assert len(chat.message_groups) == 10
+    assert chat.message_groups[9].messages[0].tool_calls[0].output == "x" * 100
+
+
+def test_should_share_objects_which_were_not_truncated(make_chat: Callable[..., AICChat]):
+    chat = make_chat("chat", 5, tool_output="short")
+
+    windowed, window = window_chat(chat, message_groups=10, tool_output_chars=10)
+
+    assert window.omitted_message_groups == 0
+    assert window.truncated_tool_call_outputs == {}
+    assert all(a is b for a, b in zip(windowed.message_groups, chat.message_groups))
+
+
+def test_should_page_collection_backwards(make_chat: Callable[..., AICChat]):
+    groups = make_chat("chat", 10).message_groups
+
+    assert [group.id for group in page_of_collection(groups, "group-7", 3)] == ["group-4", "group-5", "group-6"]
+    assert [group.id for group in page_of_collection(groups, "group-1", 3)] == ["group-0"]
+    assert [group.id for group in page_of_collection(groups, None, 2)] == ["group-8", "group-9"]
+
+    with pytest.raises(ValueError):
+        page_of_collection(groups, "missing", 3)
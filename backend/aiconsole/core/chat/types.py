@@ -26,10 +26,12 @@ from aiconsole.core.chat.actor_id import ActorId
 from aiconsole.core.code_running.code_interpreters.language import LanguageStr
 from aiconsole.core.gpt.tool_definition import ToolDefinition
 from aiconsole.core.gpt.types import GPTRole
-from fastmutation.types import BaseObject
+from fastmutation.appendable_strings import AppendableStringsObject
 
 
-class AICToolCall(BaseObject):
+class AICToolCall(AppendableStringsObject):
+    __appendable_fields__ = frozenset(["code", "output", "headline"])
+
     language: LanguageStr | None = None
     code: str
     headline: str
@@ -40,7 +42,9 @@ class AICToolCall(BaseObject):
     is_executing: bool = False
 
 
-class AICMessage(BaseObject):
+class AICMessage(AppendableStringsObject):
+    __appendable_fields__ = frozenset(["content"])
+
     timestamp: str
     content: str
     requested_format: ToolDefinition | None = None
@@ -48,7 +52,9 @@ class AICMessage(BaseObject):
     is_streaming: bool = False
 
 
-class AICMessageGroup(BaseObject):
+class AICMessageGroup(AppendableStringsObject):
+    __appendable_fields__ = frozenset(["analysis", "task"])
+
     actor_id: ActorId
     role: GPTRole
     analysis: str
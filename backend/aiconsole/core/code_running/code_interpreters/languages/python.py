@@ -34,6 +34,7 @@
 
 import ast
 import asyncio
+import base64
 import logging
 import queue
 import re
@@ -45,6 +46,7 @@ from jupyter_client.asynchronous.client import AsyncKernelClient
 from jupyter_client.manager import AsyncKernelManager
 
 from aiconsole.core.assets.materials.material import AICMaterial
+from aiconsole.core.blobs.blob_store import get_blob_store, image_markdown
 from aiconsole.core.code_running.code_interpreters.base_code_interpreter import (
     BaseCodeInterpreter,
     CodeExecutionError,
@@ -80,6 +82,19 @@ async def start_new_async_kernel(
     return (km, kc)
 
 
+def _image_output(image_base64: str, extension: str) -> dict[str, str]:
+    """
+    Images go to the blob store, the output only refers to them.
+    """
+    try:
+        blob_id = get_blob_store().put(base64.b64decode(image_base64), extension)
+    except (OSError, ValueError) as e:
+        _log.warning(f"Failed to store an image output, keeping it inline: {e}")
+        return {"type": "image", "format": f"base64.{extension}", "content": image_base64}
+
+    return {"type": "image", "format": "blob", "content": f"\n{image_markdown(blob_id)}\n"}
+
+
 class Python(BaseCodeInterpreter):
     async def initialize(self):
         self.km, self.kc = await start_new_async_kernel(
@@ -173,21 +188,9 @@ matplotlib.use('{backend}')
                 elif msg["msg_type"] in ["display_data", "execute_result"]:
                     data = content["data"]
                     if "image/png" in data:
-                        message_queue.put(
-                            {
-                                "type": "image",
-                                "format": "base64.png",
-                                "content": data["image/png"],
-                            }
-                        )
+                        message_queue.put(_image_output(data["image/png"], "png"))
                     elif "image/jpeg" in data:
-                        message_queue.put(
-                            {
-                                "type": "image",
-                                "format": "base64.jpeg",
-                                "content": data["image/jpeg"],
-                            }
-                        )
+                        message_queue.put(_image_output(data["image/jpeg"], "jpeg"))
                     elif "text/html" in data:
                         message_queue.put(
                             {
@@ -17,6 +17,7 @@ import logging
 import os
 from pathlib import Path
 
+from aiconsole.consts import ASSETS_DB
 from aiconsole.core.assets.types import AssetType
 from aiconsole.core.project.project import is_project_initialized
 from aiconsole.utils.resource_to_path import resource_to_path
@@ -45,6 +46,10 @@ def get_aic_directory(project_path: Path | None = None):
     return get_project_directory(project_path) / ".aic"
 
 
+def get_assets_db_path(project_path: Path | None = None):
+    return get_aic_directory(project_path) / ASSETS_DB
+
+
 def get_project_directory(project_path: Path | None = None):
     if not is_project_initialized() and not project_path:
         raise ValueError("Project settings are not initialized")
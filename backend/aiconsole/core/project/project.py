@@ -32,6 +32,14 @@ from aiconsole.api.websockets.server_messages import (
     ProjectLoadingServerMessage,
     ProjectOpenedServerMessage,
 )
+from aiconsole.consts import (
+    ASSETS_STORAGE,
+    CHAT_COMPRESSION_MIN_BYTES,
+    CHAT_JOURNAL_COMPACTION_BYTES,
+    CHAT_PREFETCH_COUNT,
+    CHAT_SEARCH_INDEX_JSON,
+    CHAT_STORAGE_MODE,
+)
 from aiconsole.core.assets.types import AssetLocation
 from aiconsole.core.assets.users.users import AICUserProfile
 from aiconsole.core.code_running.run_code import reset_code_interpreters
@@ -50,10 +58,17 @@ _project_initialized = False
 
 
 async def _clear_project():
+    from aiconsole.core.assets.aic_data_context import close_chat_search_index
+    from aiconsole.core.blobs.blob_gc import cancel_blob_garbage_collection
+
     global _assets
     global _project_initialized
 
+    await close_chat_search_index()
+    cancel_blob_garbage_collection()
+
     if _assets:
+        await _assets.flush_all()
         _assets.clean_up()
 
     reset_code_interpreters()
@@ -94,9 +109,23 @@ async def close_project():
 
 # TODO: move to API sending a message
 async def reinitialize_project():
+    from aiconsole.core.assets.aic_data_context import (
+        open_chat_search_index,
+        prefetch_recent_chats,
+    )
     from aiconsole.core.assets.assets_service import assets
-    from aiconsole.core.assets.fs.assets_file_storage import AssetsFileStorage
-    from aiconsole.core.project.paths import get_project_directory, get_project_name
+    from aiconsole.core.assets.fs.assets_file_storage import (
+        AssetsFileStorage,
+        ChatStorageMode,
+    )
+    from aiconsole.core.assets.sqlite.sqlite_assets_storage import SqliteAssetsStorage
+    from aiconsole.core.blobs.blob_gc import schedule_blob_garbage_collection
+    from aiconsole.core.project.paths import (
+        get_aic_directory,
+        get_assets_db_path,
+        get_project_directory,
+        get_project_name,
+    )
     from aiconsole.core.recent_projects.recent_projects import add_to_recent_projects
 
     await connection_manager().send_to_all(ProjectLoadingServerMessage())
@@ -115,13 +144,19 @@ async def reinitialize_project():
     _assets = assets()
 
     # TODO: check if loading assets before settings cause problems
-    await _assets.configure(
-        AssetsFileStorage(
-            paths=[
-                project_dir,
-            ]
+    if ASSETS_STORAGE == "sqlite":
+        await _assets.configure(SqliteAssetsStorage(get_assets_db_path(project_dir)))
+    else:
+        await _assets.configure(
+            AssetsFileStorage(
+                paths=[
+                    project_dir,
+                ],
+                chat_storage_mode=ChatStorageMode(CHAT_STORAGE_MODE),
+                chat_journal_compaction_bytes=CHAT_JOURNAL_COMPACTION_BYTES,
+                chat_compression_min_bytes=CHAT_COMPRESSION_MIN_BYTES,
+            )
         )
-    )
     settings().configure(SettingsFileStorage, project_path=project_dir)
 
     # Save user info to assets
@@ -151,6 +186,10 @@ async def reinitialize_project():
         ProjectOpenedServerMessage(path=str(get_project_directory()), name=get_project_name())
     )
 
+    prefetch_recent_chats(CHAT_PREFETCH_COUNT)
+    await open_chat_search_index(get_aic_directory(project_dir) / CHAT_SEARCH_INDEX_JSON)
+    schedule_blob_garbage_collection()
+
 
 async def choose_project(path: Path, background_tasks: BackgroundTasks):
     if not path.exists():
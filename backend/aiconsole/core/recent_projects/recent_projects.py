@@ -17,11 +17,17 @@ import logging
 import os
 from pathlib import Path
 
-from aiconsole.consts import AICONSOLE_USER_CONFIG_DIR, MAX_RECENT_PROJECTS
+from aiconsole.consts import (
+    AICONSOLE_USER_CONFIG_DIR,
+    CHAT_INDEX_JSON,
+    MAX_RECENT_PROJECTS,
+)
+from aiconsole.core.assets.types import AssetType
+from aiconsole.core.chat.chat_index import ChatIndex
 from aiconsole.core.chat.list_possible_historic_chat_ids import (
     list_possible_historic_chat_ids,
 )
-from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.core.project.paths import get_aic_directory, get_project_assets_directory
 from aiconsole.core.recent_projects.types import RecentProject
 
 _RECENT_PROJECTS_LAST_CHATS_COUNT = 4
@@ -78,12 +84,24 @@ async def get_recent_project() -> list[RecentProject]:
         try:
             chat_ids = list_possible_historic_chat_ids(path)
             recent_chat_names: list[str] = []
+
+            chat_index = ChatIndex(get_aic_directory(path) / CHAT_INDEX_JSON)
+            chat_index.load()
+            chats_directory = get_project_assets_directory(AssetType.CHAT, path)
+
             for id in chat_ids[:_RECENT_PROJECTS_LAST_CHATS_COUNT]:
                 try:
-                    recent_chat_names.append((await load_chat_history(id, path)).name)
+                    entry = await chat_index.refresh_name(id, chats_directory / f"{id}.json")
+                    recent_chat_names.append(entry.name)
                 except Exception:
                     _log.exception(f"Error loading chat {id}")
 
+            if chat_index.has_unsaved_changes:
+                try:
+                    chat_index.save()
+                except OSError:
+                    _log.exception(f"Error saving the chat index of {path}")
+
             incorrect_path = not path.exists()
         except PermissionError:
             _log.exception(f"PermissionError accessing {path}")
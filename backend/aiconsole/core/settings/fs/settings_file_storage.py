@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from dataclasses import dataclass
 from pathlib import Path
@@ -9,7 +10,7 @@ from aiconsole.core.settings.fs.settings_file_format import (
     save_settings_file,
 )
 from aiconsole.utils.events import InternalEvent, internal_events
-from aiconsole.utils.file_observer import FileObserver
+from aiconsole.utils.file_observer import FileObserver, own_file_writes
 from aiconsole_toolkit.settings.partial_settings_data import PartialSettingsData
 
 _log = logging.getLogger(__name__)
@@ -27,7 +28,8 @@ def _get_settings_from_path(file_path: Path | None) -> PartialSettingsData:
 
 @dataclass(frozen=True, slots=True)
 class SettingsUpdatedEvent(InternalEvent):
-    pass
+    # Changed by someone else than the server, e.g. edited in the settings file
+    external: bool = False
 
 
 class SettingsFileStorage:
@@ -37,6 +39,7 @@ class SettingsFileStorage:
         disable_observer: bool = False,
     ):
         self.observer: FileObserver | None = FileObserver()
+        self._notify_task: asyncio.Task | None = None
         self.change_project(project_path, disable_observer)
 
     @property
@@ -58,8 +61,7 @@ class SettingsFileStorage:
     def change_project(self, project_path: Optional[Path] = None, disable_observer: bool = False):
         self._project_settings_file_path = project_path / "settings.toml" if project_path else None
 
-        self._global_settings = _get_settings_from_path(self.global_settings_file_path)
-        self._project_settings = _get_settings_from_path(self.project_settings_file_path)
+        self._load()
 
         if not disable_observer:
             self._start_observer()
@@ -71,10 +73,23 @@ class SettingsFileStorage:
 
         save_settings_file(file_path, settings_data)
 
-    async def _reload(self):
+        # The observer leaves out the files written by the server itself, so they are reloaded right away instead
+        own_file_writes().record(file_path)
+        self._load()
+
+        try:
+            self._notify_task = asyncio.get_running_loop().create_task(internal_events().emit(SettingsUpdatedEvent()))
+        except RuntimeError:
+            # Not on the event loop, there is nobody to notify
+            pass
+
+    def _load(self):
         self._global_settings = _get_settings_from_path(self.global_settings_file_path)
         self._project_settings = _get_settings_from_path(self.project_settings_file_path)
-        await internal_events().emit(SettingsUpdatedEvent())
+
+    async def _reload(self, changed_paths: set[Path] | None = None):
+        self._load()
+        await internal_events().emit(SettingsUpdatedEvent(external=True))
 
     def _start_observer(self):
         file_paths = [self.global_settings_file_path]
@@ -74,17 +74,17 @@ class Settings:
             self._when_reloaded,
         )
 
-    async def _when_reloaded(self, SettingsUpdatedEvent) -> None:
+    async def _when_reloaded(self, event: SettingsUpdatedEvent) -> None:
         """
         Handles the settings updated event asynchronously.
 
-        :param SettingsUpdatedEvent: The event indicating that settings have been updated.
+        :param event: The event indicating that settings have been updated.
         """
         if not self._storage or not self._notifications:
             _log.error("Settings not configured.")
             raise ValueError("Settings not configured")
 
-        await self._notifications.notify(SettingsServerMessage(initial=self._notifications.to_suppress))
+        await self._notifications.notify(SettingsServerMessage(initial=not event.external))
 
     @property
     def unified_settings(self) -> SettingsData:
@@ -110,7 +110,6 @@ class Settings:
             _log.error("Settings not configured.")
             raise ValueError("Settings not configured")
 
-        self._notifications.suppress_next_notification()
         self._storage.save(settings_data, to_global=to_global)
 
 
@@ -0,0 +1,55 @@
+"""
+Compares a chat with images drawn by its tool calls kept inline (base64 in the outputs) and in the blob store:
+the size of the chat as it is written to disk and sent to the clients, the size of the prompt made of it,
+and the time of storing the images.
+
+    python -m aiconsole.tests.benchmark_blob_store
+"""
+import base64
+import random
+import tempfile
+from pathlib import Path
+
+from aiconsole.core.blobs.blob_store import BlobStore, image_markdown
+from aiconsole.core.chat.convert_messages import convert_messages
+from aiconsole.core.chat.types import AICChat
+from aiconsole.tests.benchmark_helpers import Timer, make_chat
+
+MESSAGE_GROUPS = 50
+IMAGES = 20
+IMAGE_BYTES = 80 * 1024
+
+
+def measure(name: str, chat: AICChat) -> None:
+    chat_size = len(chat.model_dump_json())
+    prompt_size = sum(len(message.model_dump_json()) for message in convert_messages(chat))
+    print(f"{name:8} chat {chat_size / 1024:8.0f}KB   prompt {prompt_size / 1024:8.0f}KB")
+
+
+def main() -> None:
+    random.seed(0)
+    # The same plot drawn twice is stored once
+    images = [random.randbytes(IMAGE_BYTES) for _ in range(IMAGES // 2)] * 2
+
+    inline = make_chat("inline", MESSAGE_GROUPS)
+    for group, image in zip(inline.message_groups, images):
+        group.messages[0].tool_calls[0].output = base64.b64encode(image).decode()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(Path(tmp) / "blobs")
+        referenced = make_chat("referenced", MESSAGE_GROUPS)
+
+        with Timer() as storing:
+            for group, image in zip(referenced.message_groups, images):
+                group.messages[0].tool_calls[0].output = f"\n{image_markdown(store.put(image, 'png'))}\n"
+
+        stored = sum(path.stat().st_size for path in store.directory.rglob("*") if path.is_file())
+
+    print(f"{MESSAGE_GROUPS} message groups, {IMAGES} images of {IMAGE_BYTES // 1024}KB ({IMAGES // 2} distinct)")
+    measure("inline", inline)
+    measure("blobs", referenced)
+    print(f"storing the images {storing.elapsed * 1000:.1f}ms, {stored / 1024:.0f}KB in the blob store")
+
+
+if __name__ == "__main__":
+    main()
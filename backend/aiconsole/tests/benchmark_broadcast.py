@@ -0,0 +1,79 @@
+"""
+Measures the cost per recipient of broadcasting one streamed chunk to many clients subscribed to a chat,
+encoding the message for every recipient vs. encoding it once for all of them.
+
+Sending is done by the writer tasks of the connections to a websocket which only counts the frames,
+so what is left of the cost per recipient is queueing the frame and handing it to the socket.
+
+    python -m aiconsole.tests.benchmark_broadcast
+"""
+import asyncio
+import time
+
+from aiconsole.api.websockets.connection_manager import (
+    AICConnection,
+    ConnectionManager,
+    EncodedServerMessage,
+)
+from aiconsole.api.websockets.server_messages import (
+    NotifyAboutAssetMutationServerMessage,
+)
+from aiconsole.core.chat.locations import ChatRef
+from fastmutation.mutations import AppendToStringMutation
+
+MESSAGES = 200
+
+
+class CountingWebSocket:
+    def __init__(self):
+        self.frames = 0
+
+    async def send_text(self, data: str):
+        self.frames += 1
+
+
+async def broadcast(recipients: int, encode_once: bool) -> float:
+    manager = ConnectionManager()
+    chat_ref = ChatRef(id="chat")
+    message_ref = chat_ref.message_groups["group"].messages["message"]
+
+    for _ in range(recipients):
+        connection = AICConnection(CountingWebSocket(), subscriptions=manager.subscriptions)  # type: ignore
+        connection.subscribe_to_ref(chat_ref)
+        connection.start()
+        manager.active_connections.append(connection)
+
+    start = time.perf_counter()
+
+    for _ in range(MESSAGES):
+        message = NotifyAboutAssetMutationServerMessage(
+            request_id="request", mutation=AppendToStringMutation(ref=message_ref, key="content", value="lorem ip")
+        )
+        if encode_once:
+            await manager.send_to_ref(message, message_ref)
+        else:
+            for connection in manager.subscriptions.subscribers(message_ref.key.segments):
+                await connection.send_encoded(EncodedServerMessage(message))
+
+        for connection in manager.active_connections:
+            await connection.flush()
+
+    elapsed = time.perf_counter() - start
+
+    for connection in manager.active_connections:
+        await connection.close()
+
+    return elapsed / (MESSAGES * recipients)
+
+
+async def main():
+    print(f"{'recipients':>11} {'encode each (us)':>17} {'encode once (us)':>17}")
+
+    for recipients in [1, 10, 100]:
+        each = await broadcast(recipients, encode_once=False)
+        once = await broadcast(recipients, encode_once=True)
+        print(f"{recipients:>11} {each * 1e6:>17.1f} {once * 1e6:>17.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Measures disk usage and loading time of the chats of a project stored as plain JSON and gzip compressed,
+and the time of writing them. Given a project directory, its chats/ folder is used (it is only read),
+otherwise a generated project with long tool outputs and inline images.
+
+    python -m aiconsole.tests.benchmark_chat_compression [project_dir]
+"""
+import asyncio
+import base64
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from aiconsole.core.chat.chat_file import read_chat_file, write_chat_file
+from aiconsole.core.chat.chat_schema import CHAT_SCHEMA_VERSION, SCHEMA_VERSION_KEY
+from aiconsole.core.chat.list_possible_historic_chat_ids import (
+    list_possible_historic_chat_ids,
+)
+from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.tests.benchmark_helpers import Timer, make_chat
+
+CHATS = 200
+MESSAGE_GROUPS = 30
+
+
+def generated_chat_data(chat_id: str) -> dict:
+    tool_output = "\n".join(f"{i:5} | row {random.random():.6f} | ok" for i in range(200))
+    data = make_chat(chat_id, MESSAGE_GROUPS, tool_output=tool_output).model_dump(
+        mode="json", exclude={"id", "last_modified"}
+    )
+    # An inline image in every tenth tool output, noise like a photo compresses badly
+    for group in data["message_groups"][::10]:
+        image = base64.b64encode(random.randbytes(64 * 1024)).decode()
+        group["messages"][0]["tool_calls"][0]["output"] += f"\n![image](data:image/png;base64,{image})"
+
+    data[SCHEMA_VERSION_KEY] = CHAT_SCHEMA_VERSION
+    return data
+
+
+def folder_size(path: Path) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+async def measure(name: str, project_path: Path, chats: dict[str, dict], compression_min_bytes: int) -> None:
+    chats_path = project_path / "chats"
+    chats_path.mkdir(parents=True)
+
+    with Timer() as writing:
+        for chat_id, data in chats.items():
+            await write_chat_file(chats_path / f"{chat_id}.json", data, compression_min_bytes)
+
+    with Timer() as loading:
+        for chat_id in list_possible_historic_chat_ids(project_path):
+            await load_chat_history(chat_id, project_path)
+
+    print(
+        f"{name:26} {folder_size(chats_path) / 1024 / 1024:8.1f}MB   write {writing.elapsed * 1000:7.0f}ms"
+        f"   load {loading.elapsed * 1000:7.0f}ms"
+    )
+
+
+async def main() -> None:
+    random.seed(0)
+
+    if len(sys.argv) > 1:
+        source_project_path = Path(sys.argv[1])
+        chats = {
+            chat_id: await read_chat_file(source_project_path / "chats" / f"{chat_id}.json")
+            for chat_id in list_possible_historic_chat_ids(source_project_path)
+        }
+        print(f"{len(chats)} chats of {source_project_path}")
+    else:
+        chats = {f"chat-{i}": generated_chat_data(f"chat-{i}") for i in range(CHATS)}
+        print(f"{CHATS} generated chats with {MESSAGE_GROUPS} message groups")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        await measure("plain", Path(tmp) / "plain", chats, compression_min_bytes=0)
+        await measure("compressed over 64KB", Path(tmp) / "over-64kb", chats, compression_min_bytes=64 * 1024)
+        await measure("compressed", Path(tmp) / "compressed", chats, compression_min_bytes=1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Measures what the chat index spares: opening a project (chats are listed by their headlines, without the index
+each chat file is read up to its first message), reloading the chats after a change to one of them,
+and reading the names of the most recent chats of a project (as the list of recent projects does).
+
+    python -m aiconsole.tests.benchmark_chat_index
+"""
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from aiconsole.core.assets.fs.assets_file_storage import AssetsFileStorage
+from aiconsole.core.chat.chat_index import ChatIndex
+from aiconsole.core.chat.chat_schema import CHAT_SCHEMA_VERSION, SCHEMA_VERSION_KEY
+from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.core.project import project
+from aiconsole.tests.benchmark_helpers import Timer, make_chat
+
+CHATS = 2000
+MESSAGE_GROUPS = 30
+RECENT_CHATS = 4
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        project_path = Path(tmp)
+        chats_path = project_path / "chats"
+        chats_path.mkdir()
+        os.chdir(project_path)
+        project._project_initialized = True
+
+        for i in range(CHATS):
+            data = make_chat(f"chat-{i}", MESSAGE_GROUPS).model_dump(mode="json", exclude={"id", "last_modified"})
+            data[SCHEMA_VERSION_KEY] = CHAT_SCHEMA_VERSION
+            (chats_path / f"chat-{i}.json").write_text(json.dumps(data))
+
+        storage = AssetsFileStorage(paths=[project_path], disable_observer=True)
+
+        with Timer() as first_open:
+            await storage.setup()
+
+        storage.destroy()
+        storage = AssetsFileStorage(paths=[project_path], disable_observer=True)
+
+        with Timer() as indexed_open:
+            await storage.setup()
+
+        (chats_path / "chat-0.json").touch()
+
+        with Timer() as reload:
+            await storage._load_assets()
+
+        storage.destroy()
+
+        with Timer() as full_names:
+            for i in range(RECENT_CHATS):
+                (await load_chat_history(f"chat-{i}", project_path)).name
+
+        index = ChatIndex(project_path / ".aic" / "chat_index.json")
+        index.entries.clear()
+
+        with Timer() as partial_names:
+            for i in range(RECENT_CHATS):
+                (await index.refresh_name(f"chat-{i}", chats_path / f"chat-{i}.json")).name
+
+        index.load()
+
+        with Timer() as indexed_names:
+            for i in range(RECENT_CHATS):
+                (await index.refresh_name(f"chat-{i}", chats_path / f"chat-{i}.json")).name
+
+        project._project_initialized = False
+
+    print(f"{CHATS} chats with {MESSAGE_GROUPS} message groups each")
+    print(f"open, no index yet:                   {first_open.elapsed * 1000:8.1f}ms")
+    print(f"open, with the index:                 {indexed_open.elapsed * 1000:8.1f}ms")
+    print(f"reload after one chat changed:        {reload.elapsed * 1000:8.1f}ms")
+    print(f"{RECENT_CHATS} names, chats loaded:                {full_names.elapsed * 1000:8.2f}ms")
+    print(f"{RECENT_CHATS} names, partial reads:               {partial_names.elapsed * 1000:8.2f}ms")
+    print(f"{RECENT_CHATS} names, from the index:              {indexed_names.elapsed * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
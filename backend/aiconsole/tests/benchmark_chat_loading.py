@@ -0,0 +1,72 @@
+"""
+Measures loading all chats of a project, with chat files in the legacy format (migrated and written back)
+and in the current one (taken as they are). Before schema versions the migration ran on every load,
+its cost alone is shown for comparison.
+
+    python -m aiconsole.tests.benchmark_chat_loading
+"""
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+from aiconsole.core.chat.chat_schema import (
+    CHAT_SCHEMA_VERSION,
+    SCHEMA_VERSION_KEY,
+    migrate_chat_data,
+)
+from aiconsole.core.chat.load_chat_history import load_chat_history
+from aiconsole.tests.benchmark_helpers import Timer, make_chat
+
+CHATS = 2000
+MESSAGE_GROUPS = 30
+
+
+def legacy_chat_data(chat_id: str) -> dict:
+    data = make_chat(chat_id, MESSAGE_GROUPS).model_dump(mode="json", exclude={"id", "last_modified"})
+
+    for group in data["message_groups"]:
+        group["agent_id"] = group.pop("actor_id")["id"]
+        del group["analysis"]
+        for msg in group["messages"]:
+            for tool_call in msg["tool_calls"]:
+                del tool_call["headline"]
+
+    return data
+
+
+async def load_all(project_path: Path) -> float:
+    with Timer() as timer:
+        for i in range(CHATS):
+            await load_chat_history(f"chat-{i}", project_path)
+
+    return timer.elapsed
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        project_path = Path(tmp)
+        chats_path = project_path / "chats"
+        chats_path.mkdir()
+
+        for i in range(CHATS):
+            (chats_path / f"chat-{i}.json").write_text(json.dumps(legacy_chat_data(f"chat-{i}")))
+
+        legacy = [json.loads((chats_path / f"chat-{i}.json").read_text()) for i in range(CHATS)]
+        with Timer() as migration:
+            for data in legacy:
+                migrate_chat_data(data)
+
+        # The first load migrates the files and writes them back
+        migrating = await load_all(project_path)
+        assert json.loads((chats_path / "chat-0.json").read_text())[SCHEMA_VERSION_KEY] == CHAT_SCHEMA_VERSION
+        current = await load_all(project_path)
+
+    print(f"{CHATS} chats with {MESSAGE_GROUPS} message groups each")
+    print(f"legacy files (migrated and written back): {migrating * 1000:8.0f}ms")
+    print(f"current files:                            {current * 1000:8.0f}ms")
+    print(f"migration alone (paid on every load before): {migration.elapsed * 1000:5.0f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Measures ChatSearchIndex on a large project: building the index, saving and loading it,
+and answering queries of common and rare words, the first page of hits and the next one.
+
+    python -m aiconsole.tests.benchmark_chat_search
+"""
+import asyncio
+import random
+import tempfile
+from pathlib import Path
+
+from aiconsole.core.chat.chat_search_index import ChatSearchIndex
+from aiconsole.tests.benchmark_helpers import Timer, make_chat
+
+CHATS = 2000
+MESSAGE_GROUPS = 30
+QUERIES = ["lorem", "lorem ipsum", "print hello", "word17", "word17 word42", "missing"]
+
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+async def main() -> None:
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file_path = Path(tmp) / "chat_search_index.json"
+        index = ChatSearchIndex(index_file_path, get_chat=lambda chat_id: None)
+        index.loaded = True
+
+        chats = []
+        for i in range(CHATS):
+            chat = make_chat(f"chat-{i}", MESSAGE_GROUPS)
+            for group in chat.message_groups:
+                group.messages[0].content += " ".join(random.choices(WORDS, k=20))
+            chats.append(chat)
+
+        with Timer() as building:
+            for chat in chats:
+                index.index_chat(chat, chat.last_modified.timestamp())
+
+        with Timer() as saving:
+            await index.save()
+        index.close()
+
+        reloaded = ChatSearchIndex(index_file_path, get_chat=lambda chat_id: None)
+        with Timer() as loading:
+            await reloaded.load()
+
+        print(f"{CHATS} chats with {MESSAGE_GROUPS} message groups, {reloaded.document_count} documents")
+        print(f"build {building.elapsed * 1000:.0f}ms   save {saving.elapsed * 1000:.0f}ms")
+        print(f"load {loading.elapsed * 1000:.0f}ms   ({index_file_path.stat().st_size / 1024 / 1024:.1f}MB)")
+
+        for query in QUERIES:
+            with Timer() as first_page:
+                total, _hits = reloaded.search(query, limit=20)
+            with Timer() as next_page:
+                reloaded.search(query, offset=20, limit=20)
+            print(
+                f"{query!r:18} {total:7} hits   first page {first_page.elapsed * 1000:7.2f}ms"
+                f"   next page {next_page.elapsed * 1000:5.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
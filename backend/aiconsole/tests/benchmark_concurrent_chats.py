@@ -0,0 +1,68 @@
+"""
+Measures the throughput of chats streaming at the same time, each in its own lock.
+
+Every stream appends in bursts and releases its lock after each burst, which writes the chat
+(the write takes WRITE_LATENCY seconds). With per asset locks the throughput should grow with
+the number of chats, a single global lock is shown for comparison.
+
+    python -m aiconsole.tests.benchmark_concurrent_chats
+"""
+import asyncio
+
+from aiconsole.core.assets import aic_data_context
+from aiconsole.core.assets.aic_data_context import AICFileDataContext
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.tests.benchmark_helpers import (
+    Timer,
+    configure_project_with_assets,
+    make_chat,
+)
+from fastmutation.mutations import AppendToStringMutation
+
+BURSTS = 20
+APPENDS_PER_BURST = 50
+WRITE_LATENCY = 0.005
+
+
+async def stream(chat_id: str) -> None:
+    context = AICFileDataContext(origin=None, lock_id=f"stream-{chat_id}")
+    message_ref = ChatRef(id=chat_id, context=context).message_groups["group-0"].messages["message-0"]
+
+    for _ in range(BURSTS):
+        await context.acquire_lock(message_ref)
+        for _ in range(APPENDS_PER_BURST):
+            await context.mutate(
+                AppendToStringMutation(ref=message_ref, key="content", value="x"), originating_from_server=True
+            )
+        await context.release_lock(message_ref)
+
+
+async def measure(chats: int) -> float:
+    await configure_project_with_assets([make_chat(f"chat-{i}", 1) for i in range(chats)], write_latency=WRITE_LATENCY)
+
+    with Timer() as timer:
+        await asyncio.gather(*(stream(f"chat-{i}") for i in range(chats)))
+
+    return chats * BURSTS * APPENDS_PER_BURST / timer.elapsed
+
+
+async def main():
+    print(f"{'chats':>6} {'per asset locks (appends/s)':>28} {'global lock (appends/s)':>24}")
+
+    asset_lock = aic_data_context._asset_lock
+    global_lock = asyncio.Lock()
+
+    for chats in [1, 2, 4, 8, 16]:
+        aic_data_context._asset_lock = asset_lock
+        sharded = await measure(chats)
+
+        aic_data_context._asset_lock = lambda ref: global_lock
+        single = await measure(chats)
+
+        print(f"{chats:>6} {sharded:>28.0f} {single:>24.0f}")
+
+    aic_data_context._asset_lock = asset_lock
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
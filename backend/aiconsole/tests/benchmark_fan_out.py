@@ -0,0 +1,43 @@
+"""
+Measures the cost of finding the subscribers of a mutation with many connections open,
+each of them subscribed to a different chat: scanning all connections vs. the subscription trie.
+
+    python -m aiconsole.tests.benchmark_fan_out
+"""
+import time
+
+from aiconsole.api.websockets.connection_manager import AICConnection, ConnectionManager
+from aiconsole.core.chat.locations import ChatRef
+
+MUTATIONS = 200
+
+
+def main():
+    print(f"{'connections':>12} {'scan (us)':>10} {'trie (us)':>10}")
+
+    for connections in [1, 10, 100, 1000]:
+        manager = ConnectionManager()
+        manager.active_connections = [
+            AICConnection(websocket=None, subscriptions=manager.subscriptions)  # type: ignore
+            for _ in range(connections)
+        ]
+        for i, connection in enumerate(manager.active_connections):
+            connection.subscribe_to_ref(ChatRef(f"chat-{i}"))
+
+        ref = ChatRef("chat-0").message_groups["group"].messages["message"]
+
+        start = time.perf_counter()
+        for _ in range(MUTATIONS):
+            [connection for connection in manager.active_connections if connection.is_ref_open(ref)]
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(MUTATIONS):
+            manager.subscriptions.subscribers(ref.key.segments)
+        trie = time.perf_counter() - start
+
+        print(f"{connections:>12} {scan / MUTATIONS * 1e6:>10.2f} {trie / MUTATIONS * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
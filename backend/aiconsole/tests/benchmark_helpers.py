@@ -0,0 +1,113 @@
+"""
+Shared fixtures for the benchmark scripts in this directory.
+
+Benchmarks are plain scripts (python -m aiconsole.tests.benchmark_...), they are not collected by pytest.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from aiconsole.core.assets.assets_service import Assets
+from aiconsole.core.assets.types import Asset, AssetLocation
+from aiconsole.core.chat.actor_id import ActorId
+from aiconsole.core.chat.types import AICChat, AICMessage, AICMessageGroup, AICToolCall
+from aiconsole.core.project import project
+from fastmutation.mutations import AssetMutation
+
+
+class InMemoryAssetsStorage:
+    """
+    Keeps assets in memory only, write_latency simulates the time a write to disk takes.
+    """
+
+    def __init__(self, assets: list[Asset], write_latency: float = 0):
+        self.write_latency = write_latency
+        self._assets: dict[str, list[Asset]] = defaultdict(list)
+        for asset in assets:
+            self._assets[asset.id].append(asset)
+
+    @property
+    def assets(self) -> dict[str, list[Asset]]:
+        return self._assets
+
+    async def update_asset(self, original_asset_id: str, updated_asset: Asset, scope: str | None = None) -> None:
+        if self.write_latency:
+            await asyncio.sleep(self.write_latency)
+
+    async def persist_mutations(self, asset: Asset, mutations: list[AssetMutation] | None) -> None:
+        await self.update_asset(asset.id, asset)
+
+    async def hydrate(self, asset_id: str) -> Asset | None:
+        assets = self._assets.get(asset_id)
+        return assets[0] if assets else None
+
+    def dehydrate(self, asset_id: str) -> None:
+        pass
+
+    async def create_asset(self, asset: Asset) -> None:
+        self._assets[asset.id].append(asset)
+
+    async def delete_asset(self, asset_id: str) -> None:
+        del self._assets[asset_id]
+
+    async def setup(self) -> tuple[bool, Exception | None]:
+        return True, None
+
+    def destroy(self) -> None:
+        pass
+
+
+async def configure_project_with_assets(assets: list[Asset], write_latency: float = 0) -> Assets:
+    project_assets = Assets()
+    await project_assets.configure(InMemoryAssetsStorage(assets, write_latency=write_latency))
+    project._assets = project_assets
+    return project_assets
+
+
+def make_chat(chat_id: str, message_groups: int, tool_output: str = "") -> AICChat:
+    return AICChat(
+        id=chat_id,
+        name="Benchmark chat",
+        usage="",
+        usage_examples=[],
+        defined_in=AssetLocation.PROJECT_DIR,
+        last_modified=datetime.now(),
+        override=False,
+        message_groups=[
+            AICMessageGroup(
+                id=f"group-{i}",
+                actor_id=ActorId(type="agent", id="assistant"),
+                role="assistant",
+                analysis="",
+                task="",
+                materials_ids=[],
+                messages=[
+                    AICMessage(
+                        id=f"message-{i}",
+                        timestamp=datetime.now().isoformat(),
+                        content="Lorem ipsum dolor sit amet " * 20,
+                        tool_calls=[
+                            AICToolCall(
+                                id=f"tool-call-{i}",
+                                language="python",
+                                code="print('hello')",
+                                headline="",
+                                output=tool_output,
+                            )
+                        ],
+                    )
+                ],
+            )
+            for i in range(message_groups)
+        ],
+    )
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.elapsed = time.perf_counter() - self.start
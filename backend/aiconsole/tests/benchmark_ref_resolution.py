@@ -0,0 +1,54 @@
+"""
+Measures the cost of a single streamed append depending on the length of the chat.
+
+With the per asset object index the cost should stay flat, the linear walk is shown for comparison.
+
+    python -m aiconsole.tests.benchmark_ref_resolution
+"""
+import asyncio
+
+from aiconsole.core.assets.aic_data_context import AICFileDataContext
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.tests.benchmark_helpers import (
+    Timer,
+    configure_project_with_assets,
+    make_chat,
+)
+from fastmutation.apply_mutation import apply_mutation
+from fastmutation.mutations import AppendToStringMutation
+from fastmutation.object_index import ObjectIndex
+
+APPENDS = 2000
+
+
+async def main():
+    print(f"{'groups':>8} {'indexed append (us)':>20} {'linear walk (us)':>18}")
+
+    for message_groups in [10, 100, 1000, 5000]:
+        chat = make_chat("benchmark", message_groups)
+        await configure_project_with_assets([chat])
+
+        context = AICFileDataContext(origin=None, lock_id="benchmark")
+        last = message_groups - 1
+        message_ref = ChatRef(id=chat.id, context=context).message_groups[f"group-{last}"].messages[f"message-{last}"]
+        mutation = AppendToStringMutation(ref=message_ref, key="content", value="x")
+
+        # Build the index outside of the measurement, it is built once per loaded asset
+        await context.get(message_ref)
+
+        with Timer() as indexed:
+            for _ in range(APPENDS):
+                await apply_mutation(context, mutation)
+                context.asset_operation_manager.operations.clear()
+
+        index = ObjectIndex(chat)
+        segments = message_ref.ref_segments[2:]
+        with Timer() as walk:
+            for _ in range(APPENDS):
+                index._resolve_by_walking(tuple(segments))
+
+        print(f"{message_groups:>8} {indexed.elapsed / APPENDS * 1e6:>20.1f} {walk.elapsed / APPENDS * 1e6:>18.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Compares the folder layout (AssetsFileStorage, with chats written whole or journaled) with SqliteAssetsStorage:
+opening a project, loading a chat, and persisting a stream of appends to a message of a long chat,
+one write per append (the worst case, write-behind usually batches them).
+
+    python -m aiconsole.tests.benchmark_sqlite_storage
+"""
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from aiconsole.core.assets.assets_storage import AssetsStorage
+from aiconsole.core.assets.fs.assets_file_storage import (
+    AssetsFileStorage,
+    ChatStorageMode,
+)
+from aiconsole.core.assets.sqlite.import_export import import_project_assets
+from aiconsole.core.assets.sqlite.sqlite_assets_storage import SqliteAssetsStorage
+from aiconsole.core.chat.chat_schema import CHAT_SCHEMA_VERSION, SCHEMA_VERSION_KEY
+from aiconsole.core.chat.locations import ChatRef
+from aiconsole.core.chat.types import AICChat
+from aiconsole.core.project import project
+from aiconsole.tests.benchmark_helpers import Timer, make_chat
+from fastmutation.mutations import AppendToStringMutation
+
+CHATS = 500
+MESSAGE_GROUPS = 30
+LONG_CHAT_MESSAGE_GROUPS = 500
+APPENDS = 200
+
+
+async def measure(name: str, create_storage) -> None:
+    storage: AssetsStorage = create_storage()
+
+    with Timer() as open_project:
+        await storage.setup()
+
+    with Timer() as load:
+        chat = await storage.hydrate("long-chat")
+    assert isinstance(chat, AICChat)
+
+    message = chat.message_groups[-1].messages[0]
+    message_ref = ChatRef(id="long-chat").message_groups[chat.message_groups[-1].id].messages[message.id]
+
+    with Timer() as appends:
+        for i in range(APPENDS):
+            message.content += f" token{i}"
+            await storage.persist_mutations(
+                chat, [AppendToStringMutation(ref=message_ref, key="content", value=f" token{i}")]
+            )
+
+    storage.destroy()
+
+    print(
+        f"{name:20} open {open_project.elapsed * 1000:8.1f}ms   load {load.elapsed * 1000:7.1f}ms"
+        f"   {APPENDS} appends {appends.elapsed * 1000:8.1f}ms"
+    )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        project_path = Path(tmp)
+        chats_path = project_path / "chats"
+        chats_path.mkdir()
+        os.chdir(project_path)
+        project._project_initialized = True
+
+        chats = [make_chat(f"chat-{i}", MESSAGE_GROUPS) for i in range(CHATS)]
+        chats.append(make_chat("long-chat", LONG_CHAT_MESSAGE_GROUPS))
+        for chat in chats:
+            data = chat.model_dump(mode="json", exclude={"id", "last_modified"})
+            data[SCHEMA_VERSION_KEY] = CHAT_SCHEMA_VERSION
+            (chats_path / f"{chat.id}.json").write_text(json.dumps(data))
+
+        db_path = project_path / ".aic" / "assets.db"
+
+        with Timer() as importing:
+            await import_project_assets(project_path, db_path)
+
+        print(f"{CHATS} chats with {MESSAGE_GROUPS} message groups, one with {LONG_CHAT_MESSAGE_GROUPS}")
+        print(f"import to sqlite: {importing.elapsed * 1000:.0f}ms")
+
+        await measure(
+            "files (snapshot)",
+            lambda: AssetsFileStorage(paths=[project_path], disable_observer=True),
+        )
+        await measure(
+            "files (journal)",
+            lambda: AssetsFileStorage(
+                paths=[project_path], disable_observer=True, chat_storage_mode=ChatStorageMode.JOURNAL
+            ),
+        )
+        await measure("sqlite", lambda: SqliteAssetsStorage(db_path))
+
+        project._project_initialized = False
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""
+Measures streaming a tool output into a tool call in CHUNK_CHARS character appends,
+concatenating the whole string on every append vs. collecting chunks joined once on read.
+
+    python -m aiconsole.tests.benchmark_streamed_strings
+"""
+from aiconsole.tests.benchmark_helpers import Timer, make_chat
+
+CHUNK_CHARS = 8
+
+
+def stream(output_chars: int) -> tuple[float, float]:
+    chunk = "x" * CHUNK_CHARS
+    appends = output_chars // CHUNK_CHARS
+    tool_call = make_chat("benchmark", 1).message_groups[0].messages[0].tool_calls[0]
+
+    tool_call.output = ""
+    with Timer() as concatenated:
+        for _ in range(appends):
+            # What the AppendToStringMutation handler used to do
+            setattr(tool_call, "output", getattr(tool_call, "output", "") + chunk)
+
+    tool_call.output = ""
+    with Timer() as chunked:
+        for _ in range(appends):
+            tool_call.append_to_string("output", chunk)
+        assert len(tool_call.output or "") == output_chars
+
+    return concatenated.elapsed, chunked.elapsed
+
+
+def main():
+    print(f"{'output chars':>13} {'concatenate (us/append)':>24} {'chunks (us/append)':>19}")
+
+    for output_chars in [4_000, 40_000, 400_000]:
+        concatenated, chunked = stream(output_chars)
+        appends = output_chars // CHUNK_CHARS
+        print(f"{output_chars:>13} {concatenated / appends * 1e6:>24.2f} {chunked / appends * 1e6:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures bytes on the wire and server CPU time of one streamed response in every websocket wire format.
+
+The response is streamed as CHUNKS appends of a few random words each to one message. Compression is measured
+the way the permessage-deflate extension compresses frames (raw deflate with a window shared between frames),
+the ratio is the one of the frames sent compressed to the same frames sent uncompressed.
+
+    python -m aiconsole.tests.benchmark_wire_format
+"""
+import random
+import time
+import zlib
+
+from aiconsole.api.websockets.server_messages import (
+    NotifyAboutAssetMutationServerMessage,
+)
+from aiconsole.api.websockets.wire_format import WireEncoding, encode_frame
+from aiconsole.core.chat.locations import ChatRef
+from fastmutation.mutations import AppendToStringMutation
+
+CHUNKS = 2000
+WORDS = 5000
+SYLLABLES = ["ka", "lo", "re", "mi", "psu", "dor", "sit", "am", "et", "con", "sec", "te", "tur", "ad", "ip", "ng"]
+
+
+def make_chunks() -> list[str]:
+    rng = random.Random(0)
+    words = ["".join(rng.choices(SYLLABLES, k=rng.randint(1, 4))) for _ in range(WORDS)]
+    # Like tokens of a model response, some words are much more common than others
+    weights = [1 / (rank + 1) for rank in range(WORDS)]
+    return [
+        " " + " ".join(rng.choices(words, weights=weights, k=rng.randint(1, 3))) + rng.choice(["", "", "", ",", "."])
+        for _ in range(CHUNKS)
+    ]
+
+
+def stream(chunks: list[str], encoding: WireEncoding, deflate: bool) -> tuple[int, float]:
+    message_ref = ChatRef(id="chat").message_groups["group"].messages["message"]
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    wire_bytes = 0
+
+    start = time.process_time()
+
+    for chunk in chunks:
+        msg = NotifyAboutAssetMutationServerMessage(
+            request_id="request", mutation=AppendToStringMutation(ref=message_ref, key="content", value=chunk)
+        )
+        frame = encode_frame({"type": msg.get_type(), **msg.model_dump(exclude_none=True, mode="json")}, encoding)
+        data = frame.encode() if isinstance(frame, str) else frame
+
+        if deflate:
+            data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        wire_bytes += len(data)
+
+    return wire_bytes, time.process_time() - start
+
+
+def main():
+    chunks = make_chunks()
+    print(f"{'format':>18} {'bytes per chunk':>16} {'ratio':>6} {'cpu per chunk (us)':>19}")
+
+    for encoding in WireEncoding:
+        uncompressed_bytes = None
+        for deflate in [False, True]:
+            wire_bytes, cpu = stream(chunks, encoding, deflate)
+            uncompressed_bytes = uncompressed_bytes or wire_bytes
+            name = encoding.value + (" + deflate" if deflate else "")
+            ratio = wire_bytes / uncompressed_bytes
+            print(f"{name:>18} {wire_bytes / CHUNKS:>16.1f} {ratio:>6.2f} {cpu / CHUNKS * 1e6:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,107 @@
+import asyncio
+import threading
 from pathlib import Path
-from unittest.mock import MagicMock
 
-from aiconsole.utils.file_observer import FileObserver
+import pytest
 
+from aiconsole.utils.file_observer import (
+    FileObserver,
+    OwnFileWrites,
+    file_watcher,
+    own_file_writes,
+)
 
-def test_start_observer():
-    # Create a mock on_changed function
-    on_changed_mock = MagicMock()
+
+@pytest.mark.asyncio
+async def test_start_observer(tmp_path: Path):
+    batches: list[tuple[set[Path], threading.Thread]] = []
+
+    async def on_changed(changed_paths: set[Path]):
+        batches.append((changed_paths, threading.current_thread()))
 
     # Create a list of file paths to observe
-    file_paths = [Path("/path/to/file1.txt"), Path("/path/to/file2.txt")]
+    file_paths = [tmp_path / "file1.toml", tmp_path / "file2.toml"]
 
-    # Create an instance of FileObserver
-    file_observer = FileObserver()
+    # Create two observers of the same directory, sharing the one watcher
+    file_observer = FileObserver(debounce_seconds=0.2)
+    other_observer = FileObserver(debounce_seconds=0.2)
 
-    # Start the observer
-    file_observer.start(file_paths, on_changed_mock)
+    # Start the observers
+    file_observer.start(file_paths, on_changed)
+    other_observer.start([tmp_path], on_changed, extensions=(".json",))
 
     # Assert that the observer is observing the correct file paths
     assert file_observer.observing == file_paths
 
-    # Assert that the observer is started
-    assert file_observer._observer and file_observer._observer.is_alive()
+    for i in range(3):
+        file_paths[0].write_text(f"a = {i}")
+    file_paths[1].write_text("b = 1")
+    (tmp_path / "other.toml").write_text("c = 1")
+
+    for _ in range(50):
+        await asyncio.sleep(0.1)
+        if batches:
+            break
+    await asyncio.sleep(0.3)
 
-    # Stop the observer
+    # One batch with both files, delivered on the event loop
+    assert batches == [({file_paths[0], file_paths[1]}, threading.current_thread())]
+
+    # Stop the observers
     file_observer.stop()
+    other_observer.stop()
 
     # Assert that the observer is stopped
-    assert not file_observer._observer.is_alive()
     assert file_observer.observing == []
+    assert file_watcher()._directories == {}
+
+    file_watcher().stop()
+
+
+@pytest.mark.asyncio
+async def test_should_leave_out_own_writes(tmp_path: Path):
+    batches: list[set[Path]] = []
+
+    async def on_changed(changed_paths: set[Path]):
+        batches.append(changed_paths)
+
+    file_path = tmp_path / "settings.toml"
+    file_observer = FileObserver(debounce_seconds=0.2)
+    file_observer.start([file_path], on_changed)
+
+    file_path.write_text("a = 1")
+    own_file_writes().record(file_path)
+    await asyncio.sleep(0.5)
+
+    assert batches == []
+
+    # Edited by someone else
+    file_path.write_text("a = 2, b = 3")
+
+    for _ in range(50):
+        await asyncio.sleep(0.1)
+        if batches:
+            break
+
+    assert batches == [{file_path}]
+
+    file_observer.stop()
+    file_watcher().stop()
+
+
+def test_should_forget_checked_and_oldest_own_writes(tmp_path: Path):
+    own_writes = OwnFileWrites(capacity=2)
+    paths = [tmp_path / f"file{i}.toml" for i in range(3)]
+    for path in paths:
+        path.write_text("a = 1")
+        own_writes.record(path)
+
+    # The oldest is forgotten
+    assert not own_writes.is_own(paths[0])
+
+    # Each write is checked once
+    assert own_writes.is_own(paths[1])
+    assert not own_writes.is_own(paths[1])
+
+    paths[2].write_text("a = 2, b = 3")
+    assert not own_writes.is_own(paths[2])
@@ -0,0 +1,38 @@
+import os
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import aiofiles
+import aiofiles.os as async_os
+
+
+async def write_text_atomically(file_path: Path, content: str) -> None:
+    """
+    Writes content to a temporary file next to file_path and renames it over file_path,
+    so a crash in the middle of a write never leaves a truncated file behind.
+    """
+    await _write_atomically(file_path, content, mode="w", encoding="utf8", errors="replace")
+
+
+async def write_bytes_atomically(file_path: Path, content: bytes) -> None:
+    """
+    Same as write_text_atomically, for binary content.
+    """
+    await _write_atomically(file_path, content, mode="wb")
+
+
+async def _write_atomically(file_path: Path, content: Any, **open_kwargs: Any) -> None:
+    tmp_file_path = file_path.with_name(f".{file_path.name}.{uuid4().hex}.tmp")
+
+    try:
+        async with aiofiles.open(tmp_file_path, **open_kwargs) as f:
+            await f.write(content)
+            await f.flush()
+            os.fsync(f.fileno())
+
+        await async_os.replace(tmp_file_path, file_path)
+    except BaseException:
+        if await async_os.path.exists(tmp_file_path):
+            await async_os.remove(tmp_file_path)
+        raise
@@ -1,65 +1,137 @@
 import asyncio
 import logging
+import os
 import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable
+from typing import Awaitable, Callable
 
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver, ObservedWatch
+
+from aiconsole.consts import FILE_WATCHER_DEBOUNCE_SECONDS
 
 _log = logging.getLogger(__name__)
 
+# A batch waits for the changes to stop for debounce seconds, but no longer than this many times that since
+# its first change, so that a file written over and over does not hold back the reload forever
+_MAX_DELAY_IN_DEBOUNCES = 5
 
-class BatchingWatchDogHandler(FileSystemEventHandler):
-    def __init__(self, reload, extension=".toml"):
-        self.lock = threading.RLock()
-        self.timer = None
-        self.reload = reload
-        self.extension = extension
 
-    def on_moved(self, event):
-        return self.on_modified(event)
+# Files written by the server which no change was seen of yet (e.g. a chat journal recorded as not existing)
+# are forgotten, the oldest first, once there are more of them
+_MAX_OWN_FILE_WRITES = 10_000
 
-    def on_created(self, event):
-        return self.on_modified(event)
+_Fingerprint = tuple[int, int, int] | None
 
-    def on_deleted(self, event):
-        return self.on_modified(event)
 
-    def on_modified(self, event):
-        if event.is_directory or not event.src_path.endswith(self.extension):
-            return
+def _fingerprint(path: Path) -> _Fingerprint:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class OwnFileWrites:
+    """
+    The state (size, mtime, inode or being gone) the server left the files it wrote itself in. FileObservers skip
+    the changes of files still in that state, so only edits made by someone else get reloaded.
+    """
+
+    def __init__(self, capacity: int = _MAX_OWN_FILE_WRITES):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        # In the order of recording, the oldest first
+        self._fingerprints: dict[Path, _Fingerprint] = {}
+
+    def record(self, *paths: Path) -> None:
+        """
+        Call right after writing, moving or removing the files.
+        """
+        fingerprints = {path.absolute(): _fingerprint(path) for path in paths}
+
+        with self._lock:
+            for path, fingerprint in fingerprints.items():
+                self._fingerprints.pop(path, None)
+                self._fingerprints[path] = fingerprint
+
+            while len(self._fingerprints) > self.capacity:
+                del self._fingerprints[next(iter(self._fingerprints))]
 
-        with self.lock:
+    def is_own(self, path: Path) -> bool:
+        """
+        Whether the change of the file is the server's own write. Each write is checked once, the write is
+        forgotten afterwards, as is a write which someone else changed the file after.
+        """
+        path = path.absolute()
 
-            def reload():
-                with self.lock:
-                    if self.timer is not None:
-                        self.timer.cancel()
-                    self.timer = None
-                    asyncio.run(self.reload())
+        with self._lock:
+            if path not in self._fingerprints:
+                return False
+            recorded = self._fingerprints.pop(path)
 
-            if self.timer is None:
-                self.timer = threading.Timer(1.0, reload)
-                self.timer.start()
+        return _fingerprint(path) == recorded
+
+
+@lru_cache
+def own_file_writes() -> OwnFileWrites:
+    return OwnFileWrites()
 
 
 class FileObserver:
-    def __init__(self):
-        self._observer = None
+    """
+    Watches files and passes the paths of the changed ones to on_changed, in debounced batches, on the event loop
+    it was started on. All FileObservers share the one watcher thread of file_watcher().
+    Files the server wrote itself and nobody changed since (see own_file_writes) are left out.
+    """
+
+    def __init__(self, debounce_seconds: float = FILE_WATCHER_DEBOUNCE_SECONDS):
         self.observing: list[Path] = []
+        self._debounce_seconds = debounce_seconds
+        self._on_changed: Callable[[set[Path]], Awaitable] | None = None
+        self._extensions: tuple[str, ...] | None = None
+        self._watched: set[Path] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed_paths: set[Path] = set()
+        self._changed_since = 0.0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._reload_lock = asyncio.Lock()
+        self._reloads: set[asyncio.Task] = set()
 
-    def start(self, file_paths: list[Path], on_changed: Callable):
+    def start(
+        self,
+        file_paths: list[Path],
+        on_changed: Callable[[set[Path]], Awaitable],
+        extensions: tuple[str, ...] | None = None,
+    ):
+        """
+        Watches the given files or, given extensions, the files with these extensions in the given directories.
+        on_changed gets the paths of the changed files.
+        """
         _log.debug(f"[{self.__class__.__name__}] Starting observer...")
 
-        # Stop and reset the existing observer
+        # Stop watching what was watched so far
         self.stop()
 
-        # Reinitialize the observer
-        self._observer = Observer()
-        self._observer.daemon = False
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            _log.error(f"[{self.__class__.__name__}] Can only be started on a running event loop")
+            return
+
+        self._on_changed = on_changed
+        self._extensions = extensions
 
-        # Setup and start new observer
         for file_path in file_paths:
             if not isinstance(file_path, Path):
                 _log.error(f"[{self.__class__.__name__}] Not a valid filepath: {file_path}")
@@ -69,40 +141,182 @@ class FileObserver:
                 _log.warning(f"[{self.__class__.__name__}] Already observing: {file_path}")
                 continue
 
-            # Set up observer
-            try:
-                self._observer.schedule(
-                    BatchingWatchDogHandler(on_changed, file_path.suffix),
-                    file_path.parent,
-                    recursive=False,
-                )
-            except Exception as e:
-                _log.error(f"[{self.__class__.__name__}] Error setting up observer for {file_path}: {e}")
-
-            self.observing.append(file_path)
+            directory = file_path.parent if extensions is None else file_path
+            if file_watcher().watch(directory, self):
+                self._watched.add(file_path.absolute())
+                self.observing.append(file_path)
 
         if self.observing:
-            try:
-                self._observer.start()
-                _log.info(f"[{self.__class__.__name__}] Observing for changes: {self.observing}.")
-            except RuntimeError as e:
-                _log.error(f"[{self.__class__.__name__}] Error starting observer: {e}")
+            _log.info(f"[{self.__class__.__name__}] Observing for changes: {self.observing}.")
 
     def stop(self):
-        if self._observer:
-            if self._observer.is_alive():
+        file_watcher().unwatch(self)
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        # Batches still being reloaded finish, no new ones are started
+        self._on_changed = None
+        self._loop = None
+        self._changed_paths.clear()
+        self._watched.clear()
+        self.observing.clear()
+
+    def notify(self, path: Path) -> None:
+        """
+        Called from the watcher thread for every change in a directory this observer watches.
+        """
+        loop = self._loop
+        if loop is None or not self._accepts(path):
+            return
+
+        try:
+            loop.call_soon_threadsafe(self._add_changed_path, path)
+        except RuntimeError:
+            # The loop is closed, the app is shutting down
+            pass
+
+    def _accepts(self, path: Path) -> bool:
+        if self._extensions is None:
+            return path in self._watched
+
+        return path.parent in self._watched and path.name.endswith(self._extensions)
+
+    def _add_changed_path(self, path: Path) -> None:
+        if self._loop is None:
+            return
+
+        now = self._loop.time()
+        if not self._changed_paths:
+            self._changed_since = now
+        self._changed_paths.add(path)
+
+        if self._flush_handle is not None:
+            if now - self._changed_since >= self._debounce_seconds * _MAX_DELAY_IN_DEBOUNCES:
+                return
+            self._flush_handle.cancel()
+
+        self._flush_handle = self._loop.call_later(self._debounce_seconds, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        if self._loop is None or not self._changed_paths:
+            return
+
+        changed_paths = {path for path in self._changed_paths if not own_file_writes().is_own(path)}
+        self._changed_paths = set()
+        if not changed_paths:
+            return
+
+        reload = self._loop.create_task(self._reload(changed_paths))
+        self._reloads.add(reload)
+        reload.add_done_callback(self._reloads.discard)
+
+    async def _reload(self, changed_paths: set[Path]) -> None:
+        # One batch at a time, the next one waits for the previous reload to finish
+        async with self._reload_lock:
+            if self._on_changed is None:
+                return
+
+            try:
+                await self._on_changed(changed_paths)
+            except Exception:
+                _log.exception(f"[{self.__class__.__name__}] Error reloading {changed_paths}")
+
+
+class _DirectoryHandler(FileSystemEventHandler):
+    def __init__(self):
+        self.watch: ObservedWatch | None = None
+        # Replaced, never changed in place, so that the watcher thread can iterate it without a lock
+        self.observers: frozenset[FileObserver] = frozenset()
+
+    def on_any_event(self, event: FileSystemEvent):
+        if event.is_directory:
+            return
+
+        if event.event_type == EVENT_TYPE_MOVED:
+            # Atomic writes show up as a temporary file moved over the target
+            paths = [event.src_path, event.dest_path]
+        elif event.event_type in (EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, EVENT_TYPE_DELETED):
+            paths = [event.src_path]
+        else:
+            return
+
+        for observer in self.observers:
+            for path in paths:
+                observer.notify(Path(str(path)))
+
+
+class FileWatcher:
+    """
+    The one watchdog observer thread, each watched directory is watched once for all FileObservers watching it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._observer: BaseObserver | None = None
+        self._directories: dict[Path, _DirectoryHandler] = {}
+
+    def watch(self, directory: Path, observer: FileObserver) -> bool:
+        directory = directory.absolute()
+
+        with self._lock:
+            handler = self._directories.get(directory)
+
+            if handler is None:
                 try:
-                    self._observer.stop()
-                    self._observer.join(timeout=5)
+                    if self._observer is None:
+                        self._observer = Observer()
+                        self._observer.daemon = True
+                        self._observer.start()
+
+                    handler = _DirectoryHandler()
+                    handler.watch = self._observer.schedule(handler, str(directory), recursive=False)
                 except Exception as e:
-                    _log.error(f"[{self.__class__.__name__}] Error stopping observer: {e}")
-                else:
-                    _log.info(f"[{self.__class__.__name__}] Observer stopped.")
-            else:
-                _log.info(f"[{self.__class__.__name__}] Observer was not running.")
-
-            # Clear the observer reference
-            self._observer = None
-            self.observing.clear()
+                    _log.error(f"[{self.__class__.__name__}] Error setting up observer for {directory}: {e}")
+                    return False
+
+                self._directories[directory] = handler
+
+            handler.observers = handler.observers | {observer}
+            return True
+
+    def unwatch(self, observer: FileObserver) -> None:
+        with self._lock:
+            for directory, handler in list(self._directories.items()):
+                if observer not in handler.observers:
+                    continue
+
+                handler.observers = handler.observers - {observer}
+                if handler.observers:
+                    continue
+
+                del self._directories[directory]
+                try:
+                    if self._observer is not None and handler.watch is not None:
+                        self._observer.unschedule(handler.watch)
+                except Exception as e:
+                    _log.error(f"[{self.__class__.__name__}] Error stopping observer for {directory}: {e}")
+
+    def stop(self) -> None:
+        with self._lock:
+            observer, self._observer = self._observer, None
+            self._directories.clear()
+
+        if observer is None:
+            _log.info(f"[{self.__class__.__name__}] Observer was not running.")
+            return
+
+        try:
+            observer.stop()
+            observer.join(timeout=5)
+        except Exception as e:
+            _log.error(f"[{self.__class__.__name__}] Error stopping observer: {e}")
         else:
-            _log.info(f"[{self.__class__.__name__}] Observer was not initialized.")
+            _log.info(f"[{self.__class__.__name__}] Observer stopped.")
+
+
+@lru_cache
+def file_watcher() -> FileWatcher:
+    return FileWatcher()
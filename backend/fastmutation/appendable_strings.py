@@ -0,0 +1,82 @@
+from typing import Any, ClassVar
+
+from pydantic import PrivateAttr, SerializerFunctionWrapHandler, model_serializer
+
+from fastmutation.types import BaseObject
+
+
+class AppendableStringsObject(BaseObject):
+    """
+    An object with string fields streamed into by many small appends (__appendable_fields__).
+
+    Appended chunks are collected in a list instead of concatenating the whole string on every append.
+    While there are chunks, the field is missing from the instance __dict__, so reading it falls through
+    to __getattr__, which joins the chunks. Serialisation, comparison and copies join them first too.
+    """
+
+    __appendable_fields__: ClassVar[frozenset[str]] = frozenset()
+
+    _chunks: dict[str, list[str]] = PrivateAttr(default_factory=dict)
+
+    def append_to_string(self, key: str, value: str) -> None:
+        if key not in self.__appendable_fields__:
+            setattr(self, key, getattr(self, key, "") + value)
+            return
+
+        all_chunks = self.__pydantic_private__["_chunks"]  # type: ignore
+        chunks = all_chunks.get(key)
+
+        if chunks is None:
+            all_chunks[key] = [self.__dict__.pop(key) + value]
+        else:
+            chunks.append(value)
+
+    def materialize(self) -> None:
+        if self._chunks:
+            for key in list(self._chunks):
+                self._materialize(key)
+
+    def _materialize(self, key: str) -> str:
+        value = "".join(self._chunks.pop(key))
+        self.__dict__[key] = value
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self.__appendable_fields__:
+            private = self.__pydantic_private__
+            if private and name in private["_chunks"]:
+                return self._materialize(name)
+
+        return super().__getattr__(name)  # type: ignore
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__appendable_fields__:
+            self._chunks.pop(name, None)
+
+        super().__setattr__(name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        self.materialize()
+        if isinstance(other, AppendableStringsObject):
+            other.materialize()
+        return super().__eq__(other)
+
+    def __copy__(self):
+        self.materialize()
+        copied = super().__copy__()
+        # Private attributes are copied shallowly, the copy must not share the chunks with the original
+        copied._chunks = {}
+        return copied
+
+    def __deepcopy__(self, memo: dict[int, Any] | None = None):
+        self.materialize()
+        return super().__deepcopy__(memo)
+
+    def __getstate__(self) -> dict[Any, Any]:
+        self.materialize()
+        return super().__getstate__()
+
+    @model_serializer(mode="wrap")
+    def _serialize_materialized(self, handler: SerializerFunctionWrapHandler) -> Any:
+        self.materialize()
+        return handler(self)
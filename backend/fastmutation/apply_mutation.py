@@ -2,6 +2,7 @@ from typing import Any, Awaitable, Callable
 
 from aiconsole.core.chat.types import AICChatOptions
 from aiconsole.core.project.project import get_project_assets
+from fastmutation.appendable_strings import AppendableStringsObject
 from fastmutation.data_context import DataContext
 from fastmutation.mutations import (
     AppendToStringMutation,
@@ -31,27 +32,17 @@ async def _handle_CreateMutation(root: DataContext, mutation: CreateMutation):
 
     obj = object_type(**mutation_object, id=mutation.ref.id)
 
-    attr = asset
+    if asset is None:
+        get_project_assets()._storage._assets[obj.id] = [obj, ]
+        root.asset_operation_manager.queue_operation(get_project_assets().create_asset, obj)  # type: ignore
+        return
 
-    # if creting asset
-    for ref in mutation.ref.ref_segments[2:-1]:
-        if isinstance(attr, list):
-            attr = next((item for item in attr if item.id == ref), None)
-        else:
-            attr = getattr(attr, ref)
+    # if creating an object inside of the asset
+    if len(mutation.ref.ref_segments) > 2:
+        collection.append(obj)
+        root.object_created(mutation.ref, obj)
 
-    if isinstance(attr, list):
-        attr.append(obj)
-    elif isinstance(attr, dict):
-        attr.update(obj)
-    else:
-        attr = obj
-
-    if asset is None:
-        get_project_assets()._storage._assets[attr.id] = [attr, ]
-        root.asset_operation_manager.queue_operation(get_project_assets().create_asset, attr)  # type: ignore
-    else:
-        root.asset_operation_manager.queue_operation(get_project_assets().update_asset, asset.id, asset or attr)  # type: ignore
+    root.asset_operation_manager.queue_operation(get_project_assets().mark_dirty, asset, mutation)  # type: ignore
 
 
 async def _handle_DeleteMutation(root: DataContext, mutation: DeleteMutation):
@@ -70,12 +61,16 @@ async def _handle_DeleteMutation(root: DataContext, mutation: DeleteMutation):
     if object is None:
         raise ValueError(f"Object {mutation.ref} not found")
 
-    collection.remove(object)
+    # Compare by identity, == on models would compare whole subtrees
+    index = next((i for i, item in enumerate(collection) if item is object), None)
 
-    if asset is None:
-        root.asset_operation_manager.queue_operation(get_project_assets().delete_asset, asset.id)  # type: ignore
-    else:
-        root.asset_operation_manager.queue_operation(get_project_assets().update_asset, asset.id, asset)  # type: ignore
+    if index is None:
+        raise ValueError(f"Object {mutation.ref} not found in collection {mutation.ref.parent_collection}")
+
+    del collection[index]
+    root.object_deleted(mutation.ref)
+
+    root.asset_operation_manager.queue_operation(get_project_assets().mark_dirty, asset, mutation)  # type: ignore
 
 
 # TODO: rework
@@ -85,24 +80,17 @@ async def _handle_SetValueMutation(data: DataContext, mutation: SetValueMutation
     if asset is None:
         raise ValueError(f"Asset {mutation.ref.ref_segments[1]} not found")
 
-    attr = asset
-    for ref in mutation.ref.ref_segments[2:]:
-        if isinstance(attr, list):
-            attr = next((item for item in attr if item.id == ref), None)
-        else:
-            attr = getattr(attr, ref)
-
-    if isinstance(attr, list):
-        attr.append(obj)
-    elif isinstance(attr, dict):
-        attr.update(obj)
+    if obj is None:
+        raise ValueError(f"Object {mutation.ref} not found")
+
+    if isinstance(getattr(obj, mutation.key), AICChatOptions):
+        setattr(obj, mutation.key, AICChatOptions(**mutation.value))
     else:
-        if isinstance(getattr(attr, mutation.key), AICChatOptions):
-            setattr(attr, mutation.key, AICChatOptions(**mutation.value))
-        else:
-            setattr(attr, mutation.key, mutation.value)
+        setattr(obj, mutation.key, mutation.value)
 
-    data.asset_operation_manager.queue_operation(get_project_assets().update_asset, asset.id, asset)  # type: ignore
+    data.value_set(mutation.ref, mutation.key)
+
+    data.asset_operation_manager.queue_operation(get_project_assets().mark_dirty, asset, mutation)  # type: ignore
 
 
 # TODO: rework
@@ -112,21 +100,15 @@ async def _handle_AppendToStringMutation(data: DataContext, mutation: AppendToSt
     if asset is None:
         raise ValueError(f"Asset {mutation.ref.ref_segments[1]} not found")
 
-    attr = asset
-    for ref in mutation.ref.ref_segments[2:]:
-        if isinstance(attr, list):
-            attr = next((item for item in attr if item.id == ref), None)
-        else:
-            attr = getattr(attr, ref)
-
-    if isinstance(attr, list):
-        attr.append(obj)
-    elif isinstance(attr, dict):
-        attr.update(obj)
+    if obj is None:
+        raise ValueError(f"Object {mutation.ref} not found")
+
+    if isinstance(obj, AppendableStringsObject):
+        obj.append_to_string(mutation.key, mutation.value)
     else:
-        setattr(attr, mutation.key, getattr(attr, mutation.key, "") + mutation.value)
+        setattr(obj, mutation.key, getattr(obj, mutation.key, "") + mutation.value)
 
-    data.asset_operation_manager.queue_operation(get_project_assets().update_asset, asset.id, asset)  # type: ignore
+    data.asset_operation_manager.queue_operation(get_project_assets().mark_dirty, asset, mutation)  # type: ignore
 
 
 MUTATION_HANDLERS: dict[str, Callable[[DataContext, Any], Awaitable[None]]] = {
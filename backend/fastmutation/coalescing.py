@@ -0,0 +1,106 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastmutation.mutations import AppendToStringMutation, AssetMutation
+
+
+@dataclass
+class _PendingAppend:
+    mutation: AppendToStringMutation
+    meta: Any
+    chunks: list[str] = field(default_factory=list)
+    size: int = 0
+    timer: asyncio.TimerHandle | None = None
+
+    def can_merge(self, mutation: AppendToStringMutation, meta: Any) -> bool:
+        return self.meta == meta and self.mutation.key == mutation.key and self.mutation.ref == mutation.ref
+
+    def merged(self) -> AppendToStringMutation:
+        return AppendToStringMutation(ref=self.mutation.ref, key=self.mutation.key, value="".join(self.chunks))
+
+
+class MutationCoalescer:
+    """
+    Merges consecutive AppendToStringMutations that target the same ref and key into one mutation
+    before they are emitted.
+
+    Mutations are grouped into channels (e.g. one per asset), every channel holds at most one pending append.
+    A pending append is emitted when the time window passes, when it grows over max_bytes (of UTF-8),
+    or as soon as any other mutation is pushed to the same channel, so the emitted order is preserved.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[AssetMutation, Any], Awaitable[None]],
+        window: float,
+        max_bytes: int,
+    ):
+        self._emit = emit
+        self.window = window
+        self.max_bytes = max_bytes
+        self._pending: dict[Hashable, _PendingAppend] = {}
+        self._emit_locks: dict[Hashable, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._timed_flushes: set[asyncio.Task] = set()
+
+    async def push(self, channel: Hashable, mutation: AssetMutation, meta: Any = None) -> None:
+        if not isinstance(mutation, AppendToStringMutation) or self.window <= 0:
+            await self.flush(channel)
+            await self._emit_now(channel, mutation, meta)
+            return
+
+        pending = self._pending.get(channel)
+
+        if pending is not None and not pending.can_merge(mutation, meta):
+            await self.flush(channel)
+            pending = None
+
+        if pending is None:
+            pending = _PendingAppend(mutation=mutation, meta=meta)
+            pending.timer = asyncio.get_running_loop().call_later(self.window, self._on_window_passed, channel)
+            self._pending[channel] = pending
+
+        pending.chunks.append(mutation.value)
+        pending.size += len(mutation.value.encode())
+
+        if pending.size >= self.max_bytes:
+            await self.flush(channel)
+
+    async def flush(self, channel: Hashable) -> None:
+        pending = self._pending.pop(channel, None)
+
+        if pending is None:
+            return
+
+        if pending.timer is not None:
+            pending.timer.cancel()
+
+        await self._emit_now(channel, pending.merged(), pending.meta)
+
+    async def flush_all(self) -> None:
+        for channel in list(self._pending.keys()):
+            await self.flush(channel)
+
+    async def emit_in_order(self, channel: Hashable, emit: Callable[[], Awaitable[None]]) -> None:
+        """
+        Runs an emit which does not go through the coalescer (e.g. of a whole batch of mutations)
+        after everything pushed to the channel before it.
+        """
+        await self.flush(channel)
+
+        async with self._emit_locks[channel]:
+            await emit()
+
+    def has_pending(self, channel: Hashable) -> bool:
+        return channel in self._pending
+
+    async def _emit_now(self, channel: Hashable, mutation: AssetMutation, meta: Any) -> None:
+        # Emits of one channel must not interleave, otherwise a timed flush could overtake a later mutation
+        async with self._emit_locks[channel]:
+            await self._emit(mutation, meta)
+
+    def _on_window_passed(self, channel: Hashable) -> None:
+        flush = asyncio.ensure_future(self.flush(channel))
+        self._timed_flushes.add(flush)
+        flush.add_done_callback(self._timed_flushes.discard)
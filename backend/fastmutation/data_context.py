@@ -17,6 +17,13 @@ class DataContext(ABC):
     async def mutate(self, mutation: "AssetMutation", originating_from_server: bool) -> None:
         pass
 
+    async def mutate_batch(self, mutations: "list[AssetMutation]", originating_from_server: bool) -> None:
+        """
+        Applies the mutations in order. Contexts which can apply them atomically should override this.
+        """
+        for mutation in mutations:
+            await self.mutate(mutation, originating_from_server)
+
     @abstractmethod
     async def acquire_lock(self, ref: "ObjectRef"):
         pass
@@ -43,6 +50,21 @@ class DataContext(ABC):
     async def exists(self, ref: "AnyRef") -> bool:
         pass
 
+    def object_created(self, ref: "ObjectRef", obj: "BaseObject") -> None:
+        """
+        Called by mutation handlers after an object was added to a collection, so derived state can follow.
+        """
+
+    def object_deleted(self, ref: "ObjectRef") -> None:
+        """
+        Called by mutation handlers after an object was removed from its collection.
+        """
+
+    def value_set(self, ref: "ObjectRef", key: str) -> None:
+        """
+        Called by mutation handlers after an attribute of an object was replaced.
+        """
+
     @property
     @abstractmethod
     def type_to_cls_mapping(self) -> "dict[str, Type[BaseObject]]":
@@ -0,0 +1,257 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Hashable
+
+_log = logging.getLogger(__name__)
+
+# Holders which lost a lock to an expired lease and never released it are forgotten, the oldest first
+_MAX_EXPIRED_LEASES = 1000
+
+
+class LockTimeoutError(Exception):
+    pass
+
+
+class LockNotHeldError(Exception):
+    pass
+
+
+class Histogram:
+    """
+    Counts of durations (in seconds) falling into buckets with the given upper bounds, plus an overflow bucket.
+    """
+
+    DEFAULT_BOUNDS = (0.001, 0.01, 0.1, 0.5, 1, 5, 30, 60, 300)
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def to_dict(self) -> dict:
+        buckets = {f"<={bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]}"] = self.counts[-1]
+        return {"count": self.count, "total": self.total, "max": self.max, "buckets": buckets}
+
+
+@dataclass
+class LockHolder:
+    key: Hashable
+    owner: str
+    acquired_at: float
+    lease_expires_at: float | None
+    lease: float | None = None
+    on_expired: Callable[[], None] | None = None
+    _lease_timer: asyncio.TimerHandle | None = None
+
+
+@dataclass
+class _Waiter:
+    owner: str
+    future: asyncio.Future
+    enqueued_at: float
+
+
+@dataclass
+class _LockState:
+    holder: LockHolder | None = None
+    waiters: deque[_Waiter] = field(default_factory=deque)
+
+
+@dataclass
+class LockStats:
+    wait_time: Histogram = field(default_factory=Histogram)
+    hold_time: Histogram = field(default_factory=Histogram)
+    timeouts: int = 0
+    expired_leases: int = 0
+
+
+class LockManager:
+    """
+    Exclusive locks identified by hashable keys (e.g. refs), each held by one owner (e.g. a request id) at a time.
+
+    Waiters get a lock in the order they asked for it. A lock not released before its lease expires is taken away
+    from its holder and handed to the next waiter, so a crashed holder does not keep it forever. A holder which is
+    still working keeps the lock by renewing the lease.
+    """
+
+    def __init__(self, timeout: float, lease: float | None):
+        self.timeout = timeout
+        self.lease = lease
+        self.stats = LockStats()
+        self._locks: dict[Hashable, _LockState] = {}
+        # Holders whose lease expired and which have not tried to release the lock yet, the oldest first
+        self._expired: dict[tuple[Hashable, str], bool] = {}
+
+    def is_locked(self, key: Hashable) -> bool:
+        state = self._locks.get(key)
+        return state is not None and state.holder is not None
+
+    def holder(self, key: Hashable) -> LockHolder | None:
+        state = self._locks.get(key)
+        return state.holder if state else None
+
+    def holders(self) -> list[tuple[LockHolder, int]]:
+        """
+        Returns the current holders with the number of waiters for each of the locks.
+        """
+        return [(state.holder, len(state.waiters)) for state in self._locks.values() if state.holder is not None]
+
+    async def acquire(
+        self,
+        key: Hashable,
+        owner: str,
+        timeout: float | None = None,
+        lease: float | None = None,
+        on_expired: Callable[[], None] | None = None,
+    ) -> LockHolder:
+        state = self._locks.setdefault(key, _LockState())
+        enqueued_at = time.monotonic()
+
+        if state.holder is None and not state.waiters:
+            return self._grant(key, state, owner, enqueued_at, lease, on_expired)
+
+        waiter = _Waiter(owner=owner, future=asyncio.get_running_loop().create_future(), enqueued_at=enqueued_at)
+        state.waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.timeout if timeout is None else timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The lock was handed over just as the wait ended, pass it on
+                self._release_holder(key, state)
+            else:
+                waiter.future.cancel()
+                state.waiters.remove(waiter)
+                self._forget_if_unused(key, state)
+
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats.timeouts += 1
+                holder = state.holder
+                raise LockTimeoutError(
+                    f"Lock acquisition timed out for {key}, held by {holder.owner if holder else 'nobody'}"
+                )
+            raise
+
+        return self._grant(key, state, owner, enqueued_at, lease, on_expired)
+
+    def release(self, key: Hashable, owner: str) -> bool:
+        """
+        Returns False, instead of raising LockNotHeldError, if the lease of the owner expired before the release.
+        """
+        state = self._locks.get(key)
+
+        if state is None or state.holder is None or state.holder.owner != owner:
+            if self._expired.pop((key, owner), False):
+                _log.warning(f"Lock {key} was taken away from {owner} before it was released, its lease expired")
+                return False
+
+            raise LockNotHeldError(f"Lock {key} is not acquired by {owner}")
+
+        self._release_holder(key, state)
+        return True
+
+    def renew(self, key: Hashable, owner: str) -> None:
+        """
+        Extends the lease of the lock held by owner by another lease period, does nothing if it has no lease.
+        """
+        state = self._locks.get(key)
+        holder = state.holder if state else None
+
+        if holder is None or holder.owner != owner or not holder.lease:
+            return
+
+        # The timer is left as it is, when it fires it sees the new expiry and waits for it
+        holder.lease_expires_at = time.monotonic() + holder.lease
+
+    def _grant(
+        self,
+        key: Hashable,
+        state: _LockState,
+        owner: str,
+        enqueued_at: float,
+        lease: float | None,
+        on_expired: Callable[[], None] | None,
+    ) -> LockHolder:
+        now = time.monotonic()
+        lease = self.lease if lease is None else lease
+
+        self.stats.wait_time.observe(now - enqueued_at)
+        self._expired.pop((key, owner), None)
+
+        holder = state.holder = LockHolder(
+            key=key,
+            owner=owner,
+            acquired_at=now,
+            lease_expires_at=now + lease if lease else None,
+            lease=lease or None,
+            on_expired=on_expired,
+        )
+
+        if lease:
+            holder._lease_timer = asyncio.get_running_loop().call_later(lease, self._lease_expired, key, holder)
+
+        return holder
+
+    def _lease_expired(self, key: Hashable, holder: LockHolder) -> None:
+        state = self._locks.get(key)
+        if state is None or state.holder is not holder:
+            return
+
+        remaining = (holder.lease_expires_at or 0) - time.monotonic()
+        if remaining > 0:
+            # Renewed meanwhile
+            holder._lease_timer = asyncio.get_running_loop().call_later(remaining, self._lease_expired, key, holder)
+            return
+
+        _log.warning(f"Lease of lock {key} held by {holder.owner} expired")
+        self.stats.expired_leases += 1
+
+        self._expired[(key, holder.owner)] = True
+        while len(self._expired) > _MAX_EXPIRED_LEASES:
+            del self._expired[next(iter(self._expired))]
+
+        self._release_holder(key, state)
+
+        if holder.on_expired:
+            holder.on_expired()
+
+    def _release_holder(self, key: Hashable, state: _LockState) -> None:
+        holder = state.holder
+        assert holder is not None
+
+        if holder._lease_timer:
+            holder._lease_timer.cancel()
+
+        self.stats.hold_time.observe(time.monotonic() - holder.acquired_at)
+        state.holder = None
+
+        # Hand the lock over to the longest waiting one, it is granted when the waiter resumes
+        while state.waiters:
+            waiter = state.waiters.popleft()
+            if not waiter.future.done():
+                state.holder = LockHolder(
+                    key=key, owner=waiter.owner, acquired_at=time.monotonic(), lease_expires_at=None
+                )
+                waiter.future.set_result(None)
+                return
+
+        self._forget_if_unused(key, state)
+
+    def _forget_if_unused(self, key: Hashable, state: _LockState) -> None:
+        if state.holder is None and not state.waiters:
+            self._locks.pop(key, None)
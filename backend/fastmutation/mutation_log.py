@@ -0,0 +1,74 @@
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Hashable
+
+from pydantic import BaseModel
+
+from fastmutation.mutations import AssetMutation
+
+
+class LoggedMutation(BaseModel):
+    seq: int
+    request_id: str
+    mutation: AssetMutation
+
+
+@dataclass
+class _Channel:
+    last_seq: int = 0
+    entries: deque[LoggedMutation] = field(default_factory=deque)
+
+
+class MutationLog:
+    """
+    Numbers the mutations of every channel (e.g. asset) with a monotonic sequence number and keeps the last
+    `capacity` of them, so a client which knows the last sequence number it has seen can catch up with just
+    the mutations it missed.
+
+    Sequence numbers are only meaningful within one stream_id, a new log (e.g. after a restart) has a new one.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.stream_id = str(uuid.uuid4())
+        self._channels: dict[Hashable, _Channel] = {}
+
+    def record(self, channel: Hashable, mutation: AssetMutation, request_id: str) -> LoggedMutation:
+        state = self._channels.setdefault(channel, _Channel())
+        state.last_seq += 1
+
+        logged = LoggedMutation(seq=state.last_seq, request_id=request_id, mutation=mutation)
+        state.entries.append(logged)
+
+        if len(state.entries) > self.capacity:
+            state.entries.popleft()
+
+        return logged
+
+    def last_seq(self, channel: Hashable) -> int:
+        state = self._channels.get(channel)
+        return state.last_seq if state else 0
+
+    def since(self, channel: Hashable, seq: int) -> list[LoggedMutation] | None:
+        """
+        Mutations recorded after seq, or None if some of them are not in the log anymore.
+        """
+        state = self._channels.get(channel) or _Channel()
+
+        if seq > state.last_seq:
+            return None
+
+        first_available = state.entries[0].seq if state.entries else state.last_seq + 1
+        if seq + 1 < first_available:
+            return None
+
+        return [entry for entry in state.entries if entry.seq > seq]
+
+    def reset(self, channel: Hashable) -> None:
+        """
+        Forgets the logged mutations, e.g. when the channel changed in a way which was not logged.
+        Sequence numbers keep growing, so clients which have seen older ones need a snapshot.
+        """
+        if state := self._channels.get(channel):
+            state.entries.clear()
@@ -0,0 +1,124 @@
+import types
+from functools import lru_cache
+from typing import Any, Sequence, Union, cast, get_args, get_origin
+
+from fastmutation.types import BaseObject
+
+IndexPath = tuple[str, ...]
+
+
+@lru_cache(maxsize=None)
+def _object_collection_fields(cls: type[BaseObject]) -> tuple[str, ...]:
+    """
+    Names of the fields of cls which are lists of BaseObjects, those are the collections refs can point into.
+    """
+    fields = []
+
+    for name, field_info in cls.model_fields.items():
+        annotation = field_info.annotation
+
+        # Unwrap optional collections (list[X] | None)
+        if get_origin(annotation) in (Union, types.UnionType):
+            annotation = next((arg for arg in get_args(annotation) if arg is not type(None)), None)
+
+        if get_origin(annotation) is not list:
+            continue
+
+        item_type = get_args(annotation)[0] if get_args(annotation) else None
+        if isinstance(item_type, type) and issubclass(item_type, BaseObject):
+            fields.append(name)
+
+    return tuple(fields)
+
+
+class ObjectIndex:
+    """
+    Index of all objects and object collections inside of a single root object (an asset).
+
+    Paths are ref segments relative to the root, e.g. ("message_groups", group_id, "messages", message_id),
+    so resolving a ref is a single dict lookup instead of a linear scan on every level.
+    The index has to be kept up to date with on_created / on_deleted / on_value_set.
+    """
+
+    def __init__(self, root: BaseObject):
+        self.root = root
+        self._entries: dict[IndexPath, Any] = {}
+        self._stale = False
+        self._add_object((), root)
+
+    def resolve(self, path: Sequence[str]) -> BaseObject | list[BaseObject] | None:
+        if self._stale:
+            self._rebuild()
+
+        path = tuple(path)
+        if path in self._entries:
+            return self._entries[path]
+
+        # Object path inside of an indexed collection which is not there
+        if len(path) % 2 == 0 and path[:-1] in self._entries:
+            return None
+
+        return self._resolve_by_walking(path)
+
+    def on_created(self, path: Sequence[str], obj: BaseObject) -> None:
+        if not self._stale:
+            self._add_object(tuple(path), obj)
+
+    def on_deleted(self, path: Sequence[str]) -> None:
+        if self._stale:
+            return
+
+        path = tuple(path)
+        obj = self._entries.pop(path, None)
+
+        if isinstance(obj, BaseObject):
+            self._remove_children(path, obj)
+
+    def on_value_set(self, path: Sequence[str], key: str) -> None:
+        # Replacing a whole collection can not be tracked incrementally
+        if tuple(path) + (key,) in self._entries:
+            self._stale = True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _rebuild(self) -> None:
+        self._entries.clear()
+        self._stale = False
+        self._add_object((), self.root)
+
+    def _add_object(self, path: IndexPath, obj: BaseObject) -> None:
+        self._entries[path] = obj
+
+        for field in _object_collection_fields(type(obj)):
+            collection = getattr(obj, field, None)
+
+            if collection is None:
+                continue
+
+            self._entries[path + (field,)] = collection
+
+            for item in collection:
+                self._add_object(path + (field, item.id), item)
+
+    def _remove_children(self, path: IndexPath, obj: BaseObject) -> None:
+        for field in _object_collection_fields(type(obj)):
+            collection = self._entries.pop(path + (field,), None) or []
+
+            for item in collection:
+                self._entries.pop(path + (field, item.id), None)
+                self._remove_children(path + (field, item.id), item)
+
+    def _resolve_by_walking(self, path: IndexPath) -> BaseObject | list[BaseObject] | None:
+        obj: Any = self.root
+
+        for i, segment in enumerate(path):
+            if obj is None:
+                return None
+
+            if i % 2 == 0:
+                obj = getattr(obj, segment, None)
+            else:
+                obj = next((item for item in cast(list[BaseObject], obj) if item.id == segment), None)
+
+        return obj
@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from weakref import WeakValueDictionary
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True, eq=False)
+class RefKey:
+    """
+    Immutable identity of a ref: its segments, the hash of them and the path, e.g. "assets/chat_id/message_groups".
+
+    Keys are interned by intern_ref_key, equal segments always give the same key instance,
+    so keys are compared by identity and their hash is computed once.
+    """
+
+    segments: tuple[str, ...]
+    path: str
+    hash: int
+
+    def __hash__(self) -> int:
+        return self.hash
+
+
+_interned_keys: "WeakValueDictionary[tuple[str, ...], RefKey]" = WeakValueDictionary()
+
+
+def intern_ref_key(segments: tuple[str, ...]) -> RefKey:
+    key = _interned_keys.get(segments)
+
+    if key is None:
+        key = _interned_keys[segments] = RefKey(segments=segments, path="/".join(segments), hash=hash(segments))
+
+    return key
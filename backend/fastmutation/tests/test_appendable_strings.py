@@ -0,0 +1,59 @@
+from pydantic import BaseModel
+
+from fastmutation.appendable_strings import AppendableStringsObject
+
+
+class Message(AppendableStringsObject):
+    __appendable_fields__ = frozenset(["content"])
+
+    content: str
+    title: str = ""
+
+
+class Group(BaseModel):
+    messages: list[Message]
+
+
+def test_should_join_chunks_on_read():
+    message = Message(id="message", content="Hello")
+
+    for chunk in [",", " ", "world"]:
+        message.append_to_string("content", chunk)
+
+    assert "content" not in message.__dict__
+    assert message.content == "Hello, world"
+    assert message.__dict__["content"] == "Hello, world"
+
+
+def test_should_join_chunks_when_serialized_as_part_of_parent():
+    group = Group(messages=[Message(id="message", content="")])
+    group.messages[0].append_to_string("content", "a")
+    group.messages[0].append_to_string("content", "b")
+
+    assert group.model_dump()["messages"][0]["content"] == "ab"
+    assert '"content":"ab"' in group.model_dump_json()
+
+
+def test_copies_should_not_share_chunks():
+    message = Message(id="message", content="a")
+    message.append_to_string("content", "b")
+
+    copied = message.model_copy()
+    deep_copied = message.model_copy(deep=True)
+    message.append_to_string("content", "c")
+    copied.append_to_string("content", "d")
+
+    assert message.content == "abc"
+    assert copied.content == "abd"
+    assert deep_copied.content == "ab"
+    assert deep_copied == Message(id="message", content="ab")
+
+
+def test_setting_value_should_discard_chunks():
+    message = Message(id="message", content="a")
+    message.append_to_string("content", "b")
+    message.content = "new"
+    message.append_to_string("title", "not streamed")
+
+    assert message.content == "new"
+    assert message.title == "not streamed"
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from fastmutation.coalescing import MutationCoalescer
+from fastmutation.mutations import AppendToStringMutation, SetValueMutation
+from fastmutation.types import CollectionRef, ObjectRef
+
+
+def _message_ref(id: str = "message") -> ObjectRef:
+    return ObjectRef(id=id, parent_collection=CollectionRef(id="messages"))
+
+
+@pytest.fixture
+def emitted() -> list:
+    return []
+
+
+@pytest.fixture
+def coalescer(emitted: list) -> MutationCoalescer:
+    async def emit(mutation, meta):
+        emitted.append((mutation, meta))
+
+    return MutationCoalescer(emit=emit, window=0.05, max_bytes=1000)
+
+
+@pytest.mark.asyncio
+async def test_should_merge_consecutive_appends_when_window_passes(coalescer: MutationCoalescer, emitted: list):
+    for token in ["Hel", "lo", " world"]:
+        await coalescer.push("chat", AppendToStringMutation(ref=_message_ref(), key="content", value=token))
+
+    assert emitted == []
+
+    await asyncio.sleep(0.1)
+
+    assert len(emitted) == 1
+    assert emitted[0][0].value == "Hello world"
+
+
+@pytest.mark.asyncio
+async def test_should_flush_pending_append_before_other_mutation(coalescer: MutationCoalescer, emitted: list):
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref(), key="content", value="a"))
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref(), key="content", value="b"))
+    await coalescer.push("chat", SetValueMutation(ref=_message_ref(), key="is_streaming", value=False))
+
+    assert [type(mutation).__name__ for mutation, _ in emitted] == ["AppendToStringMutation", "SetValueMutation"]
+    assert emitted[0][0].value == "ab"
+
+
+@pytest.mark.asyncio
+async def test_should_not_merge_appends_to_different_targets(coalescer: MutationCoalescer, emitted: list):
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref("1"), key="content", value="a"))
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref("2"), key="content", value="b"))
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref("2"), key="content", value="c"), meta="other")
+    await coalescer.flush_all()
+
+    assert [mutation.value for mutation, _ in emitted] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_should_flush_when_max_bytes_reached(emitted: list):
+    async def emit(mutation, meta):
+        emitted.append((mutation, meta))
+
+    coalescer = MutationCoalescer(emit=emit, window=10, max_bytes=4)
+
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref(), key="content", value="ab"))
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref(), key="content", value="cd"))
+
+    # Two characters, but four bytes
+    await coalescer.push("chat", AppendToStringMutation(ref=_message_ref(), key="content", value="żó"))
+
+    assert [mutation.value for mutation, _ in emitted] == ["abcd", "żó"]
+    assert not coalescer.has_pending("chat")
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from fastmutation.lock_manager import LockManager, LockNotHeldError, LockTimeoutError
+
+
+@pytest.mark.asyncio
+async def test_should_grant_lock_to_waiters_in_order():
+    locks = LockManager(timeout=1, lease=None)
+    granted = []
+
+    await locks.acquire("chat", "first")
+
+    async def wait_for_lock(owner: str):
+        await locks.acquire("chat", owner)
+        granted.append(owner)
+        await asyncio.sleep(0.01)
+        locks.release("chat", owner)
+
+    waiters = [asyncio.create_task(wait_for_lock(owner)) for owner in ["second", "third", "fourth"]]
+    await asyncio.sleep(0.01)
+
+    assert locks.holders()[0][0].owner == "first"
+    assert locks.holders()[0][1] == 3
+
+    locks.release("chat", "first")
+    await asyncio.gather(*waiters)
+
+    assert granted == ["second", "third", "fourth"]
+    assert not locks.is_locked("chat")
+    assert locks.stats.wait_time.count == 4
+    assert locks.stats.hold_time.count == 4
+
+
+@pytest.mark.asyncio
+async def test_should_time_out_waiting_and_keep_queue_intact():
+    locks = LockManager(timeout=0.02, lease=None)
+    await locks.acquire("chat", "first")
+
+    with pytest.raises(LockTimeoutError):
+        await locks.acquire("chat", "second")
+
+    next_waiter = asyncio.create_task(locks.acquire("chat", "third", timeout=1))
+    await asyncio.sleep(0)
+    locks.release("chat", "first")
+    await next_waiter
+
+    assert locks.holder("chat").owner == "third"  # type: ignore
+    assert locks.stats.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_should_take_lock_away_when_lease_expires():
+    locks = LockManager(timeout=1, lease=0.02)
+    expired = []
+
+    await locks.acquire("chat", "first", on_expired=lambda: expired.append("first"))
+    await locks.acquire("chat", "second")
+
+    assert expired == ["first"]
+    assert locks.holder("chat").owner == "second"  # type: ignore
+    assert locks.stats.expired_leases == 1
+
+    # A late release of the expired holder is not an error, but happens only once
+    assert not locks.release("chat", "first")
+    assert locks.holder("chat").owner == "second"  # type: ignore
+
+    with pytest.raises(LockNotHeldError):
+        locks.release("chat", "first")
+
+
+@pytest.mark.asyncio
+async def test_should_keep_lock_while_lease_is_renewed():
+    locks = LockManager(timeout=1, lease=0.05)
+    await locks.acquire("chat", "first")
+
+    for _ in range(5):
+        await asyncio.sleep(0.02)
+        locks.renew("chat", "first")
+
+    assert locks.holder("chat").owner == "first"  # type: ignore
+
+    await asyncio.sleep(0.1)
+
+    assert not locks.is_locked("chat")
+    assert locks.stats.expired_leases == 1
@@ -0,0 +1,35 @@
+from aiconsole.core.chat.locations import ChatRef
+from fastmutation.mutation_log import MutationLog
+from fastmutation.mutations import AppendToStringMutation
+
+
+def _append(value: str) -> AppendToStringMutation:
+    return AppendToStringMutation(ref=ChatRef(id="chat"), key="name", value=value)
+
+
+def test_should_return_mutations_missed_since_sequence_number():
+    log = MutationLog(capacity=10)
+
+    for value in "abcde":
+        log.record("chat", _append(value), request_id="request")
+
+    assert log.last_seq("chat") == 5
+    assert [entry.mutation.value for entry in log.since("chat", 2) or []] == ["c", "d", "e"]
+    assert log.since("chat", 5) == []
+    assert log.since("other", 0) == []
+
+
+def test_should_require_snapshot_when_gap_is_too_large_or_unknown():
+    log = MutationLog(capacity=3)
+
+    for value in "abcde":
+        log.record("chat", _append(value), request_id="request")
+
+    assert log.since("chat", 1) is None
+    assert [entry.seq for entry in log.since("chat", 2) or []] == [3, 4, 5]
+    assert log.since("chat", 6) is None
+
+    log.reset("chat")
+
+    assert log.since("chat", 4) is None
+    assert log.since("chat", 5) == []
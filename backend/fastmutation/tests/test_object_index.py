@@ -0,0 +1,58 @@
+from fastmutation.object_index import ObjectIndex
+from fastmutation.types import BaseObject
+
+
+class _Item(BaseObject):
+    text: str = ""
+
+
+class _Group(BaseObject):
+    items: list[_Item] = []
+    tags: list[str] = []
+
+
+class _Root(BaseObject):
+    groups: list[_Group]
+
+
+def _root() -> _Root:
+    return _Root(id="root", groups=[_Group(id="g1", items=[_Item(id="i1"), _Item(id="i2")])])
+
+
+def test_should_resolve_objects_and_collections():
+    root = _root()
+    index = ObjectIndex(root)
+
+    assert index.resolve(("groups",)) is root.groups
+    assert index.resolve(("groups", "g1")) is root.groups[0]
+    assert index.resolve(("groups", "g1", "items", "i2")) is root.groups[0].items[1]
+    assert index.resolve(("groups", "g1", "tags")) == []
+    assert index.resolve(("groups", "missing")) is None
+
+
+def test_should_follow_created_and_deleted_objects():
+    root = _root()
+    index = ObjectIndex(root)
+
+    group = _Group(id="g2", items=[_Item(id="i3")])
+    root.groups.append(group)
+    index.on_created(("groups", "g2"), group)
+
+    assert index.resolve(("groups", "g2", "items", "i3")) is group.items[0]
+
+    root.groups.remove(group)
+    index.on_deleted(("groups", "g2"))
+
+    assert index.resolve(("groups", "g2")) is None
+    assert index.resolve(("groups", "g2", "items", "i3")) is None
+
+
+def test_should_rebuild_when_collection_is_replaced():
+    root = _root()
+    index = ObjectIndex(root)
+
+    root.groups[0].items = [_Item(id="i4")]
+    index.on_value_set(("groups", "g1"), "items")
+
+    assert index.resolve(("groups", "g1", "items", "i4")) is root.groups[0].items[0]
+    assert index.resolve(("groups", "g1", "items", "i1")) is None
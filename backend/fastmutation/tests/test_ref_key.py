@@ -0,0 +1,37 @@
+from aiconsole.core.chat.locations import ChatRef
+from fastmutation.types import CollectionRef, ObjectRef
+
+
+def test_equal_refs_should_share_interned_key():
+    first = ChatRef(id="chat").message_groups["group"].messages["message"]
+    second = ChatRef(id="chat").message_groups["group"].messages["message"]
+
+    assert first is not second
+    assert first.key is second.key
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first.ref_segments == ("assets", "chat", "message_groups", "group", "messages", "message")
+    assert first.key.path == "assets/chat/message_groups/group/messages/message"
+
+
+def test_should_distinguish_refs_by_type_and_segments():
+    group = ChatRef(id="chat").message_groups["group"]
+
+    assert group != ChatRef(id="chat").message_groups["other"]
+    assert group.messages != group
+    assert {group: 1}.get(ChatRef(id="chat").message_groups["group"]) == 1
+
+
+def test_should_recompute_key_when_identity_changes():
+    ref = ObjectRef(id="first", parent_collection=CollectionRef(id="assets"))
+    ref.key
+
+    ref.id = "second"
+
+    assert ref.ref_segments == ("assets", "second")
+
+
+def test_deserialised_ref_should_equal_constructed_one():
+    ref = ChatRef(id="chat").message_groups["group"]
+
+    assert ObjectRef.model_validate(ref.model_dump()) == ref
@@ -1,6 +1,6 @@
 from typing import Any, Generic, TypeVar, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from fastmutation.data_context import DataContext
 from fastmutation.mutations import (
@@ -9,6 +9,7 @@ from fastmutation.mutations import (
     DeleteMutation,
     SetValueMutation,
 )
+from fastmutation.ref_key import RefKey, intern_ref_key
 
 T = TypeVar("T")
 
@@ -28,26 +29,37 @@ class ObjectRef(BaseModel, Generic[TBaseObject]):
         exclude=True, default=None
     )  # Context must be set externally after deserialisation in order to use the object
 
+    _key: RefKey | None = PrivateAttr(default=None)
+
     class Config:
         arbitrary_types_allowed = True
 
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+
+        if name in ("id", "parent_collection"):
+            self._key = None
+
     def __hash__(self):
-        return hash((self.id, self.parent_collection))
+        return self.key.hash
 
     def __eq__(self, other):
         if not isinstance(other, ObjectRef):
             return NotImplemented
-        return self.id == other.id and self.parent_collection == other.parent_collection
+        return self.key is other.key
 
     @property
-    def ref_segments(self):
-        ref = self
-        segments = []
-        while ref is not None:
-            segments.append(ref.id)
-            segments.append(ref.parent_collection.id)
-            ref = ref.parent_collection.parent
-        return list(reversed(segments))
+    def key(self) -> RefKey:
+        """
+        Interned identity of the ref, computed once per ref instance.
+        """
+        if self._key is None:
+            self._key = intern_ref_key(self.parent_collection.key.segments + (self.id,))
+        return self._key
+
+    @property
+    def ref_segments(self) -> tuple[str, ...]:
+        return self.key.segments
 
     def collection(self, id: str) -> "CollectionRef":
         assert self.context is not None
@@ -85,29 +97,38 @@ class CollectionRef(BaseModel, Generic[TBaseObject]):
         exclude=True, default=None
     )  # Context must be set externally after deserialisation in order to use the object
 
+    _key: RefKey | None = PrivateAttr(default=None)
+
     class Config:
         arbitrary_types_allowed = True
 
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+
+        if name in ("id", "parent"):
+            self._key = None
+
     def __hash__(self):
-        return hash((self.id, self.parent))
+        return self.key.hash
 
     def __eq__(self, other):
         if not isinstance(other, CollectionRef):
             return NotImplemented
-        return self.id == other.id and self.parent == other.parent
+        return self.key is other.key
+
+    @property
+    def key(self) -> RefKey:
+        """
+        Interned identity of the ref, computed once per ref instance.
+        """
+        if self._key is None:
+            parent_segments = self.parent.key.segments if self.parent is not None else ()
+            self._key = intern_ref_key(parent_segments + (self.id,))
+        return self._key
 
     @property
-    def ref_segments(self):
-        ref = self
-        segments = []
-        while ref is not None:
-            segments.append(ref.id)
-            if ref.parent is not None:
-                segments.append(ref.parent.id)
-                ref = ref.parent.parent_collection
-            else:
-                ref = None
-        return list(reversed(segments))
+    def ref_segments(self) -> tuple[str, ...]:
+        return self.key.segments
 
     def __getitem__(self, id: str) -> ObjectRef:
         return ObjectRef(parent_collection=self, id=id, context=self.context)
@@ -183,3 +204,8 @@ class StringAttributeRef(AttributeRef[T]):
 
     async def get(self) -> T:
         return await super().get()
+
+
+# Mutations reference ObjectRef only while type checking, resolve them now that it is defined
+for _mutation_cls in (CreateMutation, DeleteMutation, SetValueMutation, AppendToStringMutation):
+    _mutation_cls.model_rebuild()
@@ -30,8 +30,13 @@ const previewMaterial: (asset: Asset) => Promise<RenderedMaterial> = async (asse
     })
     .json();
 
-async function fetchAssets<T extends Asset>(): Promise<T[]> {
-  return ky.get(`${getBaseURL()}/api/assets/`, { hooks: API_HOOKS }).json();
+async function fetchAssets<T extends Asset>(ids?: string[]): Promise<T[]> {
+  return ky
+    .get(`${getBaseURL()}/api/assets/`, {
+      searchParams: ids ? new URLSearchParams(ids.map((id) => ['ids', id])) : undefined,
+      hooks: API_HOOKS,
+    })
+    .json();
 }
 
 async function setAssetEnabledFlag(id: string, enabled: boolean) {
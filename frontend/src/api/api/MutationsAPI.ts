@@ -8,6 +8,7 @@ import {
   SetValueMutation,
 } from '../ws/assetMutations';
 import { applyMutation } from '../ws/chat/applyMutation';
+import { chatStreamPosition } from '../ws/chat/chatStreamPosition';
 import { useWebSocketStore } from '../ws/useWebSocketStore';
 import { ClientMessage } from '../ws/clientMessages';
 
@@ -51,6 +52,7 @@ export class MutationsAPI {
     const mutation = { ...mutationWithoutRef, ref } as AssetMutation;
 
     applyMutation(asset, mutation);
+    chatStreamPosition.markSent(requestId);
 
     const clientMessage: ClientMessage = {
       type: 'DoMutationClientMessage',
@@ -0,0 +1,37 @@
+// Position of the open chat in its mutation stream on the server,
+// sent when re-subscribing after a reconnect to receive only the mutations missed in between.
+
+export type ChatStreamPosition = {
+  chatId: string;
+  streamId: string;
+  seq: number;
+};
+
+let position: ChatStreamPosition | null = null;
+
+// Requests with mutations sent by this client, not yet acknowledged by the server
+const pendingRequestIds = new Set<string>();
+
+export const chatStreamPosition = {
+  get: (): ChatStreamPosition | null => position,
+
+  reset: (chatId: string, streamId?: string | null, seq?: number | null) => {
+    position = streamId != null && seq != null ? { chatId, streamId, seq } : null;
+  },
+
+  advance: (chatId: string, seq?: number | null) => {
+    if (position && position.chatId === chatId && seq != null && seq > position.seq) {
+      position.seq = seq;
+    }
+  },
+
+  markSent: (requestId: string) => {
+    pendingRequestIds.add(requestId);
+  },
+
+  markApplied: (requestId: string) => {
+    pendingRequestIds.delete(requestId);
+  },
+
+  isPending: (requestId: string) => pendingRequestIds.has(requestId),
+};
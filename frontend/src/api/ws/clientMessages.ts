@@ -15,7 +15,7 @@
 // limitations under the License.
 
 import { z } from 'zod';
-import { ObjectRefSchema } from '@/types/assets/assetTypes';
+import { CollectionRefSchema, ObjectRefSchema } from '@/types/assets/assetTypes';
 import { AssetMutationSchema } from './assetMutations';
 
 export const BaseClientMessageSchema = z.object({});
@@ -29,6 +29,14 @@ export const DoMutationClientMessageSchema = BaseClientMessageSchema.extend({
 });
 export type DoMutationClientMessage = z.infer<typeof DoMutationClientMessageSchema>;
 
+// Mutations applied atomically, all of them or none
+export const DoMutationsClientMessageSchema = BaseClientMessageSchema.extend({
+  type: z.literal('DoMutationsClientMessage'),
+  request_id: z.string(),
+  mutations: z.array(AssetMutationSchema),
+});
+export type DoMutationsClientMessage = z.infer<typeof DoMutationsClientMessageSchema>;
+
 export const AcquireLockClientMessageSchema = BaseClientMessageSchema.extend({
   type: z.literal('AcquireLockClientMessage'),
   ref: ObjectRefSchema,
@@ -49,10 +57,25 @@ export const SubscribeToClientMessageSchema = BaseClientMessageSchema.extend({
   type: z.literal('SubscribeToClientMessage'),
   ref: ObjectRefSchema,
   request_id: z.string(),
+  stream_id: z.string().optional(),
+  last_seq: z.number().optional(),
+  // Send only this many last message groups, with long tool outputs truncated
+  window: z.number().optional(),
 });
 
 export type SubscribeToClientMessage = z.infer<typeof SubscribeToClientMessageSchema>;
 
+// Fetches an object or a page of a collection, e.g. message groups omitted from a windowed chat
+export const FetchClientMessageSchema = BaseClientMessageSchema.extend({
+  type: z.literal('FetchClientMessage'),
+  request_id: z.string(),
+  ref: z.union([ObjectRefSchema, CollectionRefSchema]),
+  before_id: z.string().optional(),
+  limit: z.number().optional(),
+});
+
+export type FetchClientMessage = z.infer<typeof FetchClientMessageSchema>;
+
 export const DuplicateAssetClientMessageSchema = BaseClientMessageSchema.extend({
   type: z.literal('DuplicateAssetClientMessage'),
   asset_id: z.string(),
@@ -95,10 +118,12 @@ export type ProcessChatClientMessage = z.infer<typeof ProcessChatClientMessageSc
 
 export const ClientMessageSchema = z.union([
   DoMutationClientMessageSchema,
+  DoMutationsClientMessageSchema,
   AcquireLockClientMessageSchema,
   ReleaseLockClientMessageSchema,
   DuplicateAssetClientMessageSchema,
   SubscribeToClientMessageSchema,
+  FetchClientMessageSchema,
   StopChatClientMessageSchema,
   UnsubscribeClientMessageSchema,
   AcceptCodeClientMessageSchema,
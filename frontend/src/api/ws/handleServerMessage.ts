@@ -10,6 +10,8 @@ import { AICChat } from '@/types/assets/chatTypes';
 import { v4 as uuidv4 } from 'uuid';
 import { MessageBuffer } from '@/utils/common/MessageBuffer';
 import { deepCopyObject } from '@/utils/common/deepCopyObject';
+import { chatStreamPosition } from './chat/chatStreamPosition';
+import { useWebSocketStore } from './useWebSocketStore';
 
 let messageBuffer = new MessageBuffer();
 
@@ -55,11 +57,30 @@ export async function handleServerMessage(message: ServerMessage) {
     case 'ProjectClosedServerMessage':
       useProjectStore.getState().onProjectClosed();
       break;
+    case 'HeartbeatServerMessage':
+      break;
+    case 'ResyncRequiredServerMessage': {
+      // Mutations of the open chat may have been dropped, start over from a fresh snapshot of it
+      const chat = useChatStore.getState().chat;
+      chatStreamPosition.reset(chat?.id ?? '');
+      if (chat) {
+        useWebSocketStore.getState().sendMessage({
+          type: 'SubscribeToClientMessage',
+          ref: { id: chat.id, context: null, parent_collection: { id: 'assets', parent: null, context: null } },
+          request_id: uuidv4(),
+        });
+      }
+      break;
+    }
     case 'ProjectLoadingServerMessage':
       useProjectStore.getState().onProjectLoading();
       break;
     case 'AssetsUpdatedServerMessage':
-      useAssetStore.getState().initAssets();
+      if (message.asset_ids) {
+        useAssetStore.getState().updateAssets(message.asset_ids);
+      } else {
+        useAssetStore.getState().initAssets();
+      }
       if (!message.initial) {
         showToast({
           title: 'Assets updated',
@@ -86,12 +107,55 @@ export async function handleServerMessage(message: ServerMessage) {
 
       chat.lock_id = message.request_id;
       applyMutation(chat, message.mutation, messageBuffer);
+      chatStreamPosition.advance(chat.id, message.seq);
+      useChatStore.setState({ chat });
+      break;
+    }
+    case 'NotifyAboutAssetMutationsServerMessage': {
+      const chat = deepCopyObject(useChatStore.getState().chat);
+
+      if (!chat) {
+        throw new Error('Chat is not initialized');
+      }
+
+      chat.lock_id = message.request_id;
+      for (const mutation of message.mutations) {
+        applyMutation(chat, mutation, messageBuffer);
+      }
+      chatStreamPosition.advance(chat.id, message.seq);
+      useChatStore.setState({ chat });
+      break;
+    }
+    case 'MutationsAppliedServerMessage':
+      chatStreamPosition.markApplied(message.request_id);
+      chatStreamPosition.advance(message.asset_id, message.seq);
+      break;
+    case 'ChatMutationsSinceServerMessage': {
+      const chat = deepCopyObject(useChatStore.getState().chat);
+
+      if (!chat || chat.id !== message.chat_id) {
+        break;
+      }
+
+      for (const { request_id, mutation } of message.mutations) {
+        // Mutations sent by this client are already applied locally
+        if (chatStreamPosition.isPending(request_id)) {
+          chatStreamPosition.markApplied(request_id);
+          continue;
+        }
+
+        applyMutation(chat, mutation, messageBuffer);
+      }
+
+      chatStreamPosition.reset(chat.id, message.stream_id, message.seq);
       useChatStore.setState({ chat });
       break;
     }
     case 'ChatOpenedServerMessage': {
       const chat = message.chat;
 
+      chatStreamPosition.reset(chat.id, message.stream_id, message.seq);
+
       const currentlySreamingMessage = chat.message_groups
         .flatMap((group) => group.messages)
         .find((message) => message.is_streaming);
@@ -128,6 +192,9 @@ export async function handleServerMessage(message: ServerMessage) {
       }
       break;
     }
+    case 'FetchResultServerMessage':
+      // Awaited by the request which fetched it
+      break;
     default:
       console.error('Unknown message type: ', message);
   }
@@ -67,6 +67,19 @@ export const ProjectClosedServerMessageSchema = BaseServerMessageSchema.extend({
 
 export type ProjectClosedServerMessage = z.infer<typeof ProjectClosedServerMessageSchema>;
 
+export const HeartbeatServerMessageSchema = BaseServerMessageSchema.extend({
+  type: z.literal('HeartbeatServerMessage'),
+});
+
+export type HeartbeatServerMessage = z.infer<typeof HeartbeatServerMessageSchema>;
+
+// Some messages to this client were dropped because it did not keep up, it has to subscribe again
+export const ResyncRequiredServerMessageSchema = BaseServerMessageSchema.extend({
+  type: z.literal('ResyncRequiredServerMessage'),
+});
+
+export type ResyncRequiredServerMessage = z.infer<typeof ResyncRequiredServerMessageSchema>;
+
 export const ProjectLoadingServerMessageSchema = BaseServerMessageSchema.extend({
   type: z.literal('ProjectLoadingServerMessage'),
 });
@@ -77,6 +90,7 @@ export const AssetsUpdatedServerMessageSchema = BaseServerMessageSchema.extend({
   type: z.literal('AssetsUpdatedServerMessage'),
   initial: z.boolean(),
   count: z.number(),
+  asset_ids: z.array(z.string()).nullable().optional(),
 });
 
 export type AssetsUpdatedServerMessage = z.infer<typeof AssetsUpdatedServerMessageSchema>;
@@ -91,6 +105,15 @@ export type SettingsServerMessage = z.infer<typeof SettingsServerMessageSchema>;
 export const ChatOpenedServerMessageSchema = BaseServerMessageSchema.extend({
   type: z.literal('ChatOpenedServerMessage'),
   chat: AICChatSchema,
+  stream_id: z.string().nullish(),
+  seq: z.number().nullish(),
+  // Set if only the last message groups of the chat were sent
+  window: z
+    .object({
+      omitted_message_groups: z.number(),
+      truncated_tool_call_outputs: z.record(z.number()),
+    })
+    .nullish(),
 });
 
 export type ChatOpenedServerMessage = z.infer<typeof ChatOpenedServerMessageSchema>;
@@ -120,26 +143,76 @@ export const NotifyAboutAssetMutationServerMessageSchema = BaseServerMessageSche
   type: z.literal('NotifyAboutAssetMutationServerMessage'),
   request_id: z.string(),
   mutation: AssetMutationSchema,
+  seq: z.number().nullish(),
 });
 
 export type NotifyAboutAssetMutationServerMessage = z.infer<typeof NotifyAboutAssetMutationServerMessageSchema>;
 
+export const NotifyAboutAssetMutationsServerMessageSchema = BaseServerMessageSchema.extend({
+  type: z.literal('NotifyAboutAssetMutationsServerMessage'),
+  request_id: z.string(),
+  mutations: z.array(AssetMutationSchema),
+  seq: z.number().nullish(),
+});
+
+export type NotifyAboutAssetMutationsServerMessage = z.infer<typeof NotifyAboutAssetMutationsServerMessageSchema>;
+
+export const MutationsAppliedServerMessageSchema = BaseServerMessageSchema.extend({
+  type: z.literal('MutationsAppliedServerMessage'),
+  request_id: z.string(),
+  asset_id: z.string(),
+  seq: z.number(),
+});
+
+export type MutationsAppliedServerMessage = z.infer<typeof MutationsAppliedServerMessageSchema>;
+
+export const ChatMutationsSinceServerMessageSchema = BaseServerMessageSchema.extend({
+  type: z.literal('ChatMutationsSinceServerMessage'),
+  chat_id: z.string(),
+  stream_id: z.string(),
+  seq: z.number(),
+  mutations: z.array(
+    z.object({
+      seq: z.number(),
+      request_id: z.string(),
+      mutation: AssetMutationSchema,
+    }),
+  ),
+});
+
+export type ChatMutationsSinceServerMessage = z.infer<typeof ChatMutationsSinceServerMessageSchema>;
+
+export const FetchResultServerMessageSchema = BaseServerMessageSchema.extend({
+  type: z.literal('FetchResultServerMessage'),
+  request_id: z.string(),
+  ref: z.unknown(),
+  value: z.unknown(),
+});
+
+export type FetchResultServerMessage = z.infer<typeof FetchResultServerMessageSchema>;
+
 export type ResponseServerMessage = z.infer<typeof ResponseServerMessageSchema>;
 
 export const ServerMessageSchema = z.discriminatedUnion('type', [
   NotifyAboutAssetMutationServerMessageSchema,
+  NotifyAboutAssetMutationsServerMessageSchema,
+  MutationsAppliedServerMessageSchema,
+  ChatMutationsSinceServerMessageSchema,
   NotificationServerMessageSchema,
   DebugJSONServerMessageSchema,
   ErrorServerMessageSchema,
   InitialProjectStatusServerMessageSchema,
   ProjectOpenedServerMessageSchema,
   ProjectClosedServerMessageSchema,
+  HeartbeatServerMessageSchema,
+  ResyncRequiredServerMessageSchema,
   ProjectLoadingServerMessageSchema,
   AssetsUpdatedServerMessageSchema,
   SettingsServerMessageSchema,
   ChatOpenedServerMessageSchema,
   ChatClosedServerMessageSchema,
   DuplicateAssetServerMessageSchema,
+  FetchResultServerMessageSchema,
   ResponseServerMessageSchema,
 ]);
 
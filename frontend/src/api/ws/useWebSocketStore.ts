@@ -19,7 +19,9 @@ import { ErrorEvent } from 'reconnecting-websocket/events';
 
 import { create } from 'zustand';
 import { useAPIStore } from '../../store/useAPIStore';
+import { v4 as uuidv4 } from 'uuid';
 import { ClientMessage } from './clientMessages';
+import { chatStreamPosition } from './chat/chatStreamPosition';
 import { handleServerMessage } from './handleServerMessage';
 import { ServerMessage, ServerMessageSchema } from './serverMessages';
 
@@ -50,10 +52,26 @@ export const useWebSocketStore = create<WebSockeStore>((set, get) => ({
     const getBaseHostWithPort = useAPIStore.getState().getBaseHostWithPort;
     const ws = new ReconnectingWebSocket(`ws://${getBaseHostWithPort()}/ws`);
 
+    let wasConnected = false;
+
     ws.onopen = () => {
       set({ ws });
 
       console.log('WebSocket connection established');
+
+      // The new connection is not subscribed to anything, catch up with the open chat from where it was left
+      const position = chatStreamPosition.get();
+      if (wasConnected && position) {
+        get().sendMessage({
+          type: 'SubscribeToClientMessage',
+          ref: { id: position.chatId, context: null, parent_collection: { id: 'assets', parent: null, context: null } },
+          request_id: uuidv4(),
+          stream_id: position.streamId,
+          last_seq: position.seq,
+        });
+      }
+
+      wasConnected = true;
     };
 
     ws.onmessage = async (e: MessageEvent) => {
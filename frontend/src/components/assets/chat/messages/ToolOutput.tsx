@@ -21,6 +21,10 @@ import SyntaxHighlighter, { SyntaxHighlighterProps } from 'react-syntax-highligh
 import { duotoneDark as vs2015 } from 'react-syntax-highlighter/dist/cjs/styles/prism';
 import { EditableContentMessage } from './EditableContentMessage';
 import { MutationsAPI } from '@/api/api/MutationsAPI';
+import { useAPIStore } from '@/store/useAPIStore';
+
+// Images stored by the backend in the blob store of the project, see backend/aiconsole/core/blobs
+const BLOB_IMAGE_REGEX = /!\[image\]\(aic-blob:([0-9a-f]{64}\.[a-z0-9]+)\)/g;
 
 interface OutputProps {
   tool_call: AICToolCall;
@@ -31,8 +35,12 @@ interface OutputProps {
 
 export function ToolOutput({ tool_call, syntaxHighlighterCustomStyles, message, group }: OutputProps) {
   const userMutateChat = useChatStore((state) => state.userMutateChat);
+  const getBaseURL = useAPIStore((state) => state.getBaseURL);
   const [isEditing, setIsEditing] = useState(false);
 
+  // Texts at even indexes, ids of images between them
+  const outputParts = (tool_call.output || '').split(BLOB_IMAGE_REGEX);
+
   const handleAcceptedContent = useCallback(
     async (content: string) => {
       userMutateChat((asset, lockId) =>
@@ -69,12 +77,23 @@ export function ToolOutput({ tool_call, syntaxHighlighterCustomStyles, message,
         isEditing={isEditing}
         setIsEditing={setIsEditing}
       >
-        <SyntaxHighlighter
-          style={syntaxHighlighterCustomStyles || vs2015}
-          children={tool_call.output || ''}
-          language={'text'}
-          className="basis-0 flex-grow rounded-md p-2 overflow-auto"
-        />
+        <div className="flex flex-col flex-grow gap-2">
+          {outputParts.map((part, index) =>
+            index % 2 === 1 ? (
+              <img key={index} src={`${getBaseURL()}/api/blobs/${part}`} className="max-w-full rounded-md" />
+            ) : (
+              (outputParts.length === 1 || part.trim()) && (
+                <SyntaxHighlighter
+                  key={index}
+                  style={syntaxHighlighterCustomStyles || vs2015}
+                  children={part}
+                  language={'text'}
+                  className="basis-0 flex-grow rounded-md p-2 overflow-auto"
+                />
+              )
+            ),
+          )}
+        </div>
       </EditableContentMessage>
     </div>
   );
@@ -25,6 +25,7 @@ import { AICChat } from '@/types/assets/chatTypes';
 export type AssetsState = {
   assets: Asset[];
   initAssets: () => Promise<void>;
+  updateAssets: (ids: string[]) => Promise<void>;
   deleteAsset: (id: string) => Promise<void>;
   canOpenFinderForEditable(editable: Asset): boolean;
   openFinderForEditable: (editable: Asset) => void;
@@ -50,6 +51,25 @@ export const useAssetStore = create<AssetsState>((set) => ({
       assets: assets,
     });
   },
+  updateAssets: async (ids: string[]) => {
+    if (!useProjectStore.getState().isProjectOpen) {
+      return;
+    }
+
+    const updated = new Map((await AssetsAPI.fetchAssets(ids)).map((asset) => [asset.id, asset]));
+
+    set((state: AssetsState) => {
+      // Changed assets keep their place, new ones go at the end, those gone are removed
+      const assets = state.assets
+        .filter((asset) => !ids.includes(asset.id) || updated.has(asset.id))
+        .map((asset) => updated.get(asset.id) || asset);
+      const known = new Set(assets.map((asset) => asset.id));
+
+      return {
+        assets: [...assets, ...[...updated.values()].filter((asset) => !known.has(asset.id))],
+      };
+    });
+  },
   deleteAsset: async (id: string) => {
     await AssetsAPI.deleteAsset(id);
 
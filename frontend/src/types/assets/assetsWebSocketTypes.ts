@@ -19,4 +19,5 @@ export type AssetsUpdatedServerMessage = {
   initial: boolean;
   asset_type: 'agent' | 'material';
   count: number;
+  asset_ids?: string[] | null;
 };